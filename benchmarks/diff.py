@@ -0,0 +1,51 @@
+"""
+Time diffing many tenant policies against a production policy, and two versions of a
+policy with a large source list. Diffs look up directives and values by their canonical
+form, so the time should grow linearly with the size of the source list.
+
+    python -m benchmarks.diff [number of tenants]
+"""
+import sys
+from timeit import repeat
+
+from content_security_policy import Policy
+from content_security_policy.diff import diff
+from content_security_policy.parse import policy_from_string
+
+PRODUCTION = (
+    "default-src 'self'; script-src 'self' https://cdn.example.com 'nonce-abc'; "
+    "img-src 'self' data: https:; style-src 'self' 'unsafe-inline'; "
+    "frame-ancestors 'none'; report-uri /csp"
+)
+
+
+def tenant_policies(count: int):
+    return [
+        policy_from_string(
+            f"default-src 'self'; script-src 'self' https://cdn.example.com "
+            f"https://tenant{i}.example.com 'nonce-abc'; img-src 'self' data: https:; "
+            f"style-src 'self' 'unsafe-inline'; frame-ancestors 'none'; report-uri /csp"
+        )
+        for i in range(count)
+    ]
+
+
+def with_hosts(count: int, skip: int = 0) -> Policy:
+    return policy_from_string(
+        "script-src " + " ".join(f"host{i}.example.com" for i in range(skip, count))
+    )
+
+
+if __name__ == "__main__":
+    tenants = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    production = policy_from_string(PRODUCTION)
+    policies = tenant_policies(tenants)
+    assert all(len(diff(production, p).changed) == 1 for p in policies)
+    best = min(repeat(lambda: [diff(production, p) for p in policies], number=1))
+    print(f"{tenants} tenant policies: {best * 1000:8.1f} ms")
+
+    for count in (100, 1000, 10000, 100000):
+        a, b = with_hosts(count), with_hosts(count + 1, skip=1)
+        a.normalized(), b.normalized()
+        best = min(repeat(lambda: diff(a, b), number=1))
+        print(f"{count:>6} host sources: {best * 1000:8.2f} ms")
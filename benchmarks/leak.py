@@ -0,0 +1,41 @@
+"""
+Parse, use and drop policies, printing the resident set size along the way. It
+should stay flat, nothing may keep dropped policies alive.
+
+    python -m benchmarks.leak [number of policies]
+"""
+import resource
+import sys
+from pathlib import Path
+
+from content_security_policy import ImgSrc
+from content_security_policy.parse import policy_list_from_string
+
+
+def rss_mb() -> float:
+    statm = Path("/proc/self/statm")
+    if statm.exists():
+        pages = int(statm.read_text().split()[1])
+        return pages * resource.getpagesize() / 2**20
+    # Peak instead of current size, still shows unbounded growth
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**10
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    step = max(count // 10, 1)
+    for i in range(count):
+        policy_list = policy_list_from_string(
+            f"default-src 'self'; img-src 'self' https://img{i}.example.com; "
+            f"script-src 'nonce-{i}' 'strict-dynamic', frame-ancestors 'none'"
+        )
+        str(policy_list)
+        for policy in policy_list:
+            str(policy)
+            policy[type(policy[0])]
+            policy - ImgSrc
+            for directive in policy:
+                directive.value
+        if i % step == 0:
+            print(f"{i:>9} policies: {rss_mb():7.1f} MB")
+    print(f"{count:>9} policies: {rss_mb():7.1f} MB")
@@ -0,0 +1,70 @@
+"""
+Time checking URLs against source lists with a growing number of host sources. With
+the compiled index, the time per check should barely depend on the number of hosts.
+Then compare checking the blocked URIs of many violation reports one by one and with
+check_many.
+
+    python -m benchmarks.matching [number of checks] [number of reports]
+"""
+import random
+import sys
+from timeit import repeat
+
+from content_security_policy import HostSrc, Policy, ScriptSrc
+
+ORIGIN = "https://example.com"
+
+
+def policy_with_hosts(count: int) -> Policy:
+    hosts = [HostSrc(f"https://host{i}.example.com") for i in range(count // 2)]
+    hosts += [HostSrc(f"*.wildcard{i}.example.net") for i in range(count // 2)]
+    return Policy(ScriptSrc(*hosts))
+
+
+def report_urls(count: int):
+    rng = random.Random(0)
+    hosts = [f"host{i}.example.com" for i in range(500)]
+    hosts += [f"tracker{i}.test" for i in range(500)]
+    return [
+        f"https://{rng.choice(hosts)}/{rng.choice(('app.js', 'lib.js', 'x.js'))}"
+        for _ in range(count)
+    ]
+
+
+if __name__ == "__main__":
+    checks = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    reports = int(sys.argv[2]) if len(sys.argv) > 2 else 200000
+    for count in (10, 100, 1000, 10000):
+        policy = policy_with_hosts(count)
+        urls = [
+            f"https://host{count // 4}.example.com/app.js",
+            f"https://cdn.wildcard{count // 4}.example.net/app.js",
+            "https://not-allowed.example.org/app.js",
+        ]
+        # Compile once, like a long-running gateway would
+        assert [policy.allows(url, "script", ORIGIN) for url in urls] == [
+            True,
+            True,
+            False,
+        ]
+
+        def check():
+            for url in urls:
+                policy.allows(url, "script", ORIGIN)
+
+        best = min(repeat(check, number=checks // len(urls), repeat=3))
+        print(
+            f"{count:>6} host sources: "
+            f"{best / (checks // len(urls) * len(urls)) * 1e6:6.2f} µs per check"
+        )
+
+    policy = policy_with_hosts(1000)
+    urls = report_urls(reports)
+    results = policy.check_many(urls, "script", ORIGIN)
+    assert list(results.allowed) == [policy.allows(u, "script", ORIGIN) for u in urls]
+    one_by_one = min(
+        repeat(lambda: [policy.allows(u, "script", ORIGIN) for u in urls], number=1)
+    )
+    batch = min(repeat(lambda: policy.check_many(urls, "script", ORIGIN), number=1))
+    print(f"{reports} report URLs one by one: {one_by_one * 1000:8.1f} ms")
+    print(f"{reports} report URLs check_many: {batch * 1000:8.1f} ms")
@@ -0,0 +1,59 @@
+"""
+Memory used by parsed policies with and without interning of value items and
+directive names.
+
+    python -m benchmarks.memory [number of headers]
+"""
+import random
+import sys
+import tracemalloc
+from typing import List
+from unittest.mock import patch
+
+from content_security_policy import PolicyList, parse
+from content_security_policy.parse import policy_list_from_string
+
+HOSTS = [f"https://cdn{i}.example.com" for i in range(200)]
+KEYWORDS = ["'self'", "'unsafe-inline'", "'unsafe-eval'", "'strict-dynamic'"]
+DIRECTIVES = ["default-src", "script-src", "style-src", "img-src", "connect-src"]
+
+
+def corpus(count: int) -> List[str]:
+    rng = random.Random(0)
+    headers = []
+    for _ in range(count):
+        directives = [
+            " ".join([name] + rng.sample(KEYWORDS, 2) + rng.sample(HOSTS, 3))
+            for name in DIRECTIVES
+        ]
+        directives.append("object-src 'none'")
+        headers.append("; ".join(directives))
+    return headers
+
+
+def measure(headers: List[str]) -> int:
+    """
+    Bytes allocated by the parsed policy lists.
+    """
+    tracemalloc.start()
+    parsed: List[PolicyList] = [policy_list_from_string(h) for h in headers]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    values = {id(v) for pl in parsed for p in pl for d in p for v in d.values}
+    print(f"  {len(values)} distinct value item objects")
+    return size
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    headers = corpus(count)
+
+    print("without interning:")
+    with patch.object(parse, "_interned_value", lambda d, s: d.classify(s)):
+        with patch.object(parse, "intern", lambda name: name):
+            before = measure(headers)
+    print(f"  {before / count:8.0f} bytes/header")
+
+    print("with interning:")
+    after = measure(headers)
+    print(f"  {after / count:8.0f} bytes/header ({before / after:.2f}x less)")
@@ -0,0 +1,49 @@
+"""
+Throughput of content_security_policy.parallel.parse_parallel with 1 to N worker
+processes, compared with parsing in the current process.
+
+    python -m benchmarks.parallel [number of headers]
+"""
+import sys
+from os import cpu_count
+from time import perf_counter
+
+from benchmarks.parse import HEADERS
+from content_security_policy.parallel import parse_parallel
+from content_security_policy.parse import ParseResult, iter_policy_lists
+
+
+def directive_count(result: ParseResult) -> int:
+    return sum(len(policy) for policy in result.policy_list)
+
+
+def bench(func, headers) -> float:
+    """
+    Headers per second.
+    """
+    start = perf_counter()
+    for _ in func(headers):
+        pass
+    return len(headers) / (perf_counter() - start)
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    headers = [HEADERS[i % len(HEADERS)] for i in range(count)]
+    cpus = cpu_count() or 1
+
+    sequential = bench(iter_policy_lists, headers)
+    print(f"sequential:              {sequential:10.0f} headers/s")
+    for workers in sorted({1, cpus} | {2**i for i in range(cpus.bit_length())}):
+        for label, kwargs in (
+            ("objects", {}),
+            ("lazy", {"lazy": True}),
+            ("aggregated", {"map_result": directive_count}),
+        ):
+            rate = bench(
+                lambda h: parse_parallel(h, max_workers=workers, **kwargs), headers
+            )
+            print(
+                f"{workers:2} workers, {label + ':':11} {rate:10.0f} headers/s "
+                f"({rate / sequential:.2f}x)"
+            )
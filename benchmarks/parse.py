@@ -0,0 +1,88 @@
+"""
+Compare the single pass tokenizer in content_security_policy.parse with the previous
+findall + split implementation, and parsing raw header values with and without
+decoding them first.
+
+    python -m benchmarks.parse
+"""
+from timeit import repeat
+from typing import Match, cast
+
+from content_security_policy import Policy, PolicyList
+from content_security_policy.parse import (
+    _directive_from_tokens,
+    policy_list_from_bytes,
+    policy_list_from_string,
+)
+from content_security_policy.patterns import (
+    DIRECTIVE_SEPARATOR,
+    POLICY_SEPARATOR,
+    VALUE_ITEM_SEPARATOR,
+    WHITESPACE_HEAD,
+)
+
+HEADERS = [
+    "default-src 'self'; script-src 'self' 'unsafe-inline' https://cdn.example.com "
+    "https://*.example.net; style-src 'self' https:; img-src * data: blob:; "
+    "frame-ancestors 'none'; base-uri 'self'; form-action 'self'; report-uri /csp",
+    "script-src 'report-sample' 'nonce-EmTYwW9IZXpvlIOURJMuAQ' 'unsafe-inline';"
+    "object-src 'none';base-uri 'self';report-uri /_/somehing/cspreport, "
+    "require-trusted-types-for 'script'; trusted-types default dompurify",
+    "upgrade-insecure-requests; frame-ancestors 'self'",
+    " ; ".join(f"img-src https://img{i}.example.com" for i in range(50)),
+]
+
+
+def _two_pass_directive(directive_string: str):
+    separators = VALUE_ITEM_SEPARATOR.findall(directive_string)
+    tokens = VALUE_ITEM_SEPARATOR.split(directive_string)
+    return _directive_from_tokens(tokens, separators)
+
+
+def _two_pass_policy(policy_string: str) -> Policy:
+    separators = DIRECTIVE_SEPARATOR.findall(policy_string)
+    directives = DIRECTIVE_SEPARATOR.split(policy_string)
+    if len(directives[-1]) == 0:
+        directives = directives[:-1]
+    return Policy(*map(_two_pass_directive, directives), _separators=separators)
+
+
+def two_pass_policy_list(policy_list_string: str) -> PolicyList:
+    head = cast(Match, WHITESPACE_HEAD.match(policy_list_string)).group(0)
+    policy_list_string = WHITESPACE_HEAD.sub("", policy_list_string)[::-1]
+    tail = cast(Match, WHITESPACE_HEAD.match(policy_list_string)).group(0)[::-1]
+    policy_list_string = WHITESPACE_HEAD.sub("", policy_list_string)[::-1]
+    separators = POLICY_SEPARATOR.findall(policy_list_string)
+    tokens = POLICY_SEPARATOR.split(policy_list_string)
+    return PolicyList(
+        *map(_two_pass_policy, tokens), _head=head, _tail=tail, _separators=separators
+    )
+
+
+def bench(func, number: int = 2000, headers=HEADERS) -> float:
+    """
+    Best time per header in microseconds.
+    """
+
+    def run():
+        for header in headers:
+            func(header)
+
+    return min(repeat(run, number=number, repeat=5)) / number / len(headers) * 1e6
+
+
+if __name__ == "__main__":
+    for header in HEADERS:
+        assert str(two_pass_policy_list(header)) == header
+        assert str(policy_list_from_string(header)) == header
+
+    before = bench(two_pass_policy_list)
+    after = bench(policy_list_from_string)
+    print(f"findall + split: {before:8.2f} µs/header")
+    print(f"single pass:     {after:8.2f} µs/header ({before / after:.2f}x)")
+
+    raw = [header.encode("ascii") for header in HEADERS]
+    decoded = bench(lambda h: policy_list_from_string(h.decode("latin-1")), headers=raw)
+    from_bytes = bench(policy_list_from_bytes, headers=raw)
+    print(f"decode + parse:  {decoded:8.2f} µs/header")
+    print(f"from bytes:      {from_bytes:8.2f} µs/header ({decoded / from_bytes:.2f}x)")
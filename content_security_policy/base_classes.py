@@ -2,15 +2,20 @@ from __future__ import annotations
 
 import re
 from abc import ABC
-from functools import cache, cached_property
+from hashlib import blake2b
 from itertools import zip_longest
 from typing import (
+    TYPE_CHECKING,
     Any,
     Dict,
+    FrozenSet,
     Generic,
     Iterable,
+    List,
     Literal,
     Optional,
+    Sequence,
+    Set,
     Tuple,
     Type,
     TypeVar,
@@ -24,10 +29,14 @@ from content_security_policy.constants import (
     DEFAULT_VALUE_SEPARATOR,
 )
 from content_security_policy.exceptions import NoSuchDirective
-from content_security_policy.utils import StrOnClassMeta, kebab_to_snake
+from content_security_policy.utils import SlotsMeta, StrOnClassMeta, kebab_to_snake
 
+if TYPE_CHECKING:
+    from content_security_policy.matching import CheckResults, PolicyMatcher
+    from content_security_policy.minimize import MinimizedPolicy
 
-class ValueItem(ABC):
+
+class ValueItem(ABC, metaclass=SlotsMeta):
     """
     Base class for "items" in directive values. To clarify the distinction from a
     directive value, consider: script-src 'self' http://example.com
@@ -36,10 +45,23 @@ class ValueItem(ABC):
     not mutually exclusive. Some items may also be valid values by themselves.
     """
 
+    # Subclasses get empty __slots__ from SlotsMeta, weak references are needed to
+    # intern parsed values.
+    __slots__ = ("_value", "_canonical_cache", "__weakref__")
+
     # Pattern used to identify item when parsing
     pattern: re.Pattern
     # value as string
     _value: Optional[str]
+    _canonical_cache: Optional[str]
+
+    # Hints that let the parser skip matching pattern against strings that can not
+    # match. All matching strings start with _prefix and end with _suffix (both lower
+    # case). If _literals is not empty, the item has a fixed set of case-insensitive
+    # serializations (lower case) and pattern matches exactly these.
+    _prefix: str = ""
+    _suffix: str = ""
+    _literals: FrozenSet[str] = frozenset()
 
     def __init__(self, value: str, _value: Optional[str] = None):
         # The arguments are this awkward because all concrete implementations of
@@ -49,10 +71,40 @@ class ValueItem(ABC):
         # Both are included here so the type-checker recognizes that all ValueItem
         # constructors accept the _value kw_arg.
         self._value = value or _value
+        self._canonical_cache = None
 
     def __str__(self):
         return self._value
 
+    def __reduce__(self):
+        # Pickle as class and string, e.g. to send parsed values between processes
+        return _restore_value_item, (type(self), self._value)
+
+    def _canonical(self) -> str:
+        """
+        Serialization that is equal for semantically equal items of a class, e.g. with
+        parts that the grammar treats case-insensitively in lower case.
+        Cached, items are immutable. Subclasses override _canonicalize.
+        """
+        if self._canonical_cache is None:
+            canonical = self._canonicalize()
+            # Share the string of items that are already canonical
+            self._canonical_cache = (
+                self._value if canonical == self._value else canonical
+            )
+        return self._canonical_cache
+
+    def _canonicalize(self) -> str:
+        return str(self)
+
+    def __eq__(self, other):
+        if not isinstance(other, ValueItem):
+            return NotImplemented
+        return type(self) is type(other) and self._canonical() == other._canonical()
+
+    def __hash__(self):
+        return hash(self._canonical())
+
     @classmethod
     def from_string(cls, str_value: str):
         """
@@ -65,6 +117,15 @@ class ValueItem(ABC):
         """
         return cls("", _value=str_value)
 
+    @classmethod
+    def matches(cls, str_value: str) -> bool:
+        """
+        Check if a string is a valid serialization of this kind of item.
+        :param str_value: String to check.
+        :return: Whether str_value matches the pattern of the class.
+        """
+        return cls.pattern.fullmatch(str_value) is not None
+
 
 class ClassAsValue(ValueItem, metaclass=StrOnClassMeta):
     def __str__(self):
@@ -82,12 +143,34 @@ SelfType = TypeVar("SelfType", bound="Directive")
 ValueType = TypeVar("ValueType", bound=ValueItemType)
 
 _DIRECTIVE_REGISTER: Dict[str, Type[Directive]] = {}
+# The lower case names (kebab-case and snake_case) from _DIRECTIVE_REGISTER, for
+# case-insensitive lookups with a single dict access.
+_LOWER_CASE_DIRECTIVE_REGISTER: Dict[str, Type[Directive]] = {}
+
+
+class Directive(ABC, Generic[ValueType], metaclass=SlotsMeta):
+    __slots__ = (
+        "_value",
+        "_separators",
+        # Name as passed to __init__ (e.g. when parsing), None for the class _name
+        "_instance_name",
+        "_value_cache",
+        "_str_cache",
+        "_canonical_cache",
+        "__weakref__",
+    )
 
-
-class Directive(ABC, Generic[ValueType]):
     _value: Tuple[ValueType, ...]
+    # Name of the directive type, set on subclasses
     _name: str
     _separators: Tuple[str, ...]
+    _instance_name: Optional[str]
+    _value_cache: Optional[str]
+    _str_cache: Optional[str]
+    _canonical_cache: Optional[str]
+    # Whether the order of values matters, it does not for directives whose value is
+    # a set, e.g. a source list
+    _ordered: bool = True
 
     def __init__(
         self,
@@ -96,16 +179,15 @@ class Directive(ABC, Generic[ValueType]):
         _separators: Optional[Iterable[str]] = None,
     ):
         self._value = tuple(values)
+        self._instance_name = _name
+        self._value_cache = self._str_cache = self._canonical_cache = None
 
-        self._separators = (
+        self._separators = _shared_separators(
             tuple(_separators)
             if _separators is not None
             else ((DEFAULT_VALUE_SEPARATOR,) * len(self._value))
         )
 
-        if _name is not None:
-            self._name = _name
-
     def __init_subclass__(cls, **kwargs):
         super().__init_subclass__(**kwargs)
         names = {cls.__name__}
@@ -116,12 +198,15 @@ class Directive(ABC, Generic[ValueType]):
             if name in _DIRECTIVE_REGISTER:
                 raise ValueError(f"{name} already registered in directive register.")
             _DIRECTIVE_REGISTER[name] = cls
+            if name == name.lower():
+                _LOWER_CASE_DIRECTIVE_REGISTER[name] = cls
 
     @classmethod
     def class_by_name(cls, directive_name: str) -> Type[Directive]:
-        for name in (directive_name, directive_name.lower()):
-            if name in _DIRECTIVE_REGISTER:
-                return _DIRECTIVE_REGISTER[name]
+        if directive_name in _DIRECTIVE_REGISTER:
+            return _DIRECTIVE_REGISTER[directive_name]
+        if (lower_name := directive_name.lower()) in _LOWER_CASE_DIRECTIVE_REGISTER:
+            return _LOWER_CASE_DIRECTIVE_REGISTER[lower_name]
 
         raise NoSuchDirective(
             f"Can not find class for directive _name {directive_name}"
@@ -132,9 +217,11 @@ class Directive(ABC, Generic[ValueType]):
         """
         Name of the directive.
         """
+        if self._instance_name is not None:
+            return self._instance_name
         return self._name
 
-    @cached_property
+    @property
     def values(self) -> Tuple[ValueType, ...]:
         """
         All values of the directive as a tuple
@@ -161,17 +248,20 @@ class Directive(ABC, Generic[ValueType]):
             yield self._separators[0]
         yield from self._value_str_tokens
 
-    @cached_property
+    @property
     def value(self) -> str:
         """
         Return the complete value of the directive as a string
         :return:
         """
-        return "".join(self._value_str_tokens)
+        if self._value_cache is None:
+            self._value_cache = "".join(self._value_str_tokens)
+        return self._value_cache
 
-    @cache
     def __str__(self):
-        return "".join(self._str_tokens)
+        if self._str_cache is None:
+            self._str_cache = "".join(self._str_tokens)
+        return self._str_cache
 
     def __iter__(self):
         """
@@ -179,12 +269,93 @@ class Directive(ABC, Generic[ValueType]):
         """
         yield from self.values
 
+    def __reduce__(self):
+        return _restore_directive, (
+            type(self),
+            self._instance_name,
+            self._value,
+            self._separators,
+        )
+
+    def normalized(self: SelfType) -> SelfType:
+        """
+        Get the canonical form of the directive: lower case name, canonical values
+        (e.g. lower case keywords), default separators and, if the order of values does
+        not matter, sorted values without duplicates.
+        :return: Normalized directive, str() of it is _canonical().
+        """
+        values = [value for value in self.values if _canonical_value(value)]
+        if not self._ordered:
+            unique = {_canonical_value(value): value for value in reversed(values)}
+            values = [unique[key] for key in sorted(unique)]
+        name = self.name.lower()
+        return type(self)(
+            *map(_normalized_value, values),
+            _name=None if name == getattr(type(self), "_name", None) else name,
+        )
+
+    def _canonical(self) -> str:
+        """
+        Serialization that is equal for semantically equal directives, str() of
+        normalized() without creating it. Cached, so hashing a directive, e.g. as a
+        dict key, only sorts its values once.
+        """
+        if self._canonical_cache is None:
+            values = [value for value in map(_canonical_value, self.values) if value]
+            if not self._ordered:
+                values = sorted(set(values))
+            self._canonical_cache = " ".join((self.name.lower(), *values))
+        return self._canonical_cache
+
+    def __eq__(self, other):
+        if not isinstance(other, Directive):
+            return NotImplemented
+        return type(self) is type(other) and self._canonical() == other._canonical()
+
+    def __hash__(self):
+        return hash(self._canonical())
+
     def __add__(self: SelfType, other: ValueType) -> SelfType:
         separators = self._separators + (DEFAULT_VALUE_SEPARATOR,)
-        return type(self)(*self.values, other, _separators=separators, _name=self._name)
+        return type(self)(*self.values, other, _separators=separators, _name=self.name)
 
     def __sub__(self: SelfType, other: ValueType) -> SelfType:
-        raise NotImplemented
+        """
+        Remove every value equal to other (see Directive equality), separators before
+        the remaining values are kept.
+        """
+        canonical = _canonical_value(other)
+        kept = [
+            i
+            for i, value in enumerate(self.values)
+            if _canonical_value(value) != canonical
+        ]
+        if len(kept) == len(self.values):
+            return self
+        return self._with_values(kept)
+
+    def _with_values(
+        self: SelfType, positions: Sequence[int], added: Sequence[ValueItemType] = ()
+    ) -> SelfType:
+        """
+        Directive with the values at positions, each with the whitespace in front of
+        it, followed by added values with a single space. The first value gets the
+        whitespace after the name.
+        """
+        separators = [
+            self._separators[i]
+            if i < len(self._separators)
+            else DEFAULT_VALUE_SEPARATOR
+            for i in positions
+        ] + [DEFAULT_VALUE_SEPARATOR] * len(added)
+        if separators and self._separators:
+            separators[0] = self._separators[0]
+        return type(self)(
+            *(self.values[i] for i in positions),
+            *added,
+            _separators=separators,
+            _name=self._instance_name,
+        )
 
 
 class SingleValueDirective(Directive[ValueType], ABC, Generic[ValueType]):
@@ -200,13 +371,34 @@ class SingleValueDirective(Directive[ValueType], ABC, Generic[ValueType]):
 
 
 class Policy:
+    __slots__ = (
+        "_directives",
+        "_separators",
+        # Caches, freed with the instance
+        "_str_cache",
+        "_bytes_cache",
+        "_index",
+        "_normalized_cache",
+        "_matcher_cache",
+        "__weakref__",
+    )
+
+    _str_cache: Optional[str]
+    _bytes_cache: Optional[bytes]
+    # Positions of the directives by their classes and directive base classes
+    _index: Optional[Dict[Type[Directive], Tuple[int, ...]]]
+    _normalized_cache: Optional[Policy]
+    _matcher_cache: Optional[PolicyMatcher]
+
     def __init__(
         self,
         *directives: Directive,
         _separators: Optional[Iterable[str]] = None,
     ):
+        self._str_cache = self._bytes_cache = self._index = None
+        self._normalized_cache = self._matcher_cache = None
         self._directives = tuple(directives)
-        self._separators = (
+        self._separators = _shared_separators(
             tuple(_separators)
             if _separators is not None
             else ((DEFAULT_DIRECTIVE_SEPARATOR,) * (len(self._directives) - 1))
@@ -223,20 +415,47 @@ class Policy:
             if sep is not None:
                 yield sep
 
-    @cache
     def __str__(self):
-        return "".join(self._str_tokens)
+        if self._str_cache is None:
+            self._str_cache = "".join(self._str_tokens)
+        return self._str_cache
 
-    @cache
-    def _get_indices(self, directive_type: Type[Directive]) -> Tuple[int, ...]:
-        indices = []
-        for i, directive in enumerate(self.directives):
-            if isinstance(directive, directive_type):
-                indices.append(i)
+    def to_header_bytes(self) -> bytes:
+        """
+        Serialize the policy as a header value, encoded once per instance.
+        :return: str(self) encoded as latin-1.
+        """
+        if self._bytes_cache is None:
+            self._bytes_cache = str(self).encode("latin-1")
+        return self._bytes_cache
 
-        return tuple(indices)
+    @property
+    def header_value(self) -> bytes:
+        """
+        Raw header value, see to_header_bytes.
+        """
+        return self.to_header_bytes()
+
+    @property
+    def _directive_classes(self) -> Iterable[Type[Directive]]:
+        return map(type, self.directives)
+
+    def _directive_at(self, index: int) -> Directive:
+        return self.directives[index]
+
+    def _get_indices(self, directive_type: Type[Directive]) -> Tuple[int, ...]:
+        """
+        Get the positions of all directives that are instances of directive_type.
+        The index of all types is built on first use, after that this is a dict hit.
+        """
+        if self._index is None:
+            index: Dict[Type[Directive], List[int]] = {}
+            for i, cls in enumerate(self._directive_classes):
+                for base in _directive_bases(cls):
+                    index.setdefault(base, []).append(i)
+            self._index = {cls: tuple(indices) for cls, indices in index.items()}
+        return self._index.get(directive_type, ())
 
-    @cache
     def __getitem__(self, key: Union[Type[Directive], int, str]) -> Directive:
         """
         Get a directive of the policy. If key is an int, the key-th directive in the
@@ -249,8 +468,19 @@ class Policy:
         :return: The selected directive.
         """
         if type(key) is int:
-            return self.directives[key]
+            return self._directive_at(cast(int, key))
 
+        cls = self._key_to_class(cast(Union[Type[Directive], str], key))
+        indices = self._get_indices(cls)
+        if not indices:
+            raise IndexError(f"Policy does not have a {cls.__name__} directive.")
+        return self._directive_at(indices[0])
+
+    @staticmethod
+    def _key_to_class(key: Union[Type[Directive], str]) -> Type[Directive]:
+        """
+        Get the directive class for a non-int key of __getitem__.
+        """
         cls: Type[Directive]
 
         if isinstance(key, str):
@@ -263,12 +493,7 @@ class Policy:
                 "Item must be either an int, a string or a subclass of "
                 f"{Directive.__name__}, not {type(cls)}"
             )
-
-        for directive in self.directives:
-            if isinstance(directive, cls):
-                return directive
-
-        raise IndexError(f"Policy does not have a {cls.__name__} directive.")
+        return cls
 
     def __getattr__(self, name: str) -> Any:
         """
@@ -308,24 +533,153 @@ class Policy:
         :param other: Type of directive to remove.
         :return: New policy with no directive of type other.
         """
-        new_directives = []
-        new_separators = []
-        removed_indices = self._get_indices(other)
+        return self.without(other)
+
+    def without(self, *keys: Union[Type[Directive], str]) -> Policy:
+        """
+        Get a copy of the policy with all directives of the specified types removed,
+        in one pass over the directives.
+        :param keys: Directive types or names, like for __getitem__.
+        :return: New policy with no directive of any of these types.
+        """
+        new_directives: List[Directive] = []
+        new_separators: List[str] = []
+        removed_indices: Set[int] = set()
+        for key in keys:
+            removed_indices.update(self._get_indices(self._key_to_class(key)))
         for i, directive in enumerate(self.directives):
             if i not in removed_indices:
-                new_directives.append(directive)
-                if i != 0 and len(new_directives):
+                # Every directive but the first keeps the separator in front of it
+                if new_directives:
                     new_separators.append(self._separators[i - 1])
+                new_directives.append(directive)
+        if new_directives:
+            # e.g. the ";" of a policy ending in "; "
+            new_separators.extend(self._separators[len(self.directives) - 1 :])
 
         return type(self)(*new_directives, _separators=new_separators)
 
     def __and__(self, other: Policy) -> PolicyList:
         return PolicyList(self, other)
 
+    def normalized(self) -> Policy:
+        """
+        Get the canonical form of the policy: only the first (effective) directive of
+        each name, normalized (see Directive.normalized), sorted and with default
+        separators. Semantically equal policies have the same normalized form, byte for
+        byte. The result is cached.
+        :return: Normalized policy.
+        """
+        if self._normalized_cache is None:
+            effective: Dict[str, Directive] = {}
+            for directive in self.directives:
+                effective.setdefault(directive.name.lower(), directive)
+            directives = [directive.normalized() for directive in effective.values()]
+            self._normalized_cache = Policy(*sorted(directives, key=str))
+        return self._normalized_cache
+
+    def _canonical(self) -> str:
+        return str(self.normalized())
+
+    def __eq__(self, other):
+        """
+        Policies are equal if they enforce the same, regardless of whitespace, case
+        where the grammar is case-insensitive, order and duplicates.
+        """
+        if not isinstance(other, Policy):
+            return NotImplemented
+        return self._canonical() == other._canonical()
+
+    def __hash__(self):
+        return hash(self._canonical())
+
+    def fingerprint(self) -> int:
+        """
+        Stable 64 bit fingerprint, e.g. for telemetry. Equal policies have equal
+        fingerprints, in every process and version of Python.
+        :return: Unsigned 64 bit int.
+        """
+        return _fingerprint(self._canonical())
+
+    def allows(
+        self, url: str, destination: str = "", origin: Optional[str] = None
+    ) -> bool:
+        """
+        Check if the policy allows fetching a URL, following the effective directive of
+        the request and its fallbacks (e.g. script-src-elem, script-src, default-src).
+        The policy is compiled on first use, see content_security_policy.matching.
+        Nonces and hashes are not checked, they belong to elements rather than URLs.
+        :param url: Absolute URL of the request.
+        :param destination: Request destination as defined by Fetch, e.g. "script" or
+            "image". The default "" is the destination of fetch().
+        :param origin: Origin of the protected resource, e.g. "https://example.com".
+            'self' and host sources without a scheme never match without it.
+        :return: Whether the request is allowed.
+        """
+        from content_security_policy.matching import matcher_for
+
+        return matcher_for(self).allows(url, destination, origin)
+
+    def check_many(
+        self, urls: Iterable[str], destination: str = "", origin: Optional[str] = None
+    ) -> CheckResults:
+        """
+        Check many URLs at once, like allows, e.g. the blocked URIs of violation
+        reports. Every distinct URL is parsed once and every distinct scheme, host and
+        port is matched once. Invalid URLs are reported instead of raising.
+        :param urls: Absolute URLs.
+        :param destination: Request destination of all URLs, see allows.
+        :param origin: Origin of the protected resource, see allows.
+        :return: Effective directive and two arrays with an item per URL: 1 or 0 for
+            allowed or not, and the position of the first matching source in the
+            directive's values (NO_SOURCE or INVALID_URL from
+            content_security_policy.matching if there is none).
+        """
+        from content_security_policy.matching import matcher_for
+
+        return matcher_for(self).check_many(urls, destination, origin)
+
+    def minimized(self, max_bytes: Optional[int] = None) -> MinimizedPolicy:
+        """
+        Get the smallest form of the policy this library can find that allows the
+        same: only the first directive of each name, without sources that others in
+        the same list cover (e.g. x.a.com next to *.a.com or https://a.com next to
+        https:), without fetch directives that allow the same as their fallback, and
+        with default separators. Nothing is removed to meet max_bytes, the result tells
+        if it is met.
+        :param max_bytes: Maximum size of the header value, None for no maximum.
+        :return: The minimized policy, its size in bytes and whether it is within
+            max_bytes.
+        """
+        from content_security_policy.minimize import minimized_policy
+
+        return minimized_policy(self, max_bytes)
+
+    def __reduce__(self):
+        return _restore_policy, (type(self), self.directives, self._separators)
+
 
 class PolicyList:
+    __slots__ = (
+        "_policies",
+        "_separators",
+        "_whitespace",
+        "_str_cache",
+        "_bytes_cache",
+        "_normalized_cache",
+        "_effective_cache",
+        "__weakref__",
+    )
+
     _policies: Tuple[Policy, ...]
     _separators: Tuple[str, ...]
+    # Leading and trailing whitespace of a parsed header, None if there is none, which
+    # is the common case. One slot for both keeps instances small.
+    _whitespace: Optional[Tuple[Optional[str], Optional[str]]]
+    _str_cache: Optional[str]
+    _bytes_cache: Optional[bytes]
+    _normalized_cache: Optional[PolicyList]
+    _effective_cache: Optional[Policy]
 
     def __init__(
         self,
@@ -335,13 +689,14 @@ class PolicyList:
         _tail: Optional[str] = None,
     ):
         self._policies = tuple(policies)
-        self._separators = (
+        self._separators = _shared_separators(
             tuple(_separators)
             if _separators is not None
             else ((DEFAULT_POLICY_SEPARATOR,) * (len(self._policies) - 1))
         )
-        self._head = _head
-        self._tail = _tail
+        self._whitespace = (_head, _tail) if _head or _tail else None
+        self._str_cache = self._bytes_cache = self._normalized_cache = None
+        self._effective_cache = None
 
     def __getitem__(self, *args, **kwargs):
         return self._policies.__getitem__(*args, **kwargs)
@@ -352,10 +707,21 @@ class PolicyList:
     def __len__(self):
         return self._policies.__len__()
 
+    def __reduce__(self):
+        head, tail = self._whitespace or (None, None)
+        return _restore_policy_list, (
+            type(self),
+            self._policies,
+            self._separators,
+            head,
+            tail,
+        )
+
     @property
     def _str_tokens(self):
-        if self._head:
-            yield self._head
+        head, tail = self._whitespace or (None, None)
+        if head:
+            yield head
 
         policy_it = iter(self._policies)
         yield str(next(policy_it))
@@ -364,9 +730,179 @@ class PolicyList:
             yield sep
             yield str(policy)
 
-        if self._tail:
-            yield self._tail
+        if tail:
+            yield tail
 
-    @cache
     def __str__(self):
-        return "".join(self._str_tokens)
+        if self._str_cache is None:
+            self._str_cache = "".join(self._str_tokens)
+        return self._str_cache
+
+    def to_header_bytes(self) -> bytes:
+        """
+        Serialize the policy list as a header value, e.g. for a WSGI or ASGI server.
+        It is encoded once per instance, so serving a static policy list is free.
+        :return: str(self) encoded as latin-1.
+        """
+        if self._bytes_cache is None:
+            self._bytes_cache = str(self).encode("latin-1")
+        return self._bytes_cache
+
+    @property
+    def header_value(self) -> bytes:
+        """
+        Raw header value, see to_header_bytes.
+        """
+        return self.to_header_bytes()
+
+    def normalized(self) -> PolicyList:
+        """
+        Get the canonical form of the policy list: normalized policies (see
+        Policy.normalized) without duplicates and empty policies, sorted and with
+        default separators. All policies are enforced, so this does not change what the
+        policy list enforces. The result is cached.
+        :return: Normalized policy list.
+        """
+        if self._normalized_cache is None:
+            policies: Dict[str, Policy] = {}
+            for policy in self._policies:
+                normalized = policy.normalized()
+                policies.setdefault(str(normalized), normalized)
+            policies.pop("", None)
+            if not policies:
+                policies[""] = Policy()
+            self._normalized_cache = PolicyList(
+                *(policies[k] for k in sorted(policies))
+            )
+        return self._normalized_cache
+
+    def _canonical(self) -> str:
+        return str(self.normalized())
+
+    def __eq__(self, other):
+        """
+        Policy lists are equal if they enforce the same, see Policy.__eq__.
+        """
+        if not isinstance(other, PolicyList):
+            return NotImplemented
+        return self._canonical() == other._canonical()
+
+    def __hash__(self):
+        return hash(self._canonical())
+
+    def fingerprint(self) -> int:
+        """
+        Stable 64 bit fingerprint, see Policy.fingerprint.
+        :return: Unsigned 64 bit int.
+        """
+        return _fingerprint(self._canonical())
+
+    def allows(
+        self, url: str, destination: str = "", origin: Optional[str] = None
+    ) -> bool:
+        """
+        Check if every policy of the list allows fetching a URL, see Policy.allows.
+        """
+        return all(policy.allows(url, destination, origin) for policy in self)
+
+    def effective(self) -> Policy:
+        """
+        Get the policy that is effectively enforced: browsers enforce every policy of
+        the list, so per directive (including fallbacks like script-src to default-src)
+        only sources that all policies allow are kept. Partial overlaps that are not a
+        source of either policy are left out, so the result may be stricter, but never
+        more lenient. Sandbox, Trusted Types, webrtc and upgrade-insecure-requests are
+        combined too, see effective_policy. The result is cached.
+        :return: Normalized policy, see content_security_policy.intersection.
+        """
+        if self._effective_cache is None:
+            from content_security_policy.intersection import effective_policy
+
+            self._effective_cache = effective_policy(self._policies)
+        return self._effective_cache
+
+
+# Separator tuples made of a single default separator, shared between instances. Most
+# parsed directives and policies have such separators, so this saves a tuple per object.
+_SHARED_SEPARATORS: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+_DEFAULT_SEPARATORS = frozenset(
+    (DEFAULT_VALUE_SEPARATOR, DEFAULT_DIRECTIVE_SEPARATOR, DEFAULT_POLICY_SEPARATOR)
+)
+_MAX_SHARED_SEPARATORS = 64
+
+
+def _shared_separators(separators: Tuple[str, ...]) -> Tuple[str, ...]:
+    if (
+        0 < len(separators) <= _MAX_SHARED_SEPARATORS
+        and separators[0] in _DEFAULT_SEPARATORS
+        and separators.count(separators[0]) == len(separators)
+    ):
+        return _SHARED_SEPARATORS.setdefault(separators, separators)
+    return separators
+
+
+def _canonical_value(value: ValueItemType) -> str:
+    if isinstance(value, ValueItem):
+        return value._canonical()
+    # Classes used as values, e.g. NoneSrc, and the empty sandbox value
+    return str(value).lower()
+
+
+def _normalized_value(value: ValueItemType) -> ValueItemType:
+    if isinstance(value, ClassAsValue):
+        # e.g. NoneSrc instead of an instance spelled 'NONE'
+        return type(value)
+    if isinstance(value, ValueItem):
+        canonical = value._canonical()
+        if canonical != str(value):
+            return type(value).from_string(canonical)
+    return value
+
+
+def _fingerprint(canonical: str) -> int:
+    digest = blake2b(canonical.encode("utf-8", "surrogatepass"), digest_size=8)
+    return int.from_bytes(digest.digest(), "big")
+
+
+# Directive classes in the MRO of each directive class, e.g. ScriptSrc,
+# SourceListDirective and Directive for ScriptSrc
+_DIRECTIVE_BASES: Dict[type, Tuple[Type[Directive], ...]] = {}
+
+
+def _directive_bases(cls: Type[Directive]) -> Tuple[Type[Directive], ...]:
+    try:
+        return _DIRECTIVE_BASES[cls]
+    except KeyError:
+        bases = tuple(base for base in cls.__mro__ if issubclass(base, Directive))
+        return _DIRECTIVE_BASES.setdefault(cls, bases)
+
+
+# Module level functions to restore pickled objects. Compared to pickling instance
+# dictionaries, this keeps pickles small and free of cached values.
+def _restore_value_item(cls: Type[ValueItem], value: str) -> ValueItem:
+    return cls.from_string(value)
+
+
+def _restore_directive(
+    cls: Type[Directive],
+    name: Optional[str],
+    values: Tuple[ValueItemType, ...],
+    separators: Tuple[str, ...],
+) -> Directive:
+    return cls(*values, _name=name, _separators=separators)
+
+
+def _restore_policy(
+    cls: Type[Policy], directives: Tuple[Directive, ...], separators: Tuple[str, ...]
+) -> Policy:
+    return cls(*directives, _separators=separators)
+
+
+def _restore_policy_list(
+    cls: Type[PolicyList],
+    policies: Tuple[Policy, ...],
+    separators: Tuple[str, ...],
+    head: Optional[str],
+    tail: Optional[str],
+) -> PolicyList:
+    return cls(*policies, _separators=separators, _head=head, _tail=tail)
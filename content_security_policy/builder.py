@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+__all__ = ["PolicyBuilder", "DirectiveBuilder"]
+
+from typing import *
+
+from content_security_policy.base_classes import (
+    Directive,
+    Policy,
+    ValueItemType,
+    ValueType,
+)
+from content_security_policy.constants import (
+    DEFAULT_DIRECTIVE_SEPARATOR,
+    DEFAULT_VALUE_SEPARATOR,
+)
+
+
+class DirectiveBuilder(Generic[ValueType]):
+    """
+    Mutable counterpart of a directive. Values are edited in place and freeze()
+    creates the immutable directive in one pass, whereas every + on a directive copies
+    all of its values.
+    Separators are preserved like with Directive.__add__: every value keeps the
+    whitespace in front of it and added values get a single space.
+    """
+
+    def __init__(
+        self, directive: Union[Directive[ValueType], Type[Directive[ValueType]]]
+    ):
+        """
+        :param directive: Directive to start from, or a directive class to start with
+            no values.
+        """
+        self._values: List[ValueType]
+        # Whitespace in front of each value (after the name for the first one)
+        self._separators: List[str]
+
+        if isinstance(directive, Directive):
+            self.directive_class: Type[Directive[ValueType]] = type(directive)
+            self._name = directive._instance_name
+            self._values = list(directive.values)
+            separators = directive._separators
+            self._separators = list(separators[: len(self._values)])
+            self._separators += [DEFAULT_VALUE_SEPARATOR] * (
+                len(self._values) - len(self._separators)
+            )
+            # e.g. whitespace between the name and ";" of a directive without values
+            self._trailing = separators[len(self._values) :]
+        else:
+            self.directive_class = directive
+            self._name = None
+            self._values = []
+            self._separators = []
+            self._trailing = ()
+
+    @property
+    def values(self) -> Tuple[ValueType, ...]:
+        return tuple(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __contains__(self, value: ValueItemType) -> bool:
+        return value in self._values
+
+    def add(self, *values: ValueType) -> DirectiveBuilder[ValueType]:
+        """
+        Append values.
+        :return: self, to chain calls.
+        """
+        self._values.extend(values)
+        self._separators.extend([DEFAULT_VALUE_SEPARATOR] * len(values))
+        return self
+
+    def remove(self, *values: ValueItemType) -> DirectiveBuilder[ValueType]:
+        """
+        Remove every occurrence of the values, along with the whitespace in front of
+        them. Values that are not present are ignored.
+        :return: self, to chain calls.
+        """
+        removed = set(values)
+        kept = [
+            (value, sep)
+            for value, sep in zip(self._values, self._separators)
+            if value not in removed
+        ]
+        self._values = [value for value, _ in kept]
+        self._separators = [sep for _, sep in kept]
+        return self
+
+    def replace(
+        self, old: ValueItemType, new: ValueType
+    ) -> DirectiveBuilder[ValueType]:
+        """
+        Replace every occurrence of old with new, keeping the separators.
+        :return: self, to chain calls.
+        """
+        self._values = [new if value == old else value for value in self._values]
+        return self
+
+    def clear(self) -> DirectiveBuilder[ValueType]:
+        """
+        Remove all values.
+        :return: self, to chain calls.
+        """
+        self._values.clear()
+        self._separators.clear()
+        return self
+
+    def freeze(self) -> Directive[ValueType]:
+        """
+        Create the immutable directive. The builder can still be edited afterwards.
+        :return: Directive with the current values.
+        """
+        return self.directive_class(
+            *self._values,
+            _name=self._name,
+            _separators=(*self._separators, *self._trailing),
+        )
+
+
+class PolicyBuilder:
+    """
+    Mutable counterpart of a policy. Directives are edited in place and freeze()
+    creates the immutable policy in one pass, whereas every + and - on a policy copies
+    all of its directives.
+    Separators are preserved like with Policy.__add__ and Policy.__sub__: every
+    directive keeps the separator in front of it and added directives get "; ".
+    """
+
+    def __init__(self, policy: Optional[Policy] = None):
+        """
+        :param policy: Policy to start from, None to start with no directives.
+        """
+        # Directives, or builders for those that are edited, in policy order
+        self._directives: List[Union[Directive, DirectiveBuilder]] = []
+        # Separator in front of each directive, the first one is not used
+        self._separators: List[str] = []
+        self._trailing: Tuple[str, ...] = ()
+        if policy is not None:
+            self._directives = list(policy.directives)
+            separators = policy._separators
+            count = max(len(self._directives) - 1, 0)
+            self._separators = [DEFAULT_DIRECTIVE_SEPARATOR, *separators[:count]]
+            self._separators = self._separators[: len(self._directives)]
+            # e.g. the ";" of a policy ending in "; "
+            self._trailing = tuple(separators[count:])
+
+    def __len__(self):
+        return len(self._directives)
+
+    def __contains__(self, key: object) -> bool:
+        """
+        :param key: Directive type or name, other objects are never contained.
+        """
+        if not isinstance(key, str) and not (
+            isinstance(key, type) and issubclass(key, Directive)
+        ):
+            return False
+        cls = Policy._key_to_class(key)
+        return any(self._is_instance(item, cls) for item in self._directives)
+
+    @staticmethod
+    def _is_instance(item: Union[Directive, DirectiveBuilder], cls: Type[Directive]):
+        if isinstance(item, DirectiveBuilder):
+            return issubclass(item.directive_class, cls)
+        return isinstance(item, cls)
+
+    def directive(self, key: Union[Type[Directive], str]) -> DirectiveBuilder:
+        """
+        Get a builder for the first directive of a type to edit its values in place,
+        like Policy.__getitem__. If the policy has no such directive, it is added.
+        :param key: Directive type or name, e.g. ScriptSrc or "script-src".
+        :return: Builder that is frozen along with the policy.
+        """
+        cls = Policy._key_to_class(key)
+        for i, item in enumerate(self._directives):
+            if self._is_instance(item, cls):
+                if isinstance(item, Directive):
+                    item = self._directives[i] = DirectiveBuilder(item)
+                return item
+
+        builder: DirectiveBuilder = DirectiveBuilder(cls)
+        self._append(builder)
+        return builder
+
+    def _append(self, item: Union[Directive, DirectiveBuilder]):
+        self._directives.append(item)
+        self._separators.append(DEFAULT_DIRECTIVE_SEPARATOR)
+
+    def add(self, *directives: Directive) -> PolicyBuilder:
+        """
+        Append directives.
+        :return: self, to chain calls.
+        """
+        for directive in directives:
+            self._append(directive)
+        return self
+
+    def remove(self, *keys: Union[Type[Directive], str]) -> PolicyBuilder:
+        """
+        Remove all directives of the types, along with the separator in front of them.
+        :param keys: Directive types or names.
+        :return: self, to chain calls.
+        """
+        classes = tuple(map(Policy._key_to_class, keys))
+        kept = [
+            (item, sep)
+            for item, sep in zip(self._directives, self._separators)
+            if not any(self._is_instance(item, cls) for cls in classes)
+        ]
+        self._directives = [item for item, _ in kept]
+        self._separators = [sep for _, sep in kept]
+        return self
+
+    def replace(self, directive: Directive) -> PolicyBuilder:
+        """
+        Replace the first directive of the same type in place, or append it if there
+        is none.
+        :return: self, to chain calls.
+        """
+        cls = type(directive)
+        for i, item in enumerate(self._directives):
+            if self._is_instance(item, cls):
+                self._directives[i] = directive
+                return self
+        self._append(directive)
+        return self
+
+    def freeze(self) -> Policy:
+        """
+        Create the immutable policy, freezing builders of its directives. The builder
+        can still be edited afterwards.
+        :return: Policy with the current directives.
+        """
+        directives = [
+            item.freeze() if isinstance(item, DirectiveBuilder) else item
+            for item in self._directives
+        ]
+        trailing = self._trailing if directives else ()
+        return Policy(*directives, _separators=(*self._separators[1:], *trailing))
@@ -0,0 +1,134 @@
+__all__ = ["ParseCache", "CacheStats"]
+
+from collections import OrderedDict
+from threading import Lock
+from typing import *
+
+from content_security_policy.base_classes import Policy, PolicyList
+from content_security_policy.parse import (
+    ParseLimits,
+    policy_from_string,
+    policy_list_from_string,
+)
+
+_Parsed = TypeVar("_Parsed", Policy, PolicyList)
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    # Number of cached results
+    size: int
+    # Total UTF-8 encoded size of the cached header strings
+    bytes: int
+
+
+def _size(header: str) -> int:
+    if header.isascii():
+        return len(header)
+    return len(header.encode("utf-8", "surrogatepass"))
+
+
+class ParseCache:
+    """
+    LRU cache in front of the parsing functions, keyed by the exact header string and
+    the ParseLimits it was parsed with. Parsed objects are immutable, so a repeated
+    header gets the very same instance.
+    """
+
+    def __init__(self, maxsize: Optional[int] = 4096, max_bytes: Optional[int] = None):
+        """
+        :param maxsize: Maximum number of cached results, None for no limit.
+        :param max_bytes: Maximum total size of cached header strings in bytes (UTF-8
+            encoded), None for no limit. Headers larger than this are parsed but never
+            cached.
+        """
+        if maxsize is not None and maxsize < 0:
+            raise ValueError(f"maxsize must not be negative, not {maxsize}.")
+        if max_bytes is not None and max_bytes < 0:
+            raise ValueError(f"max_bytes must not be negative, not {max_bytes}.")
+
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[
+            Tuple[Callable, str, Optional[ParseLimits]], Any
+        ] = OrderedDict()
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._bytes = 0
+
+    def policy_from_string(
+        self, policy_string: str, limits: Optional[ParseLimits] = None
+    ) -> Policy:
+        return self._get(policy_from_string, policy_string, limits)
+
+    def policy_list_from_string(
+        self, policy_list_string: str, limits: Optional[ParseLimits] = None
+    ) -> PolicyList:
+        return self._get(policy_list_from_string, policy_list_string, limits)
+
+    def _get(
+        self,
+        parse: Callable[..., _Parsed],
+        header: str,
+        limits: Optional[ParseLimits],
+    ) -> _Parsed:
+        # Results parsed without limits must not be returned for untrusted headers
+        key = (parse, header, limits)
+        with self._lock:
+            try:
+                parsed = self._entries[key]
+            except KeyError:
+                self._misses += 1
+            else:
+                self._hits += 1
+                self._entries.move_to_end(key)
+                return parsed
+
+        # Parse without holding the lock, concurrent misses for the same header just
+        # parse it twice.
+        parsed = parse(header, limits=limits)
+        size = _size(header)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return parsed
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = parsed
+                self._bytes += size
+                self._evict()
+        return parsed
+
+    def _evict(self):
+        while self._entries and (
+            (self.maxsize is not None and len(self._entries) > self.maxsize)
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            (_, header, _), _ = self._entries.popitem(last=False)
+            self._bytes -= _size(header)
+            self._evictions += 1
+
+    @property
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                size=len(self._entries),
+                bytes=self._bytes,
+            )
+
+    def clear(self):
+        """
+        Drop all cached results and reset the statistics.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = self._evictions = self._bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
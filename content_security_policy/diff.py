@@ -0,0 +1,97 @@
+"""
+Compare two policies directive by directive and source by source, e.g. a new
+deployment's policy with the one in production.
+"""
+__all__ = ["DirectiveChange", "PolicyDiff", "diff"]
+
+from typing import *
+
+from content_security_policy.base_classes import (
+    Directive,
+    Policy,
+    ValueItemType,
+    _canonical_value,
+)
+
+
+class DirectiveChange(NamedTuple):
+    old: Directive
+    new: Directive
+    # Values of new without an equal value in old, in the order of new
+    added: Tuple[ValueItemType, ...]
+    # Values of old without an equal value in new, in the order of old
+    removed: Tuple[ValueItemType, ...]
+
+
+class PolicyDiff(NamedTuple):
+    added: Tuple[Directive, ...]
+    removed: Tuple[Directive, ...]
+    changed: Tuple[DirectiveChange, ...]
+
+    def __bool__(self):
+        """
+        True if the policies differ.
+        """
+        return any(self)
+
+
+_NO_CHANGES = PolicyDiff((), (), ())
+
+
+def _effective_directives(policy: Policy) -> Dict[str, Directive]:
+    effective: Dict[str, Directive] = {}
+    for directive in policy.directives:
+        effective.setdefault(directive.name.lower(), directive)
+    return effective
+
+
+def _canonical_directives(policy: Policy) -> Dict[str, str]:
+    # The normalized policy is cached, so is str() of its directives
+    return {
+        directive.name: str(directive) for directive in policy.normalized().directives
+    }
+
+
+def _value_index(directive: Directive) -> Dict[str, ValueItemType]:
+    index: Dict[str, ValueItemType] = {}
+    for value in directive.values:
+        if canonical := _canonical_value(value):
+            index.setdefault(canonical, value)
+    return index
+
+
+def _directive_change(old: Directive, new: Directive) -> DirectiveChange:
+    old_values, new_values = _value_index(old), _value_index(new)
+    return DirectiveChange(
+        old,
+        new,
+        added=tuple(v for c, v in new_values.items() if c not in old_values),
+        removed=tuple(v for c, v in old_values.items() if c not in new_values),
+    )
+
+
+def diff(a: Policy, b: Policy) -> PolicyDiff:
+    """
+    Get the directives and values that differ between two policies. Like browsers, only
+    the first directive of each name is compared, and like Policy equality, case where
+    the grammar is case-insensitive, whitespace, order (if it does not matter) and
+    duplicate values are ignored. Directives and values are looked up by their
+    canonical form, so the time grows linearly with the size of the policies.
+    :param a: Old policy.
+    :param b: New policy.
+    :return: Directives only in b (added), only in a (removed) and in both but with
+        other values (changed). Empty (False) if the policies are equal.
+    """
+    if a is b or a._canonical() == b._canonical():
+        return _NO_CHANGES
+    old, new = _effective_directives(a), _effective_directives(b)
+    old_canonical, new_canonical = _canonical_directives(a), _canonical_directives(b)
+    return PolicyDiff(
+        added=tuple(d for name, d in new.items() if name not in old),
+        removed=tuple(d for name, d in old.items() if name not in new),
+        changed=tuple(
+            _directive_change(d, new[name])
+            for name, d in old.items()
+            if name in new and old_canonical[name] != new_canonical[name]
+        ),
+    )
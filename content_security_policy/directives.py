@@ -3,6 +3,7 @@ Actual directives, I would have loved to generate these classes dynamically, but
 autocompletion tools won't properly pick up on them.
 """
 __all__ = [
+    "SourceSetDirective",
     "SourceListDirective",
     "ChildSrc",
     "ConnectSrc",
@@ -33,9 +34,16 @@ __all__ = [
 ]
 
 from abc import ABC
-from typing import Optional, Union
-
-from content_security_policy.base_classes import Directive, SingleValueDirective
+from typing import Dict, Generic, Iterable, Optional, TypeVar, Union
+
+from content_security_policy.base_classes import (
+    Directive,
+    SingleValueDirective,
+    ValueItemType,
+    ValueType,
+    _canonical_value,
+)
+from content_security_policy.constants import NONE
 from content_security_policy.exceptions import BadDirectiveValue, BadSourceList
 from content_security_policy.values import (
     AncestorSource,
@@ -45,17 +53,134 @@ from content_security_policy.values import (
     ReportUriValue,
     SandboxValue,
     SourceExpression,
+    SourceListValue,
     TrustedTypesExpression,
     TrustedTypesSinkGroup,
     UnrecognizedValueItem,
 )
 
+SourceSetType = TypeVar("SourceSetType", bound="SourceSetDirective")
+
+
+class SourceSetDirective(Directive[ValueType], ABC, Generic[ValueType]):
+    """
+    A directive whose value is a set of sources, with set operations. Values are
+    compared like in Directive equality, using an index of their canonical forms that
+    is built on first use. Results keep the whitespace in front of the values of self,
+    like Directive.__sub__, and new values get a single space, like Directive.__add__.
+    'none' is dropped from results with other sources, and results without sources
+    are 'none'.
+    """
+
+    __slots__ = ("_values_index",)
+    # Position of the first value with each canonical form
+    _values_index: Optional[Dict[str, int]]
+    _ordered = False
+
+    def __init__(self, *values, **kwargs):
+        self._values_index = None
+        super().__init__(*values, **kwargs)
+
+    @property
+    def _index(self) -> Dict[str, int]:
+        if self._values_index is None:
+            index: Dict[str, int] = {}
+            for i, value in enumerate(self.values):
+                if canonical := _canonical_value(value):
+                    index.setdefault(canonical, i)
+            self._values_index = index
+        return self._values_index
+
+    def __contains__(self, value: ValueItemType) -> bool:
+        return _canonical_value(value) in self._index
+
+    def _from_sources(
+        self: SourceSetType,
+        positions: Dict[str, int],
+        added: Optional[Dict[str, ValueItemType]] = None,
+    ) -> SourceSetType:
+        """
+        Directive with the values of self at positions, followed by added values.
+        """
+        added = added or {}
+        if len(positions) + len(added) > 1:
+            positions = {c: i for c, i in positions.items() if c != NONE}
+            added = {c: v for c, v in added.items() if c != NONE}
+        if not positions and not added:
+            added = {NONE: NoneSrc}
+        return self._with_values(sorted(positions.values()), list(added.values()))
+
+    def union(self: SourceSetType, *others: Iterable[ValueItemType]) -> SourceSetType:
+        """
+        :param others: Directives or other iterables of values.
+        :return: Directive with the values of self followed by the new values of others.
+        """
+        index = self._index
+        added: Dict[str, ValueItemType] = {}
+        for other in others:
+            for value in other:
+                if (canonical := _canonical_value(value)) and canonical not in index:
+                    added.setdefault(canonical, value)
+        if not added:
+            return self
+        return self._from_sources(index, added)
+
+    def intersection(
+        self: SourceSetType, *others: Iterable[ValueItemType]
+    ) -> SourceSetType:
+        """
+        Keep the values equal to a value of every other. This does not consider what
+        sources allow, e.g. https: and https://a.com have no values in common, see
+        intersection.intersect_sources for that.
+        :param others: Directives or other iterables of values.
+        :return: Directive with the values of self that others have too, or 'none' if
+            there are none.
+        """
+        sources = self._index
+        for other in others:
+            canonicals = {_canonical_value(value) for value in other}
+            sources = {c: i for c, i in sources.items() if c in canonicals}
+        return self._from_sources(sources)
+
+    def difference(
+        self: SourceSetType, *others: Iterable[ValueItemType]
+    ) -> SourceSetType:
+        """
+        :param others: Directives or other iterables of values.
+        :return: Directive with the values of self that none of others has, or 'none'
+            if there are none.
+        """
+        canonicals = {_canonical_value(value) for other in others for value in other}
+        if canonicals.isdisjoint(self._index):
+            return self
+        return self._from_sources(
+            {c: i for c, i in self._index.items() if c not in canonicals}
+        )
+
+    def __add__(self: SourceSetType, other: ValueType) -> SourceSetType:
+        """
+        Like Directive.__add__, but adding a value the directive already has keeps it as
+        it is. Unlike union, 'none' is not replaced, so adding a source to 'none' (or
+        'none' to sources) raises BadSourceList like the constructor.
+        """
+        if other in self:
+            return self
+        return super().__add__(other)
+
+    def __sub__(self: SourceSetType, other: ValueType) -> SourceSetType:
+        """
+        Like Directive.__sub__, but duplicates are dropped and removing the last
+        source gives 'none' (with the whitespace after the name) instead of a
+        directive without sources.
+        """
+        return self.difference((other,))
+
 
 # This is not called FetchDirective because not all directives accepting a Source List
 # are categorised as Fetch Directives by the spec (worker-src, base-uri, form-action)
-class SourceListDirective(Directive[SourceExpression], ABC):
+class SourceListDirective(SourceSetDirective[SourceListValue], ABC):
     """
-    A directive whose hash is a
+    A directive whose value is a source list.
     """
 
     def __init__(self, *sources, **kwargs):
@@ -66,9 +191,6 @@ class SourceListDirective(Directive[SourceExpression], ABC):
             )
         super().__init__(*sources, **kwargs)
 
-    def __add__(self, other):
-        return type(self)(*self.values, other, _name=self._name)
-
 
 # Fetch Directives
 class ChildSrc(SourceListDirective):
@@ -147,6 +269,7 @@ class BaseUri(SourceListDirective):
 
 class Sandbox(Directive[SandboxValue]):
     _name = "sandbox"
+    _ordered = False
 
 
 # Navigation directives
@@ -154,7 +277,7 @@ class FormAction(SourceListDirective):
     _name = "form-action"
 
 
-class FrameAncestors(Directive[AncestorSource]):
+class FrameAncestors(SourceSetDirective[AncestorSource]):
     _name = "frame-ancestors"
 
     def __init__(self, *sources: Union[AncestorSource, NoneSrcType], **kwargs):
@@ -180,10 +303,12 @@ class ReportTo(SingleValueDirective[ReportToValue]):
 
 class RequireTrustedTypesFor(Directive[TrustedTypesSinkGroup]):
     _name = "require-trusted-types-for"
+    _ordered = False
 
 
 class TrustedTypes(Directive[TrustedTypesExpression]):
     _name = "trusted-types"
+    _ordered = False
 
 
 class UnrecognizedDirective(Directive[UnrecognizedValueItem]):
@@ -201,7 +326,3 @@ class UnrecognizedDirective(Directive[UnrecognizedValueItem]):
         if name is not None:
             kwargs["_name"] = name
         super().__init__(*values, **kwargs)
-
-    @property
-    def name(self) -> str:
-        return self._name
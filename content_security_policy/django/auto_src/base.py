@@ -1,5 +1,5 @@
 from abc import ABCMeta, abstractmethod
-from functools import cache
+from functools import cached_property
 from pathlib import Path
 from typing import *
 
@@ -17,6 +17,7 @@ from watchdog.events import (
 from content_security_policy import ValueItemType
 from content_security_policy.directives import Directive
 from content_security_policy.django.exceptions import ValuesMissing
+from content_security_policy.template import origin
 from content_security_policy.values import HostSrc, SourceExpression
 
 SRC_HASH_FUN = "sha384"
@@ -134,6 +135,8 @@ class AutoSrcDirective(
         # E.g.: AutoHostSrc calls django.templatetags.static.static, which can only be
         # called once django is fully up. See self.init_files.
         self.files: Dict[Path, IntermediateValueType] = {}
+        # Incremented whenever files change, e.g. to invalidate compiled templates
+        self.version = 0
 
     @property
     def name(self):
@@ -148,8 +151,7 @@ class AutoSrcDirective(
         """
         return self.directive._name
 
-    @property
-    @cache
+    @cached_property
     def watch_dirs(self):
         app_static_dirs = []
         app_paths = {conf.name: conf.path for conf in apps.app_configs.values()}
@@ -181,6 +183,7 @@ class AutoSrcDirective(
             self.files[resource.absolute()] = self.compute_value_item(resource)
         if isinstance(event, FileDeletedEvent):
             self.files.pop(resource.absolute(), None)
+        self.version += 1
 
     def init_files(self):
         """
@@ -257,15 +260,15 @@ class AutoHostSrc(AutoSrcDirective[DirectiveType, str], metaclass=ABCMeta):
                 names=missing,
             )
 
-        origin = f"{scheme}://{host}"
-
-        if port is not None:
-            origin = f"{origin}:{port}"
+        # Validated once instead of for every URL, placeholders are kept for templates
+        url_origin = origin(scheme, host, port)
 
         # Sorting by file path to avoid non-deterministic tests
         paths = sorted(self.files.items())
 
-        dynamic_values = [HostSrc(f"{origin}{rel_path}") for _, rel_path in paths]
+        dynamic_values = [
+            HostSrc.from_string(f"{url_origin}{rel_path}") for _, rel_path in paths
+        ]
 
         return self.directive(*self.static_values, *dynamic_values)
 
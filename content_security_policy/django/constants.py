@@ -1,2 +1,3 @@
 CSP_CONFIG_NAME = "CONTENT_SECURITY_POLICY"
 CSP_RO_CONFIG_NAME = "CONTENT_SECURITY_POLICY_REPORT_ONLY"
+CSP_NONCE_DIRECTIVES_NAME = "CONTENT_SECURITY_POLICY_NONCE_DIRECTIVES"
@@ -0,0 +1,9 @@
+from django.http import HttpRequest
+
+
+def csp_nonce(request: HttpRequest):
+    """
+    Make the nonce of CSPNonceMiddleware available as csp_nonce in templates, e.g.
+    <script nonce="{{ csp_nonce }}">. Empty if the middleware did not run.
+    """
+    return {"csp_nonce": getattr(request, "csp_nonce", "")}
@@ -1,4 +1,4 @@
-__all__ = ["AutoCSPMiddleware"]
+__all__ = ["AutoCSPMiddleware", "CSPNonceMiddleware"]
 
 from typing import *
 
@@ -10,8 +10,41 @@ from watchdog.observers import Observer
 from content_security_policy import Directive, Policy, PolicyList
 from content_security_policy.constants import CSP_HEADER, CSP_RO_HEADER
 from content_security_policy.django.auto_src import AutoSrcDirective
-from content_security_policy.django.constants import CSP_CONFIG_NAME, CSP_RO_CONFIG_NAME
+from content_security_policy.django.constants import (
+    CSP_CONFIG_NAME,
+    CSP_NONCE_DIRECTIVES_NAME,
+    CSP_RO_CONFIG_NAME,
+)
 from content_security_policy.django.utils.settings import get_csp_setting
+from content_security_policy.exceptions import BadSourceExpression
+from content_security_policy.nonce import (
+    DEFAULT_NONCE_DIRECTIVES,
+    NonceTemplate,
+    new_nonce,
+)
+from content_security_policy.template import HOST, SCHEME, PolicyTemplate
+
+SettingPolicies = Tuple[Tuple[Directive | AutoSrcDirective, ...], ...]
+
+
+def _policy_lists(middleware: object) -> Dict[str, SettingPolicies]:
+    """
+    Get the policy lists of the CSP settings by the headers they are sent in.
+    """
+    policy_lists = {}
+    for config_name, header_name in (
+        (CSP_CONFIG_NAME, CSP_HEADER),
+        (CSP_RO_CONFIG_NAME, CSP_RO_HEADER),
+    ):
+        if getattr(settings, config_name, None):
+            policy_lists[header_name] = get_csp_setting(config_name)
+
+    if not policy_lists:
+        raise ImproperlyConfigured(
+            f"{middleware.__class__.__name__} used but neither {CSP_CONFIG_NAME} nor "
+            f"{CSP_RO_CONFIG_NAME} is set in settings."
+        )
+    return policy_lists
 
 
 class AutoCSPMiddleware:
@@ -28,22 +61,7 @@ class AutoCSPMiddleware:
             )
 
         self.get_response = get_response
-        self.policy_lists: Dict[
-            str, Tuple[Tuple[Directive | AutoSrcDirective, ...], ...]
-        ] = {}
-
-        for config_name, header_name in (
-            (CSP_CONFIG_NAME, CSP_HEADER),
-            (CSP_RO_CONFIG_NAME, CSP_RO_HEADER),
-        ):
-            if getattr(settings, config_name, None):
-                self.policy_lists[header_name] = get_csp_setting(config_name)
-
-        if not self.policy_lists:
-            raise ImproperlyConfigured(
-                f"{self.__class__.__name__} used but neither {CSP_CONFIG_NAME} nor "
-                f"{CSP_RO_CONFIG_NAME} is set in settings."
-            )
+        self.policy_lists = _policy_lists(self)
 
         for policy_list in self.policy_lists.values():
             for policy in policy_list:
@@ -60,6 +78,27 @@ class AutoCSPMiddleware:
         if hasattr(self, "observer"):
             self.observer.start()
 
+        # Policy lists without AutoSrcDirectives do not depend on the request, they
+        # are serialized once instead of on every response.
+        self.static_headers: Dict[str, str] = {}
+        # The others are compiled into templates for the scheme and host of requests,
+        # again when the files of their AutoSrcDirectives change.
+        self.auto_directives: Dict[str, Tuple[AutoSrcDirective, ...]] = {}
+        self.templates: Dict[str, Tuple[Tuple[int, ...], PolicyTemplate]] = {}
+        for header_name, policies in self.policy_lists.items():
+            auto_directives = tuple(
+                directive
+                for policy in policies
+                for directive in policy
+                if isinstance(directive, AutoSrcDirective)
+            )
+            if auto_directives:
+                self.auto_directives[header_name] = auto_directives
+            else:
+                self.static_headers[header_name] = str(
+                    self.render(policies, scheme="", host="")
+                )
+
     @staticmethod
     def render(policies, scheme: str, host: str):
         return PolicyList(
@@ -76,6 +115,26 @@ class AutoCSPMiddleware:
             )
         )
 
+    def template(self, header_name: str) -> PolicyTemplate:
+        """
+        Get the template for a header with AutoSrcDirectives, compile it if there is
+        none or the files of the directives changed since.
+        """
+        # Read before rendering, changes while rendering compile it again next time
+        versions = tuple(d.version for d in self.auto_directives[header_name])
+        try:
+            compiled_versions, template = self.templates[header_name]
+            if compiled_versions == versions:
+                return template
+        except KeyError:
+            pass
+        policy_list = self.render(
+            self.policy_lists[header_name], scheme=SCHEME, host=HOST
+        )
+        template = PolicyTemplate(policy_list)
+        self.templates[header_name] = versions, template
+        return template
+
     def __call__(self, request):
         response = self.get_response(request)
         scheme = request.scheme
@@ -84,7 +143,53 @@ class AutoCSPMiddleware:
         except KeyError:
             return HttpResponseBadRequest("Host Header Missing from request.")
 
-        for header, policies in self.policy_lists.items():
-            response[header] = self.render(policies, scheme, host)
+        for header in self.policy_lists:
+            try:
+                response[header] = self.static_headers[header]
+            except KeyError:
+                try:
+                    response[header] = self.template(header).render(scheme, host)
+                except BadSourceExpression:
+                    return HttpResponseBadRequest("Invalid Host Header.")
 
         return response
+
+
+class CSPNonceMiddleware:
+    """
+    Uses the CONTENT_SECURITY_POLICY setting to inject a Content-Security-Policy (CSP)
+    header with a new nonce for every request. The nonce is added to script-src-elem
+    and script-src (or the directive they fall back to), or to the directives in the
+    CONTENT_SECURITY_POLICY_NONCE_DIRECTIVES setting.
+    The nonce is available as request.csp_nonce, and as csp_nonce in templates with
+    the context processor content_security_policy.django.context_processors.csp_nonce.
+    Policies are serialized once, so they can not contain AutoSrcDirectives.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        directives = getattr(
+            settings, CSP_NONCE_DIRECTIVES_NAME, DEFAULT_NONCE_DIRECTIVES
+        )
+        self.templates: Dict[str, NonceTemplate] = {}
+        for header_name, policies in _policy_lists(self).items():
+            policy_list = []
+            for directives_of_policy in policies:
+                if any(isinstance(d, AutoSrcDirective) for d in directives_of_policy):
+                    raise ImproperlyConfigured(
+                        f"{self.__class__.__name__} can not render AutoSrcDirectives, "
+                        f"use {AutoCSPMiddleware.__name__} in development."
+                    )
+                policy_list.append(
+                    Policy(*cast(Tuple[Directive, ...], directives_of_policy))
+                )
+            self.templates[header_name] = NonceTemplate(
+                PolicyList(*policy_list), directives=directives
+            )
+
+    def __call__(self, request):
+        request.csp_nonce = nonce = new_nonce()
+        response = self.get_response(request)
+        for header, template in self.templates.items():
+            response[header] = template.render(nonce)
+        return response
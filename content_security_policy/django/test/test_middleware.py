@@ -1,6 +1,10 @@
+from pathlib import Path
+
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
-from django.test import Client, SimpleTestCase, override_settings
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, SimpleTestCase, override_settings
+from watchdog.events import FileCreatedEvent
 
 from content_security_policy.constants import CSP_HEADER, CSP_RO_HEADER
 from content_security_policy.directives import *
@@ -113,3 +117,62 @@ class AutoCSPMiddlewareTests(SimpleTestCase):
         response = client.get("/")
         self.assertEquals(response.headers[CSP_HEADER], str(expected_csp))
         self.assertEquals(response.headers[CSP_RO_HEADER], str(expected_csp_ro))
+
+    @override_settings(
+        DEBUG=True,
+        **{
+            CSP_CONFIG_NAME: TEST_CSP_SETTING,
+            CSP_RO_CONFIG_NAME: TEST_CSP_RO_SETTING,
+        },
+    )
+    def test_static_headers(self):
+        """
+        Policy lists without auto sources are serialized once.
+        """
+        middleware = AutoCSPMiddleware(lambda request: None)
+        middleware.observer.stop()
+        expected_csp_ro = AutoCSPMiddleware.render(
+            [TEST_CSP_RO_SETTING],
+            scheme="http",
+            host="testserver",
+        )
+        self.assertEqual(
+            middleware.static_headers, {CSP_RO_HEADER: str(expected_csp_ro)}
+        )
+
+    @override_settings(
+        DEBUG=True,
+        **{
+            CSP_CONFIG_NAME: TEST_CSP_SETTING,
+        },
+    )
+    def test_invalid_host(self):
+        """
+        Hosts are validated before they are rendered into the header.
+        """
+        middleware = AutoCSPMiddleware(lambda request: HttpResponse())
+        middleware.observer.stop()
+        for host in ("evil.test; script-src *", "*", "a b"):
+            with self.subTest(host):
+                request = RequestFactory().get("/", HTTP_HOST=host)
+                self.assertEqual(middleware(request).status_code, 400)
+
+    def test_template_invalidated(self):
+        """
+        Headers with auto sources are compiled once, and again when files change.
+        """
+        auto_src = AutoHostScriptSrc(watch_apps=settings.INSTALLED_APPS)
+        with self.settings(DEBUG=True, **{CSP_CONFIG_NAME: [auto_src]}):
+            middleware = AutoCSPMiddleware(lambda request: HttpResponse())
+        middleware.observer.stop()
+        template = middleware.template(CSP_HEADER)
+        self.assertIs(middleware.template(CSP_HEADER), template)
+
+        static_dir = next(d for d in auto_src.watch_dirs if d.name == "static")
+        auto_src.on_any_event(FileCreatedEvent(str(Path(static_dir) / "new.js")))
+        new_template = middleware.template(CSP_HEADER)
+        self.assertIsNot(new_template, template)
+        self.assertIn(
+            "http://testserver/static/new.js",
+            new_template.render(scheme="http", host="testserver"),
+        )
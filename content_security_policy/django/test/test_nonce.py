@@ -0,0 +1,90 @@
+import re
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.test import Client, SimpleTestCase, override_settings
+
+from content_security_policy.constants import CSP_HEADER, CSP_RO_HEADER
+from content_security_policy.directives import *
+from content_security_policy.django.auto_src import AutoHostScriptSrc
+from content_security_policy.django.constants import (
+    CSP_CONFIG_NAME,
+    CSP_NONCE_DIRECTIVES_NAME,
+    CSP_RO_CONFIG_NAME,
+)
+from content_security_policy.django.middleware import CSPNonceMiddleware
+from content_security_policy.values import *
+
+NONCE_MIDDLEWARE = [
+    "content_security_policy.django.middleware.CSPNonceMiddleware"
+    if m.endswith("AutoCSPMiddleware")
+    else m
+    for m in settings.MIDDLEWARE
+]
+
+TEST_CSP_SETTING = [
+    DefaultSrc(KeywordSource.self),
+    ScriptSrc(KeywordSource.strict_dynamic),
+    StyleSrc(KeywordSource.self),
+    ObjectSrc(NoneSrc),
+]
+
+TEST_CSP_RO_SETTING = [DefaultSrc(KeywordSource.self)]
+
+NONCE_ATTRIBUTE = re.compile(r'nonce="([^"]+)"')
+
+
+@override_settings(
+    MIDDLEWARE=NONCE_MIDDLEWARE,
+    **{CSP_CONFIG_NAME: TEST_CSP_SETTING, CSP_RO_CONFIG_NAME: TEST_CSP_RO_SETTING},
+)
+class CSPNonceMiddlewareTests(SimpleTestCase):
+    def get_nonce(self, response) -> str:
+        match = NONCE_ATTRIBUTE.search(response.content.decode())
+        assert match is not None
+        return match.group(1)
+
+    def test_nonce_in_headers_and_template(self):
+        response = Client().get("/nonce/")
+        nonce = self.get_nonce(response)
+        self.assertEqual(
+            response.headers[CSP_HEADER],
+            f"default-src 'self'; script-src 'strict-dynamic' 'nonce-{nonce}'; "
+            "style-src 'self'; object-src 'none'",
+        )
+        self.assertEqual(
+            response.headers[CSP_RO_HEADER], f"default-src 'self' 'nonce-{nonce}'"
+        )
+
+    def test_new_nonce_per_request(self):
+        client = Client()
+        nonces = {self.get_nonce(client.get("/nonce/")) for _ in range(10)}
+        self.assertEqual(len(nonces), 10)
+
+    @override_settings(**{CSP_NONCE_DIRECTIVES_NAME: (StyleSrc,)})
+    def test_nonce_directives(self):
+        response = Client().get("/nonce/")
+        nonce = self.get_nonce(response)
+        self.assertIn(f"style-src 'self' 'nonce-{nonce}'", response.headers[CSP_HEADER])
+        self.assertIn("script-src 'strict-dynamic';", response.headers[CSP_HEADER])
+
+    def test_no_middleware(self):
+        with self.settings(MIDDLEWARE=[]):
+            response = Client().get("/nonce/")
+        self.assertIn(b'nonce=""', response.content)
+
+    @override_settings(
+        **{
+            CSP_CONFIG_NAME: [
+                AutoHostScriptSrc(watch_apps=settings.INSTALLED_APPS),
+            ]
+        }
+    )
+    def test_auto_src(self):
+        with self.assertRaises(ImproperlyConfigured):
+            CSPNonceMiddleware(lambda request: None)
+
+    @override_settings(**{CSP_CONFIG_NAME: None, CSP_RO_CONFIG_NAME: None})
+    def test_no_setting(self):
+        with self.assertRaises(ImproperlyConfigured):
+            CSPNonceMiddleware(lambda request: None)
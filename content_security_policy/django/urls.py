@@ -1,7 +1,8 @@
 from django.urls import path
 
-from content_security_policy.django.views import simple_page
+from content_security_policy.django.views import nonce_page, simple_page
 
 urlpatterns = [
     path("", simple_page),
+    path("nonce/", nonce_page),
 ]
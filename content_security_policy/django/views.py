@@ -1,5 +1,13 @@
 from django.http import HttpRequest, HttpResponse
+from django.template import engines
 
 
 def simple_page(request: HttpRequest):
     return HttpResponse("Hello World")
+
+
+def nonce_page(request: HttpRequest):
+    template = engines["django"].from_string(
+        '<script nonce="{{ csp_nonce }}">console.log("Hello World")</script>'
+    )
+    return HttpResponse(template.render(request=request))
@@ -0,0 +1,357 @@
+"""
+Intersect the policies of a policy list into one policy that allows what all of them
+allow. Browsers enforce every policy of a response, so this is what is effectively
+allowed, see PolicyList.effective.
+"""
+__all__ = ["effective_policy", "intersect_sources"]
+
+from typing import *
+from urllib.parse import unquote
+
+from content_security_policy.base_classes import (
+    Directive,
+    Policy,
+    ValueItemType,
+    _canonical_value,
+)
+from content_security_policy.constants import NONE, SELF, WILDCARD
+from content_security_policy.directives import (
+    BaseUri,
+    FormAction,
+    FrameAncestors,
+    RequireTrustedTypesFor,
+    Sandbox,
+    TrustedTypes,
+    UnrecognizedDirective,
+    Webrtc,
+)
+from content_security_policy.matching import (
+    _DEFAULT_PORTS,
+    _FALLBACK_LISTS,
+    _HTTP_SCHEMES,
+    _SCRIPT_DIRECTIVES,
+    _STRICT_DYNAMIC,
+    NO_SOURCE,
+    SourceListMatcher,
+    _host_entry,
+    _HostEntry,
+    _matching_schemes,
+    fallback_directives,
+)
+from content_security_policy.values import (
+    HostSrc,
+    NoneSrc,
+    SchemeSrc,
+    TrustedTypesExpression,
+    TrustedTypesKeyword,
+    TrustedTypesPolicyName,
+    TrustedTypesSinkGroup,
+    TrustedTypesWildcard,
+    WebrtcValue,
+)
+
+_UNSAFE_INLINE = "'unsafe-inline'"
+# Prefixes of nonce and hash sources, which disable 'unsafe-inline'
+_NONCE_OR_HASH = ("'nonce-", "'sha256-", "'sha384-", "'sha512-")
+
+# Host sources without a scheme match URLs with the scheme of the protected resource
+# and its upgrades. For an HTTP(S) resource, these are at least https and at most http
+# and https URLs.
+_SCHEMES_AT_LEAST = frozenset(("https",))
+_SCHEMES_AT_MOST = _HTTP_SCHEMES
+
+# Schemes that 'self' matches on the host of the protected resource, besides its own
+_WEBSOCKET_SCHEMES = frozenset(("ws", "wss"))
+
+_ALLOW_DUPLICATES = "'allow-duplicates'"
+_BLOCK = "'block'"
+# Not a directive class of this library, parsed as an UnrecognizedDirective
+_UPGRADE_INSECURE_REQUESTS = "upgrade-insecure-requests"
+
+# Directives with a source list that do not fall back to other directives
+_OWN_SOURCE_LISTS = (BaseUri, FormAction, FrameAncestors)
+
+
+def _is_url_source(source: ValueItemType, canonical: str) -> bool:
+    return isinstance(source, (HostSrc, SchemeSrc)) or canonical == SELF
+
+
+def _effective_sources(
+    sources: Iterable[ValueItemType], script: bool
+) -> List[Tuple[str, ValueItemType]]:
+    """
+    Get the sources of a list that take effect, with their canonical forms. 'none' has
+    no sources, 'unsafe-inline' is ignored next to nonces and hashes, and URL sources
+    are ignored next to 'strict-dynamic' for scripts.
+    """
+    effective = [
+        (canonical, source)
+        for canonical, source in ((_canonical_value(s), s) for s in sources)
+        if canonical and canonical != NONE
+    ]
+    canonicals = {canonical for canonical, _ in effective}
+    strict_dynamic = script and _STRICT_DYNAMIC in canonicals
+    if strict_dynamic or any(c.startswith(_NONCE_OR_HASH) for c in canonicals):
+        effective = [item for item in effective if item[0] != _UNSAFE_INLINE]
+    if strict_dynamic:
+        effective = [item for item in effective if not _is_url_source(item[1], item[0])]
+    return effective
+
+
+def _port(entry: _HostEntry, scheme: str) -> Optional[int]:
+    return entry.port if entry.port is not None else _DEFAULT_PORTS.get(scheme)
+
+
+def _entry_covers(outer: _HostEntry, inner: _HostEntry) -> bool:
+    """
+    Check if every URL matched by inner is matched by outer, given the host-part of
+    outer covers the host-part of inner.
+    """
+    inner_schemes = _SCHEMES_AT_MOST if inner.schemes is None else inner.schemes
+    if outer.schemes is not None or inner.schemes is not None:
+        outer_schemes = _SCHEMES_AT_LEAST if outer.schemes is None else outer.schemes
+        if not inner_schemes <= outer_schemes:
+            return False
+
+    if not outer.any_port:
+        if inner.any_port:
+            return False
+        # e.g. https://a.com is covered by a.com:443
+        if any(_port(inner, s) != _port(outer, s) for s in inner_schemes):
+            return False
+
+    if not outer.path:
+        return True
+    outer_path, inner_path = unquote(outer.path), unquote(inner.path)
+    if outer_path.endswith("/"):
+        return inner_path.startswith(outer_path)
+    return inner_path == outer_path
+
+
+class _SourceIndex:
+    """
+    Hashed index of a source list to check if it allows everything another source
+    expression allows, without comparing the expression to every source of the list.
+    """
+
+    def __init__(self, sources: Iterable[Tuple[str, ValueItemType]] = ()):
+        """
+        :param sources: Effective sources with their canonical forms.
+        """
+        # Host sources, scheme sources, '*' and 'self' are indexed by the matcher
+        self._urls = SourceListMatcher(())
+        # Everything else is covered only by itself, e.g. nonces and keywords
+        self._tokens: Set[str] = set()
+        for canonical, source in sources:
+            self.add(source, canonical)
+
+    def add(self, source: ValueItemType, canonical: str):
+        self._urls._add(len(self._tokens), source)
+        self._tokens.add(canonical)
+
+    def covers(self, source: ValueItemType, canonical: str) -> bool:
+        urls = self._urls
+        if isinstance(source, SchemeSrc):
+            schemes = _matching_schemes(canonical[:-1])
+            return schemes <= urls._schemes.keys() or (
+                urls._wildcard != NO_SOURCE and schemes <= _HTTP_SCHEMES
+            )
+        if canonical == WILDCARD:
+            return urls._wildcard != NO_SOURCE
+        if isinstance(source, HostSrc):
+            host, entry = _host_entry(NO_SOURCE, canonical)
+            schemes = _SCHEMES_AT_MOST if entry.schemes is None else entry.schemes
+            if schemes <= urls._schemes.keys():
+                return True
+            if urls._wildcard != NO_SOURCE and (
+                entry.schemes is None or entry.schemes <= _HTTP_SCHEMES
+            ):
+                return True
+            candidates = (
+                urls._any_host if host == WILDCARD else urls._host_entries(host)
+            )
+            return any(_entry_covers(outer, entry) for outer in candidates)
+        if canonical == SELF:
+            # '*' matches the scheme of the protected resource, but 'self' also
+            # matches ws: and wss: URLs of its host
+            return urls._self != NO_SOURCE or (
+                urls._wildcard != NO_SOURCE
+                and _WEBSOCKET_SCHEMES <= urls._schemes.keys()
+            )
+        return canonical in self._tokens
+
+
+def intersect_sources(
+    source_lists: Sequence[Iterable[ValueItemType]], script: bool = False
+) -> List[ValueItemType]:
+    """
+    Intersect source lists: keep the sources of each list that every other list
+    allows entirely. The result never allows what one of the lists does not allow,
+    but it can miss partial overlaps, e.g. of https: and a.com.
+    :param source_lists: Values of source list directives.
+    :param script: Whether the lists are used for scripts, where 'strict-dynamic'
+        disables URL sources.
+    :return: Sources allowed by every list, empty if they have none in common.
+    """
+    if not source_lists:
+        return []
+    result = _effective_sources(source_lists[0], script)
+    for sources in source_lists[1:]:
+        other = _effective_sources(sources, script)
+        result_index, other_index = _SourceIndex(result), _SourceIndex(other)
+        kept: Dict[str, ValueItemType] = {}
+        for canonical, source in result:
+            if other_index.covers(source, canonical):
+                kept.setdefault(canonical, source)
+        for canonical, source in other:
+            if result_index.covers(source, canonical):
+                kept.setdefault(canonical, source)
+        result = list(kept.items())
+    return [source for _, source in result]
+
+
+def _source_list_directive(cls: Type[Directive], sources: List[ValueItemType]):
+    return cls(*sources) if sources else cls(NoneSrc)
+
+
+def _fetch_directives(policies: Sequence[Policy]) -> List[Directive]:
+    """
+    Intersect the effective fetch directives (with fallbacks) of the policies, and
+    keep the results that differ from their own fallback.
+    """
+    # Fallback lists are shortest for the directives others fall back to
+    classes = sorted(_FALLBACK_LISTS, key=lambda cls: len(fallback_directives(cls)))
+    kept: Dict[Type[Directive], List[ValueItemType]] = {}
+    canonicals: Dict[Type[Directive], FrozenSet[str]] = {}
+    for cls in classes:
+        source_lists = []
+        for policy in policies:
+            for fallback in fallback_directives(cls):
+                if policy._get_indices(fallback):
+                    source_lists.append(policy[fallback].values)
+                    break
+        if not source_lists:
+            continue
+        sources = intersect_sources(source_lists, script=cls in _SCRIPT_DIRECTIVES)
+        canonical = frozenset(map(_canonical_value, sources))
+        inherited = next(
+            (f for f in fallback_directives(cls)[1:] if f in kept),
+            None,
+        )
+        if inherited is None or canonicals[inherited] != canonical:
+            kept[cls] = sources
+            canonicals[cls] = canonical
+    return [_source_list_directive(cls, sources) for cls, sources in kept.items()]
+
+
+def _first(policies: Sequence[Policy], cls: Type[Directive]) -> List[Directive]:
+    # Browsers only enforce the first directive of each name in a policy
+    return [policy[cls] for policy in policies if policy._get_indices(cls)]
+
+
+def _sandbox(policies: Sequence[Policy]) -> Optional[Directive]:
+    sandboxes = _first(policies, Sandbox)
+    if not sandboxes:
+        return None
+    tokens = set.intersection(
+        *(
+            {_canonical_value(value) for value in sandbox.values}
+            for sandbox in sandboxes
+        )
+    )
+    return Sandbox(*(v for v in sandboxes[0].values if _canonical_value(v) in tokens))
+
+
+def _require_trusted_types_for(policies: Sequence[Policy]) -> Optional[Directive]:
+    # Every sink group that one of the policies requires Trusted Types for
+    sinks: Dict[str, TrustedTypesSinkGroup] = {}
+    for directive in _first(policies, RequireTrustedTypesFor):
+        for value in directive.values:
+            if isinstance(value, TrustedTypesSinkGroup):
+                sinks.setdefault(_canonical_value(value), value)
+    return RequireTrustedTypesFor(*sinks.values()) if sinks else None
+
+
+def _trusted_types(policies: Sequence[Policy]) -> Optional[Directive]:
+    """
+    Allow the policy names that every trusted-types directive allows, and duplicate
+    names only if all of them allow duplicates. Without a common name, no Trusted Types
+    policy can be created, which is 'none'.
+    """
+    directives = _first(policies, TrustedTypes)
+    if not directives:
+        return None
+    # None while every directive so far allows any name
+    names: Optional[Dict[str, TrustedTypesPolicyName]] = None
+    allow_duplicates = True
+    for directive in directives:
+        canonicals = {_canonical_value(value) for value in directive.values}
+        allow_duplicates = allow_duplicates and _ALLOW_DUPLICATES in canonicals
+        if WILDCARD in canonicals:
+            continue
+        own = {
+            _canonical_value(value): value
+            for value in directive.values
+            if isinstance(value, TrustedTypesPolicyName)
+        }
+        names = own if names is None else {c: v for c, v in names.items() if c in own}
+    values: List[TrustedTypesExpression] = (
+        [TrustedTypesWildcard] if names is None else list(names.values())
+    )
+    if not values:
+        return TrustedTypes(TrustedTypesKeyword.none)
+    if allow_duplicates:
+        values.append(TrustedTypesKeyword.allow_duplicates)
+    return TrustedTypes(*values)
+
+
+def _webrtc(policies: Sequence[Policy]) -> Optional[Directive]:
+    directives = _first(policies, Webrtc)
+    if not directives:
+        return None
+    blocked = any(
+        _canonical_value(value) == _BLOCK
+        for directive in directives
+        for value in directive.values
+    )
+    return Webrtc(WebrtcValue.block if blocked else WebrtcValue.allow)
+
+
+def _upgrade_insecure_requests(policies: Sequence[Policy]) -> Optional[Directive]:
+    if any(
+        directive.name.lower() == _UPGRADE_INSECURE_REQUESTS
+        for policy in policies
+        for directive in policy
+    ):
+        return UnrecognizedDirective(name=_UPGRADE_INSECURE_REQUESTS)
+    return None
+
+
+def effective_policy(policies: Sequence[Policy]) -> Policy:
+    """
+    Get a policy that allows what every one of the policies allows: fetch directives
+    (with their fallbacks), base-uri, form-action and frame-ancestors are intersected
+    with intersect_sources, sandbox tokens and trusted-types names with a set
+    intersection, require-trusted-types-for sink groups with a union. webrtc is
+    'block' if one of the policies blocks, and upgrade-insecure-requests is kept if
+    one of the policies has it. Directives that do not restrict what is allowed, like
+    reporting directives, are left out.
+    :param policies: Policies enforced together, e.g. of a PolicyList.
+    :return: Normalized policy.
+    """
+    directives = _fetch_directives(policies)
+    for cls in _OWN_SOURCE_LISTS:
+        source_lists = [directive.values for directive in _first(policies, cls)]
+        if source_lists:
+            sources = intersect_sources(source_lists)
+            directives.append(_source_list_directive(cls, sources))
+    for combine in (
+        _sandbox,
+        _require_trusted_types_for,
+        _trusted_types,
+        _webrtc,
+        _upgrade_insecure_requests,
+    ):
+        if (directive := combine(policies)) is not None:
+            directives.append(directive)
+    return Policy(*directives).normalized()
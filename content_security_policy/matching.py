@@ -0,0 +1,515 @@
+"""
+Evaluate policies against URLs, following "Does url match source list" of CSP3.
+https://w3c.github.io/webappsec-csp/#match-url-to-source-list
+"""
+__all__ = [
+    "SourceListMatcher",
+    "PolicyMatcher",
+    "effective_directive",
+    "fallback_directives",
+    "matcher_for",
+    "CheckResults",
+    "NO_SOURCE",
+    "INVALID_URL",
+]
+
+from array import array
+from typing import *
+from urllib.parse import unquote, urlsplit
+
+from content_security_policy.base_classes import (
+    Directive,
+    Policy,
+    ValueItemType,
+    _canonical_value,
+)
+from content_security_policy.constants import SELF, WILDCARD
+from content_security_policy.directives import (
+    ChildSrc,
+    ConnectSrc,
+    DefaultSrc,
+    FontSrc,
+    FrameSrc,
+    ImgSrc,
+    ManifestSrc,
+    MediaSrc,
+    ObjectSrc,
+    ScriptSrc,
+    ScriptSrcAttr,
+    ScriptSrcElem,
+    StyleSrc,
+    StyleSrcAttr,
+    StyleSrcElem,
+    WorkerSrc,
+)
+from content_security_policy.values import HostSrc, SchemeSrc
+
+_STRICT_DYNAMIC = "'strict-dynamic'"
+
+# Source positions reported for URLs that no source matches and for invalid URLs
+NO_SOURCE = -1
+INVALID_URL = -2
+
+# https://url.spec.whatwg.org/#default-port
+_DEFAULT_PORTS = {"ftp": 21, "http": 80, "https": 443, "ws": 80, "wss": 443}
+# https://url.spec.whatwg.org/#special-scheme, their URLs always have a path
+_SPECIAL_SCHEMES = frozenset(_DEFAULT_PORTS) | {"file"}
+_HTTP_SCHEMES = frozenset(("http", "https"))
+
+# https://w3c.github.io/webappsec-csp/#scheme-part-match
+# URL schemes matched by a scheme, e.g. http: also allows https
+_SCHEME_UPGRADES = {
+    "http": frozenset(("http", "https")),
+    "ws": frozenset(("ws", "wss", "http", "https")),
+    "wss": frozenset(("wss", "https")),
+}
+
+# https://w3c.github.io/webappsec-csp/#effective-directive-for-a-request
+_DESTINATION_DIRECTIVES: Dict[str, Optional[Type[Directive]]] = {
+    "": ConnectSrc,
+    "json": ConnectSrc,
+    "webidentity": ConnectSrc,
+    "manifest": ManifestSrc,
+    "object": ObjectSrc,
+    "embed": ObjectSrc,
+    "frame": FrameSrc,
+    "iframe": FrameSrc,
+    "audio": MediaSrc,
+    "track": MediaSrc,
+    "video": MediaSrc,
+    "font": FontSrc,
+    "image": ImgSrc,
+    "style": StyleSrcElem,
+    "script": ScriptSrcElem,
+    "xslt": ScriptSrcElem,
+    "audioworklet": ScriptSrcElem,
+    "paintworklet": ScriptSrcElem,
+    "serviceworker": WorkerSrc,
+    "sharedworker": WorkerSrc,
+    "worker": WorkerSrc,
+    # Not governed by fetch directives
+    "document": None,
+    "report": None,
+}
+
+# https://w3c.github.io/webappsec-csp/#directive-fallback-list
+_FALLBACK_LISTS: Dict[Type[Directive], Tuple[Type[Directive], ...]] = {
+    ScriptSrcElem: (ScriptSrcElem, ScriptSrc, DefaultSrc),
+    ScriptSrcAttr: (ScriptSrcAttr, ScriptSrc, DefaultSrc),
+    StyleSrcElem: (StyleSrcElem, StyleSrc, DefaultSrc),
+    StyleSrcAttr: (StyleSrcAttr, StyleSrc, DefaultSrc),
+    WorkerSrc: (WorkerSrc, ChildSrc, ScriptSrc, DefaultSrc),
+    ConnectSrc: (ConnectSrc, DefaultSrc),
+    ManifestSrc: (ManifestSrc, DefaultSrc),
+    ObjectSrc: (ObjectSrc, DefaultSrc),
+    FrameSrc: (FrameSrc, ChildSrc, DefaultSrc),
+    MediaSrc: (MediaSrc, DefaultSrc),
+    FontSrc: (FontSrc, DefaultSrc),
+    ImgSrc: (ImgSrc, DefaultSrc),
+    ChildSrc: (ChildSrc, DefaultSrc),
+    ScriptSrc: (ScriptSrc, DefaultSrc),
+    StyleSrc: (StyleSrc, DefaultSrc),
+    DefaultSrc: (DefaultSrc,),
+}
+
+# Effective directives whose pre-request check honours 'strict-dynamic'
+# https://w3c.github.io/webappsec-csp/#script-pre-request
+_SCRIPT_DIRECTIVES = frozenset((ScriptSrcElem, ScriptSrc))
+
+
+class _Url(NamedTuple):
+    scheme: str
+    # None for URLs without a host, e.g. data: and blob: URLs
+    host: Optional[str]
+    # None for the default port of the scheme
+    port: Optional[int]
+    path: str
+
+
+def _parse_url(url: str) -> _Url:
+    """
+    :raises ValueError: If url is not absolute or has an invalid port.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    if not scheme:
+        raise ValueError(f"URL '{url}' is not absolute.")
+    port = parts.port
+    if port == _DEFAULT_PORTS.get(scheme):
+        port = None
+    path = parts.path
+    if not path and scheme in _SPECIAL_SCHEMES:
+        path = "/"
+    return _Url(scheme, parts.hostname, port, path)
+
+
+def _matching_schemes(scheme: str) -> FrozenSet[str]:
+    return _SCHEME_UPGRADES.get(scheme, frozenset((scheme,)))
+
+
+# https://w3c.github.io/webappsec-csp/#match-paths
+def _path_part_match(expected: str, path: str) -> bool:
+    if not expected or (expected == "/" and not path):
+        return True
+    exact = not expected.endswith("/")
+    expected_pieces = expected.split("/")
+    pieces = path.split("/")
+    if len(expected_pieces) > len(pieces):
+        return False
+    if exact and len(expected_pieces) != len(pieces):
+        return False
+    if not exact:
+        expected_pieces.pop()
+    return all(
+        unquote(expected_piece) == unquote(piece)
+        for expected_piece, piece in zip(expected_pieces, pieces)
+    )
+
+
+# https://w3c.github.io/webappsec-csp/#match-url-to-source-expression ('self')
+def _self_matches(origin: _Url, url: _Url) -> bool:
+    if origin.host is None or origin.host != url.host or origin.port != url.port:
+        return False
+    return (
+        origin.scheme == url.scheme
+        or url.scheme in ("https", "wss")
+        or (origin.scheme == "http" and url.scheme == "ws")
+    )
+
+
+class _HostEntry(NamedTuple):
+    # Position of the host source in the source list
+    position: int
+    # URL schemes the expression matches, None to use the scheme of the origin
+    schemes: Optional[FrozenSet[str]]
+    any_port: bool
+    # None for the default port of the URL's scheme
+    port: Optional[int]
+    path: str
+
+    def matches(self, url: _Url, origin: Optional[_Url]) -> bool:
+        if self.schemes is None:
+            if origin is None or url.scheme not in _matching_schemes(origin.scheme):
+                return False
+        elif url.scheme not in self.schemes:
+            return False
+
+        # https://w3c.github.io/webappsec-csp/#match-ports
+        if not self.any_port and self.port != url.port:
+            if url.port is not None or self.port != _DEFAULT_PORTS.get(url.scheme):
+                return False
+        return _path_part_match(self.path, url.path)
+
+
+def _host_entry(index: int, host_source: str) -> Tuple[str, _HostEntry]:
+    """
+    Split a canonical host-source into its host-part and the rest of the expression.
+    """
+    schemes = None
+    scheme_end = host_source.find("://")
+    if scheme_end != -1 and "/" not in host_source[:scheme_end]:
+        schemes = _matching_schemes(host_source[:scheme_end])
+        host_source = host_source[scheme_end + 3 :]
+
+    path_start = host_source.find("/")
+    if path_start == -1:
+        path_start = len(host_source)
+    host_port, path = host_source[:path_start], host_source[path_start:]
+    host, _, port = host_port.partition(":")
+    entry = _HostEntry(
+        position=index,
+        schemes=schemes,
+        any_port=port == WILDCARD,
+        port=int(port) if port.isdigit() else None,
+        path=path,
+    )
+    return host, entry
+
+
+class _LabelTrie:
+    """
+    Wildcard host-parts like *.example.com, stored by their labels in reverse order
+    (com, example) to find all wildcards matching a host in one walk.
+    """
+
+    __slots__ = ("children", "entries")
+
+    def __init__(self):
+        self.children: Dict[str, _LabelTrie] = {}
+        self.entries: List[_HostEntry] = []
+
+    def add(self, domain: str, entry: _HostEntry):
+        node = self
+        for label in reversed(domain.split(".")):
+            node = node.children.setdefault(label, _LabelTrie())
+        node.entries.append(entry)
+
+    def find(self, host: str) -> Iterator[_HostEntry]:
+        node = self
+        # A wildcard matches at least one label in front of its domain
+        for label in reversed(host.split(".")[1:]):
+            node = node.children.get(label)  # type: ignore
+            if node is None:
+                return
+            yield from node.entries
+
+
+class SourceListMatcher:
+    """
+    A source list compiled for matching URLs. Host sources are indexed by their
+    host-part: exact hosts in a dict and wildcards in a trie of labels, so a check
+    takes about the same time for a handful of host sources as for thousands.
+    Nonces, hashes and keywords other than 'self' do not match URLs and are ignored.
+    """
+
+    def __init__(self, sources: Iterable[ValueItemType]):
+        """
+        :param sources: Values of a source list directive, e.g. directive.values.
+            Matches are reported by their position in sources.
+        """
+        # Positions of '*' and 'self', NO_SOURCE if they are not in the list
+        self._wildcard = NO_SOURCE
+        self._self = NO_SOURCE
+        self.strict_dynamic = False
+        # Position of the first scheme source matching each URL scheme
+        self._schemes: Dict[str, int] = {}
+        self._hosts: Dict[str, List[_HostEntry]] = {}
+        self._wildcard_hosts = _LabelTrie()
+        # Host sources with host-part *, e.g. https://*
+        self._any_host: List[_HostEntry] = []
+
+        for index, source in enumerate(sources):
+            self._add(index, source)
+
+    def _add(self, index: int, source: ValueItemType):
+        canonical = _canonical_value(source)
+        if isinstance(source, SchemeSrc):
+            for scheme in _matching_schemes(canonical[:-1]):
+                self._schemes.setdefault(scheme, index)
+        elif canonical == WILDCARD:
+            if self._wildcard == NO_SOURCE:
+                self._wildcard = index
+        elif isinstance(source, HostSrc):
+            host, entry = _host_entry(index, canonical)
+            if host == WILDCARD:
+                self._any_host.append(entry)
+            elif host.startswith("*."):
+                self._wildcard_hosts.add(host[2:], entry)
+            else:
+                self._hosts.setdefault(host, []).append(entry)
+        elif canonical == SELF:
+            if self._self == NO_SOURCE:
+                self._self = index
+        elif canonical == _STRICT_DYNAMIC:
+            self.strict_dynamic = True
+
+    def _host_entries(self, host: str) -> Iterator[_HostEntry]:
+        yield from self._hosts.get(host, ())
+        yield from self._wildcard_hosts.find(host)
+        yield from self._any_host
+
+    def matches(self, url: str, origin: Optional[str] = None) -> bool:
+        """
+        Check if a URL matches any source expression of the list.
+        :param url: Absolute URL.
+        :param origin: Origin of the protected resource, e.g. "https://example.com".
+            Needed for 'self' and host sources without a scheme, which never match
+            without it.
+        :return: Whether the URL matches.
+        :raises ValueError: If a URL is not absolute or has an invalid port.
+        """
+        return self.match_index(url, origin) != NO_SOURCE
+
+    def match_index(self, url: str, origin: Optional[str] = None) -> int:
+        """
+        Like matches, but get the position of the first source matching the URL.
+        :return: Position in the sources, NO_SOURCE if none matches.
+        """
+        return self._match_index(
+            _parse_url(url), _parse_url(origin) if origin is not None else None
+        )
+
+    def _match_index(self, url: _Url, origin: Optional[_Url]) -> int:
+        indices = [self._schemes.get(url.scheme, NO_SOURCE)]
+        if self._wildcard != NO_SOURCE and (
+            url.scheme in _HTTP_SCHEMES
+            or (origin is not None and url.scheme == origin.scheme)
+        ):
+            indices.append(self._wildcard)
+        if self._self != NO_SOURCE and origin is not None:
+            if _self_matches(origin, url):
+                indices.append(self._self)
+        if url.host is not None:
+            indices += (
+                entry.position
+                for entry in self._host_entries(url.host)
+                if entry.matches(url, origin)
+            )
+        return min(
+            (index for index in indices if index != NO_SOURCE), default=NO_SOURCE
+        )
+
+    def _path_dependent(self, host: Optional[str]) -> bool:
+        """
+        Whether the result for URLs with this host can depend on their path.
+        """
+        return host is not None and any(
+            entry.path for entry in self._host_entries(host)
+        )
+
+    def match_indices(
+        self, urls: Iterable[str], origin: Optional[str] = None
+    ) -> "array[int]":
+        """
+        Like match_index for many URLs, e.g. the blocked URIs of violation reports.
+        Every distinct URL is parsed once and every distinct scheme, host and port is
+        matched once, unless host sources with paths apply to it.
+        :param urls: Absolute URLs.
+        :param origin: Origin of the protected resource, see matches.
+        :return: Position of the first matching source per URL, NO_SOURCE if none
+            matches and INVALID_URL if the URL is not absolute or has an invalid port.
+        """
+        parsed_origin = _parse_url(origin) if origin is not None else None
+        indices = array("i")
+        by_url: Dict[str, int] = {}
+        # Results by scheme, host and port, None if they depend on the path
+        by_host: Dict[Tuple[str, Optional[str], Optional[int]], Optional[int]] = {}
+
+        for url in urls:
+            index = by_url.get(url)
+            if index is None:
+                try:
+                    parsed = _parse_url(url)
+                except ValueError:
+                    index = INVALID_URL
+                else:
+                    key = (parsed.scheme, parsed.host, parsed.port)
+                    if key not in by_host:
+                        by_host[key] = (
+                            None
+                            if self._path_dependent(parsed.host)
+                            else self._match_index(parsed, parsed_origin)
+                        )
+                    index = by_host[key]
+                    if index is None:
+                        index = self._match_index(parsed, parsed_origin)
+                by_url[url] = index
+            indices.append(index)
+        return indices
+
+
+# Source list of a directive whose sources do not apply to URLs
+_NO_MATCH = SourceListMatcher(())
+
+
+def effective_directive(destination: str) -> Optional[Type[Directive]]:
+    """
+    Get the directive that governs requests for a destination.
+    :param destination: Request destination as defined by Fetch, e.g. "script" or
+        "image". The empty string stands for fetch() and XMLHttpRequest.
+    :return: Directive class, None if no fetch directive governs the destination.
+    :raises ValueError: If the destination is not known.
+    """
+    try:
+        return _DESTINATION_DIRECTIVES[destination]
+    except KeyError:
+        raise ValueError(f"Unknown request destination '{destination}'.")
+
+
+def fallback_directives(
+    directive_class: Type[Directive],
+) -> Tuple[Type[Directive], ...]:
+    """
+    Get the directives that are used, in this order, if a policy does not have
+    directive_class, e.g. (ScriptSrcElem, ScriptSrc, DefaultSrc) for ScriptSrcElem.
+    :param directive_class: Fetch directive class.
+    :return: Tuple starting with directive_class.
+    """
+    return _FALLBACK_LISTS.get(directive_class, (directive_class,))
+
+
+class CheckResults(NamedTuple):
+    """
+    Results of PolicyMatcher.check_many, one array item per URL.
+    """
+
+    # Directive the URLs were checked against, None if the policy does not govern
+    # the destination
+    directive: Optional[Directive]
+    # 1 if the URL is allowed, 0 if not
+    allowed: "array[int]"
+    # Position of the first matching source in directive.values, NO_SOURCE if no
+    # source matches and INVALID_URL if the URL could not be parsed
+    sources: "array[int]"
+
+
+class PolicyMatcher:
+    """
+    A policy compiled for checking requests. Source lists are compiled on first use.
+    """
+
+    def __init__(self, policy: Policy):
+        # Effective directive of each fetch directive type in the policy. The policy
+        # itself is not kept, it caches this matcher.
+        self._directives: Dict[Type[Directive], Directive] = {
+            cls: policy[cls] for cls in _FALLBACK_LISTS if policy._get_indices(cls)
+        }
+        # Compiled source lists by the types in _directives
+        self._matchers: Dict[Type[Directive], SourceListMatcher] = {}
+
+    def _effective(
+        self, destination: str
+    ) -> Tuple[Optional[Directive], Optional[SourceListMatcher]]:
+        """
+        Get the directive that governs a destination and its compiled source list.
+        """
+        directive_class = effective_directive(destination)
+        if directive_class is None:
+            return None, None
+        for cls in fallback_directives(directive_class):
+            directive = self._directives.get(cls)
+            if directive is not None:
+                matcher = self._matchers.get(cls)
+                if matcher is None:
+                    matcher = self._matchers[cls] = SourceListMatcher(directive.values)
+                # With 'strict-dynamic', only nonces, hashes and trust propagation
+                # allow scripts. Parser-inserted scripts are blocked regardless of
+                # their URL, so no source can match.
+                if directive_class in _SCRIPT_DIRECTIVES and matcher.strict_dynamic:
+                    matcher = _NO_MATCH
+                return directive, matcher
+        return None, None
+
+    def allows(
+        self, url: str, destination: str = "", origin: Optional[str] = None
+    ) -> bool:
+        """
+        Check if the policy allows a request, see Policy.allows.
+        """
+        _, matcher = self._effective(destination)
+        return matcher is None or matcher.matches(url, origin)
+
+    def check_many(
+        self, urls: Iterable[str], destination: str = "", origin: Optional[str] = None
+    ) -> CheckResults:
+        """
+        Check many requests for the same destination, see Policy.check_many.
+        """
+        directive, matcher = self._effective(destination)
+        if matcher is None:
+            sources = array("i", (NO_SOURCE for _ in urls))
+            return CheckResults(directive, array("b", [1]) * len(sources), sources)
+        sources = matcher.match_indices(urls, origin)
+        allowed = array("b", (index >= 0 for index in sources))
+        return CheckResults(directive, allowed, sources)
+
+
+def matcher_for(policy: Policy) -> PolicyMatcher:
+    """
+    Get the compiled matcher of a policy, compiling it on first use. The matcher is
+    cached on the policy instance, not shared by equal policies: the directives and
+    source positions it reports are those of the policy it was compiled from.
+    """
+    if policy._matcher_cache is None:
+        policy._matcher_cache = PolicyMatcher(policy)
+    return policy._matcher_cache
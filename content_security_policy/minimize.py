@@ -0,0 +1,140 @@
+"""
+Shrink policies without changing what they allow, see Policy.minimized.
+"""
+__all__ = ["MinimizedPolicy", "minimize_sources", "minimized_policy"]
+
+from typing import *
+
+from content_security_policy.base_classes import (
+    Directive,
+    Policy,
+    ValueItemType,
+    _canonical_value,
+)
+from content_security_policy.constants import WILDCARD
+from content_security_policy.directives import (
+    DefaultSrc,
+    FrameAncestors,
+    SourceListDirective,
+)
+from content_security_policy.intersection import _SCHEMES_AT_MOST, _SourceIndex
+from content_security_policy.matching import (
+    _FALLBACK_LISTS,
+    NO_SOURCE,
+    _host_entry,
+    _matching_schemes,
+    fallback_directives,
+)
+from content_security_policy.values import HostSrc, SchemeSrc
+
+
+class MinimizedPolicy(NamedTuple):
+    policy: Policy
+    # Length of the header value in bytes
+    size: int
+    # Whether size is at most the requested maximum, True without a maximum
+    within_budget: bool
+
+
+def _generality(canonical: str, source: ValueItemType) -> Tuple:
+    """
+    Sort key that puts sources before the sources they can cover, e.g. https: before
+    https://a.com and *.a.com before x.a.com before x.a.com/path.
+    """
+    if canonical == WILDCARD:
+        return (0,)
+    if isinstance(source, SchemeSrc):
+        return (1, -len(_matching_schemes(canonical[:-1])))
+    if isinstance(source, HostSrc):
+        host, entry = _host_entry(NO_SOURCE, canonical)
+        schemes = _SCHEMES_AT_MOST if entry.schemes is None else entry.schemes
+        return (
+            2,
+            not host.startswith("*"),
+            0 if host == WILDCARD else host.count("."),
+            not entry.any_port,
+            len(entry.path),
+            -len(schemes),
+            entry.schemes is None,
+        )
+    return (3,)
+
+
+def minimize_sources(sources: Iterable[ValueItemType]) -> List[ValueItemType]:
+    """
+    Drop sources that other sources of the list allow entirely, e.g. x.a.com next to
+    *.a.com, https://a.com next to https:, and duplicates. Sources are checked against
+    a hashed index of the sources kept so far, most general first.
+    :param sources: Values of a source list directive.
+    :return: Remaining sources, in their original order.
+    """
+    items = [(_canonical_value(source), source) for source in sources]
+    kept = []
+    index = _SourceIndex()
+    for i in sorted(range(len(items)), key=lambda i: _generality(*items[i])):
+        canonical, source = items[i]
+        if canonical and not index.covers(source, canonical):
+            index.add(source, canonical)
+            kept.append(i)
+    return [items[i][1] for i in sorted(kept)]
+
+
+def _effective_values(
+    values: Dict[Type[Directive], FrozenSet[str]]
+) -> Dict[Type[Directive], Optional[FrozenSet[str]]]:
+    return {
+        cls: next((values[f] for f in fallback_directives(cls) if f in values), None)
+        for cls in _FALLBACK_LISTS
+    }
+
+
+def _without_implied(directives: List[Directive]) -> List[Directive]:
+    """
+    Drop fetch directives that allow the same as the directive they fall back to,
+    if that does not change the effective source list of any fetch directive.
+    default-src is kept, it also applies to directives this library does not know.
+    """
+    values = {
+        type(directive): frozenset(map(_canonical_value, directive.values))
+        for directive in directives
+        if type(directive) in _FALLBACK_LISTS
+    }
+    effective = _effective_values(values)
+    # Directives that fall back to others first
+    for cls in sorted(values, key=lambda cls: -len(fallback_directives(cls))):
+        if cls is DefaultSrc:
+            continue
+        remaining = {c: v for c, v in values.items() if c is not cls}
+        if _effective_values(remaining) == effective:
+            values = remaining
+    return [
+        directive
+        for directive in directives
+        if type(directive) not in _FALLBACK_LISTS or type(directive) in values
+    ]
+
+
+def minimized_policy(
+    policy: Policy, max_bytes: Optional[int] = None
+) -> MinimizedPolicy:
+    """
+    Minimize a policy, see Policy.minimized.
+    """
+    effective: Dict[str, Directive] = {}
+    for directive in policy.directives:
+        effective.setdefault(directive.name.lower(), directive)
+
+    directives = []
+    for directive in effective.values():
+        if isinstance(directive, (SourceListDirective, FrameAncestors)):
+            cls: Type[Directive] = type(directive)
+            directive = cls(
+                *minimize_sources(directive.values), _name=directive._instance_name
+            )
+        directives.append(directive.normalized())
+
+    minimized = Policy(*_without_implied(directives))
+    size = len(minimized.to_header_bytes())
+    return MinimizedPolicy(
+        minimized, size, within_budget=max_bytes is None or size <= max_bytes
+    )
@@ -0,0 +1,164 @@
+"""
+Per-request nonces. NoncePool generates them and NonceTemplate serializes a policy
+once, so that the header for a request is a single join with the nonce.
+"""
+__all__ = ["DEFAULT_NONCE_DIRECTIVES", "NoncePool", "NonceTemplate", "new_nonce"]
+
+import os
+import threading
+import weakref
+from base64 import b64encode
+from typing import *
+
+from content_security_policy.base_classes import Directive, Policy, PolicyList
+from content_security_policy.directives import (
+    ScriptSrc,
+    ScriptSrcElem,
+    SourceListDirective,
+)
+from content_security_policy.matching import fallback_directives
+from content_security_policy.values import NonceSrc
+
+# At least 128 bits, see https://w3c.github.io/webappsec-csp/#security-nonces
+_MIN_NONCE_BYTES = 16
+
+# Nonce that is replaced when rendering a template. NUL can not be part of a header,
+# so it can not clash with other parts of the policy.
+_SLOT = "\x00"
+_SLOT_SOURCE = NonceSrc("", _value=f"'nonce-{_SLOT}'")
+
+# Script elements use script-src-elem, browsers without support for it script-src
+DEFAULT_NONCE_DIRECTIVES = (ScriptSrcElem, ScriptSrc)
+
+# Pools of this process, their buffered nonces must not be reused in forked children
+_POOLS: "weakref.WeakSet[NoncePool]" = weakref.WeakSet()
+
+
+class NoncePool:
+    """
+    Nonces from the operating system's CSPRNG (os.urandom), read for many nonces at
+    once instead of once per nonce. Thread-safe, and a forked child process discards
+    the nonces buffered by its parent.
+    """
+
+    def __init__(self, size: int = 18, batch: int = 256):
+        """
+        :param size: Random bytes per nonce, at least 16. Multiples of 3 encode to
+            base64 without padding, 18 bytes to 24 characters.
+        :param batch: Number of nonces read at once.
+        """
+        if size < _MIN_NONCE_BYTES:
+            raise ValueError(f"Nonces need at least {_MIN_NONCE_BYTES} random bytes.")
+        if batch < 1:
+            raise ValueError("batch must be at least 1.")
+        self.size = size
+        self.batch = batch
+        self._reset()
+        _POOLS.add(self)
+
+    def _reset(self):
+        self._nonces: List[str] = []
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        size = self.size
+        data = os.urandom(size * self.batch)
+        if size % 3 == 0:
+            # Without padding, the nonces are slices of one encoded string
+            encoded = b64encode(data).decode("ascii")
+            length = size // 3 * 4
+            self._nonces = [
+                encoded[i : i + length] for i in range(0, len(encoded), length)
+            ]
+        else:
+            self._nonces = [
+                b64encode(data[i : i + size]).decode("ascii")
+                for i in range(0, len(data), size)
+            ]
+
+    def __call__(self) -> str:
+        """
+        :return: A new base64 encoded nonce.
+        """
+        with self._lock:
+            if not self._nonces:
+                self._refill()
+            return self._nonces.pop()
+
+
+def _reset_pools():
+    for pool in _POOLS:
+        pool._reset()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_pools)
+
+new_nonce = NoncePool()
+
+
+def _with_slot(policy: Policy, directives: Sequence[Type[Directive]]) -> Policy:
+    """
+    Add the nonce slot to the directives (or their fallbacks) of a policy. Directives
+    without a directive to fall back to are not restricted, a nonce would restrict
+    them, so they are left out.
+    """
+    indices = set()
+    for cls in directives:
+        for fallback in fallback_directives(cls):
+            if found := policy._get_indices(fallback):
+                indices.add(found[0])
+                break
+    if not indices:
+        return policy
+    new_directives = list(policy.directives)
+    for i in indices:
+        # union replaces 'none', which can not be combined with other sources
+        directive = cast(SourceListDirective, new_directives[i])
+        new_directives[i] = directive.union((_SLOT_SOURCE,))
+    return Policy(*new_directives, _separators=policy._separators)
+
+
+class NonceTemplate:
+    """
+    Policy or policy list serialized once with a nonce slot in the directives that
+    need a nonce. Rendering the header for a request joins the fragments around the
+    slot with the nonce, without creating any directives or policies.
+    """
+
+    __slots__ = ("policy", "_fragments")
+
+    def __init__(
+        self,
+        policy: Union[Policy, PolicyList],
+        directives: Sequence[Type[Directive]] = DEFAULT_NONCE_DIRECTIVES,
+    ):
+        """
+        :param policy: Policy or policy list without the nonce.
+        :param directives: Directives that get the nonce. If a policy does not have one
+            of them, the directive it falls back to gets the nonce, e.g. default-src.
+        """
+        if _SLOT in str(policy):
+            raise ValueError("Policies with NUL characters can not be templates.")
+        self.policy = policy
+        if isinstance(policy, PolicyList):
+            whitespace = policy._whitespace or (None, None)
+            header = str(
+                PolicyList(
+                    *(_with_slot(p, directives) for p in policy),
+                    _separators=policy._separators,
+                    _head=whitespace[0],
+                    _tail=whitespace[1],
+                )
+            )
+        else:
+            header = str(_with_slot(policy, directives))
+        self._fragments = header.split(_SLOT)
+
+    def render(self, nonce: str) -> str:
+        """
+        :param nonce: Base64 encoded nonce, e.g. from a NoncePool. It is not
+            validated, it must not come from user input.
+        :return: Header value with the nonce.
+        """
+        return nonce.join(self._fragments)
@@ -0,0 +1,105 @@
+__all__ = ["parse_parallel"]
+
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from os import cpu_count
+from typing import *
+
+from content_security_policy.parse import ParseLimits, ParseResult, iter_policy_lists
+
+ResultType = TypeVar("ResultType")
+
+
+def _parse_chunk(
+    start: int,
+    headers: List[str],
+    lazy: bool,
+    map_result: Optional[Callable[[ParseResult], Any]],
+    limits: Optional[ParseLimits],
+) -> List[Any]:
+    """
+    Parse a chunk of headers in a worker process.
+    """
+    results = []
+    for result in iter_policy_lists(headers, lazy=lazy, limits=limits):
+        result = result._replace(position=start + result.position)
+        results.append(result if map_result is None else map_result(result))
+    return results
+
+
+@overload
+def parse_parallel(
+    headers: Iterable[str],
+    chunk_size: int = ...,
+    max_workers: Optional[int] = ...,
+    lazy: bool = ...,
+    map_result: None = ...,
+    limits: Optional[ParseLimits] = ...,
+) -> Iterator[ParseResult]:
+    ...
+
+
+@overload
+def parse_parallel(
+    headers: Iterable[str],
+    chunk_size: int = ...,
+    max_workers: Optional[int] = ...,
+    lazy: bool = ...,
+    map_result: Callable[[ParseResult], ResultType] = ...,
+    limits: Optional[ParseLimits] = ...,
+) -> Iterator[ResultType]:
+    ...
+
+
+def parse_parallel(
+    headers: Iterable[str],
+    chunk_size: int = 1000,
+    max_workers: Optional[int] = None,
+    lazy: bool = False,
+    map_result: Optional[Callable[[ParseResult], Any]] = None,
+    limits: Optional[ParseLimits] = None,
+) -> Iterator[Any]:
+    """
+    Parse policy lists in a pool of processes, in chunks of chunk_size headers.
+    Results are the same as from iter_policy_lists and generated in input order.
+    Only a few chunks per worker are in flight at any time, so headers can be a stream
+    of arbitrary length.
+
+    Parsed objects are pickled to get them back from the workers. If you only need
+    some aggregate of them, pass map_result to compute it in the workers and only
+    transfer that. With lazy=True, a policy is transferred as its string and
+    directives are parsed on access in the parent process.
+    :param headers: Serialized policy lists.
+    :param chunk_size: Number of headers sent to a worker at once.
+    :param max_workers: Number of processes, defaults to the number of CPUs.
+    :param lazy: Parse into LazyPolicy instances, see policy_list_from_string.
+    :param map_result: Picklable function (e.g. module level) that is called with
+        each ParseResult in the worker. Its return value is generated instead of the
+        ParseResult.
+    :param limits: Maximum sizes, see ParseLimits.
+    :return: Iterator of ParseResults or values returned by map_result.
+    """
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be positive, not {chunk_size}.")
+    max_workers = max_workers or cpu_count() or 1
+
+    headers_it = iter(headers)
+    pending: Deque[Future] = deque()
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        start = 0
+        while True:
+            while len(pending) < 2 * max_workers:
+                chunk = list(islice(headers_it, chunk_size))
+                if not chunk:
+                    break
+                pending.append(
+                    executor.submit(
+                        _parse_chunk, start, chunk, lazy, map_result, limits
+                    )
+                )
+                start += len(chunk)
+
+            if not pending:
+                return
+            yield from pending.popleft().result()
@@ -1,34 +1,51 @@
 __all__ = [
+    "LazyPolicy",
+    "ParseLimits",
+    "ParseResult",
     "value_item_from_string",
     "directive_from_string",
     "policy_from_string",
     "policy_list_from_string",
+    "policy_from_bytes",
+    "policy_list_from_bytes",
+    "iter_policy_lists",
+    "iter_policy_lists_from_file",
 ]
 
+from functools import partial
+from sys import intern
 from typing import *
+from weakref import WeakValueDictionary
 
 from content_security_policy import *
-from content_security_policy.exceptions import NoSuchDirective, ParsingError
+from content_security_policy.base_classes import _LOWER_CASE_DIRECTIVE_REGISTER
 from content_security_policy.patterns import (
-    DIRECTIVE_SEPARATOR,
-    POLICY_SEPARATOR,
+    POLICY_LIST_SCANNER,
+    POLICY_LIST_SCANNER_BYTES,
+    POLICY_SCANNER,
+    POLICY_SCANNER_BYTES,
+    SPLIT_DIRECTIVES,
+    SPLIT_POLICIES,
+    SPLIT_POLICIES_BYTES,
     VALUE_ITEM_SEPARATOR,
-    WHITESPACE_HEAD,
+    WHITESPACE_CHARS,
 )
 
 _PARSING_RULES: Dict[Type[Directive], Tuple[Type[ValueItem], ...]] = {
     UnrecognizedDirective: tuple(),
+    # SchemeSrc and HostSrc never match the same string, SchemeSrc goes first because
+    # its _suffix rules it out cheaply for most strings.
     SourceListDirective: (
         NoneSrc,
         KeywordSource,
         HashSrc,
         NonceSrc,
-        HostSrc,
         SchemeSrc,
+        HostSrc,
     ),
     Webrtc: (WebrtcValue,),
     Sandbox: (SandboxToken,),
-    FrameAncestors: (NoneSrc, SelfSrc, HostSrc, SchemeSrc),
+    FrameAncestors: (NoneSrc, SelfSrc, SchemeSrc, HostSrc),
     ReportUri: (UriReference,),
     ReportTo: (ReportToValue,),
     RequireTrustedTypesFor: (TrustedTypesSinkGroup,),
@@ -40,6 +57,84 @@ _PARSING_RULES: Dict[Type[Directive], Tuple[Type[ValueItem], ...]] = {
 }
 
 
+class _ValueDispatch:
+    """
+    Tables to pick the value item type for a string, built from the parsing rule of a
+    directive type and the parser hints of its value item types (ValueItem._prefix,
+    _suffix and _literals). Most strings are classified by a single dict lookup or a
+    single pattern match.
+    """
+
+    _Candidate = Tuple[Type[ValueItem], str, str, Callable[[str], bool]]
+
+    def __init__(self, value_types: Tuple[Type[ValueItem], ...]):
+        # Literal types can only be looked up as long as no type before them has
+        # to be matched against its pattern.
+        self.literals: Dict[str, Type[ValueItem]] = {}
+        candidates: List[_ValueDispatch._Candidate] = []
+        for v_type in value_types:
+            if v_type._literals and not candidates:
+                for literal in v_type._literals:
+                    self.literals.setdefault(literal, v_type)
+            else:
+                candidates.append(
+                    (v_type, v_type._prefix, v_type._suffix, v_type.matches)
+                )
+
+        # Candidates by the first character of a string
+        first_chars = {prefix[0] for _, prefix, _, _ in candidates if prefix}
+        self.by_first_char = {
+            char: tuple(c for c in candidates if not c[1] or c[1][0] == char)
+            for char in first_chars
+        }
+        self.no_prefix = tuple(c for c in candidates if not c[1])
+
+    def classify(self, value_string: str) -> ValueItemType:
+        lower = value_string.lower()
+        if (literal_type := self.literals.get(lower)) is not None:
+            return literal_type.from_string(value_string)
+        # CSP is ASCII by grammar, this also keeps re.IGNORECASE from matching
+        # non-ASCII characters like "\u212a" (Kelvin sign) against ASCII ones.
+        if not value_string.isascii():
+            return UnrecognizedValueItem(value_string)
+
+        for v_type, prefix, suffix, matches in self.by_first_char.get(
+            lower[:1], self.no_prefix
+        ):
+            if (
+                lower.startswith(prefix)
+                and lower.endswith(suffix)
+                and matches(value_string)
+            ):
+                return v_type.from_string(value_string)
+
+        return UnrecognizedValueItem(value_string)
+
+
+# One dispatch per parsing rule, shared by all directive types the rule applies to
+_RULE_DISPATCH = {
+    d_type: _ValueDispatch(value_types)
+    for d_type, value_types in _PARSING_RULES.items()
+}
+_DISPATCH: Dict[Type[Directive], _ValueDispatch] = {}
+
+
+def _dispatch_for(directive_type: Type[Directive]) -> _ValueDispatch:
+    try:
+        return _DISPATCH[directive_type]
+    except KeyError:
+        pass
+
+    for d_type, dispatch in _RULE_DISPATCH.items():
+        if issubclass(directive_type, d_type):
+            _DISPATCH[directive_type] = dispatch
+            return dispatch
+
+    raise ValueError(
+        f"Failed to find parsing rules for directive type {directive_type}"
+    )
+
+
 def value_item_from_string(
     value_string: str, directive_type: Type[Directive]
 ) -> ValueItemType:
@@ -49,79 +144,517 @@ def value_item_from_string(
     :param directive_type: Directive which has value, needed to distinguish certain hash types.
     :return: Object representing the hash.
     """
-    for d_type, value_types in _PARSING_RULES.items():
-        if issubclass(directive_type, d_type):
-            for v_type in value_types:
-                if v_type.pattern.fullmatch(value_string):
-                    v_type = cast(Type[ValueItem], v_type)
-                    return v_type.from_string(value_string)
+    return _dispatch_for(directive_type).classify(value_string)
 
-            return UnrecognizedValueItem(value_string)
 
-    raise ValueError(
-        f"Failed to find parsing rules for directive type {directive_type}"
+# Parsed value items by dispatch and string. Value items are immutable, so every
+# occurrence of a token shares one object for as long as any of them is alive.
+_INTERNED_VALUES: "WeakValueDictionary[Tuple[_ValueDispatch, str], ValueItemType]"
+_INTERNED_VALUES = WeakValueDictionary()
+
+
+def _interned_value(dispatch: _ValueDispatch, value_string: str) -> ValueItemType:
+    key = (dispatch, value_string)
+    value = _INTERNED_VALUES.get(key)
+    if value is None:
+        value = _INTERNED_VALUES.setdefault(key, dispatch.classify(value_string))
+    return value
+
+
+class ParseLimits(NamedTuple):
+    """
+    Maximum sizes for parsing untrusted input, None means no limit.
+    Input beyond a limit is not classified, it degrades to UnrecognizedDirective and
+    UnrecognizedValueItem instances. str() of the result is still the parsed string.
+    """
+
+    # Length of a whole header (characters, or bytes for raw header values). Longer
+    # headers are not tokenized, they become a single UnrecognizedDirective.
+    max_header_length: Optional[int] = None
+    # Directives per policy, directives after that are UnrecognizedDirectives
+    max_directives: Optional[int] = None
+    # Value items per directive, value items after that are UnrecognizedValueItems
+    max_values: Optional[int] = None
+    # Length of directive names and value items, longer ones are unrecognized
+    max_token_length: Optional[int] = None
+
+
+def _exceeds(size: int, limit: Optional[int]) -> bool:
+    return limit is not None and size > limit
+
+
+class _ParseState:
+    """
+    State that is reused across parsed strings, e.g. by iter_policy_lists.
+    Keeps strong references to recently parsed value items, which saves the weak
+    lookup in the interning table for repeated tokens. Everything is dropped when it
+    grows beyond maxsize, which keeps memory bounded for arbitrarily many strings.
+    Also carries the ParseLimits, if any.
+    """
+
+    def __init__(self, maxsize: int = 2**16, limits: Optional[ParseLimits] = None):
+        self.maxsize = maxsize
+        self.limits = limits
+        self.values: Dict[Tuple[_ValueDispatch, str], ValueItemType] = {}
+
+    def classify(self, dispatch: _ValueDispatch, value_string: str) -> ValueItemType:
+        key = (dispatch, value_string)
+        try:
+            return self.values[key]
+        except KeyError:
+            pass
+        if len(self.values) >= self.maxsize:
+            self.values.clear()
+        value = self.values[key] = _interned_value(dispatch, value_string)
+        return value
+
+
+def _limited_values(
+    value_items: List[str],
+    classify: Callable[[str], ValueItemType],
+    limits: ParseLimits,
+) -> Iterator[ValueItemType]:
+    for i, value_item in enumerate(value_items):
+        if _exceeds(i + 1, limits.max_values) or _exceeds(
+            len(value_item), limits.max_token_length
+        ):
+            yield UnrecognizedValueItem(value_item)
+        else:
+            yield classify(value_item)
+
+
+def _class_by_name(
+    name: str, index: int, limits: Optional[ParseLimits]
+) -> Type[Directive]:
+    """
+    Get the directive class for the index-th directive of a policy by its name.
+    """
+    if limits is not None and (
+        _exceeds(index + 1, limits.max_directives)
+        or _exceeds(len(name), limits.max_token_length)
+    ):
+        return UnrecognizedDirective
+    return _LOWER_CASE_DIRECTIVE_REGISTER.get(name.lower(), UnrecognizedDirective)
+
+
+def _directive_from_tokens(
+    tokens: List[str],
+    separators: List[str],
+    state: Optional[_ParseState] = None,
+    index: int = 0,
+) -> Directive:
+    """
+    Create a directive from its name followed by its value items and the whitespace
+    in between them. index is the position of the directive in its policy.
+    """
+    name, value_items = tokens[0], tokens[1:]
+    limits = None if state is None else state.limits
+    dir_class = _class_by_name(name, index, limits)
+    classify = partial(
+        _interned_value if state is None else state.classify, _dispatch_for(dir_class)
     )
+    values: Iterable[ValueItemType]
+    if limits is None:
+        values = map(classify, value_items)
+    else:
+        values = _limited_values(value_items, classify, limits)
+    return dir_class(*values, _name=intern(name), _separators=separators)
 
 
-def directive_from_string(directive_string: str) -> Directive:
-    separators = VALUE_ITEM_SEPARATOR.findall(directive_string)
-    tokens = VALUE_ITEM_SEPARATOR.split(directive_string)
-    if len(separators) != (len(tokens) - 1):
-        raise ParsingError(
-            "Mismatch in amount of tokens and separators. "
-            "Perhaps your directive is not trimmed?"
+def _directive_class(
+    directive_string: str, index: int = 0, limits: Optional[ParseLimits] = None
+) -> Type[Directive]:
+    """
+    Get the directive class for a directive string without parsing its values.
+    """
+    name_end = VALUE_ITEM_SEPARATOR.search(directive_string)
+    name = directive_string[: name_end.start()] if name_end else directive_string
+    return _class_by_name(name, index, limits)
+
+
+class LazyPolicy(Policy):
+    """
+    A policy whose directives are only parsed when they are accessed through
+    __getitem__, __getattr__ or iteration. Until then, only the directive names are
+    looked at. str() returns the parsed string without parsing anything.
+    Adding or removing directives returns a regular Policy.
+    """
+
+    __slots__ = ("_state", "_string", "_directive_strings", "_classes", "_parsed")
+
+    def __init__(
+        self,
+        policy_string: str,
+        directive_strings: Sequence[str],
+        separators: Sequence[str],
+        _state: Optional[_ParseState] = None,
+    ):
+        super().__init__(_separators=separators)
+        self._state = _state
+        self._string = policy_string
+        self._directive_strings = tuple(directive_strings)
+        limits = None if _state is None else _state.limits
+        self._classes = tuple(
+            _directive_class(directive_string, i, limits)
+            for i, directive_string in enumerate(self._directive_strings)
         )
-    if len(tokens) == 0:
-        raise ParsingError("No directive name found in directive string.")
+        self._parsed: List[Optional[Directive]] = [None] * len(self._classes)
 
-    name, value_items = tokens[0], tokens[1:]
-    try:
-        dir_class = Directive.class_by_name(name.lower())
-    except NoSuchDirective:
-        dir_class = UnrecognizedDirective
-    dir_class = cast(Type[Directive], dir_class)
+    @classmethod
+    def from_string(
+        cls, policy_string: str, _state: Optional[_ParseState] = None
+    ) -> "LazyPolicy":
+        parts = SPLIT_DIRECTIVES.split(policy_string)
+        directive_strings, separators = parts[::2], parts[1::2]
+        # Trailing ';' ...
+        if not directive_strings[-1]:
+            directive_strings.pop()
+        return cls(policy_string, directive_strings, separators, _state=_state)
+
+    def _parse_directive(self, index: int) -> Directive:
+        directive = self._parsed[index]
+        if directive is None:
+            directive = _directive_from_string(
+                self._directive_strings[index], self._state, index
+            )
+            self._parsed[index] = directive
+        return directive
+
+    @property
+    def directives(self) -> Tuple[Directive, ...]:
+        if len(self._directives) != len(self._parsed):
+            self._directives = tuple(map(self._parse_directive, range(len(self))))
+        return self._directives
 
-    values = (
-        value_item_from_string(item, directive_type=dir_class) for item in value_items
+    def __str__(self):
+        return self._string
+
+    def __reduce__(self):
+        # Directives are parsed again on demand after unpickling
+        limits = None if self._state is None else self._state.limits
+        return policy_from_string, (self._string, True, limits)
+
+    @property
+    def _directive_classes(self) -> Iterable[Type[Directive]]:
+        return self._classes
+
+    def _directive_at(self, index: int) -> Directive:
+        return self._parse_directive(range(len(self))[index])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._parse_directive(i)
+
+    def __len__(self):
+        return len(self._classes)
+
+    def _eager(self) -> Policy:
+        return Policy(*self.directives, _separators=self._separators)
+
+    def __add__(self, other: Directive) -> Policy:
+        return self._eager() + other
+
+    def without(self, *keys: Union[Type[Directive], str]) -> Policy:
+        return self._eager().without(*keys)
+
+
+def _policies_from_parts(
+    parts: List[Optional[str]], step: int, state: Optional[_ParseState] = None
+) -> Tuple[List[Policy], List[str]]:
+    """
+    Build policies from the result of splitting a string with POLICY_LIST_SCANNER
+    (step=4) or POLICY_SCANNER (step=3). Each token in the result is followed by one
+    group per separator level, of which exactly one is not None, and the next token.
+    Everything is assembled in a single pass over the parts.
+    """
+    # Offsets from the start of a step, POLICY_SCANNER has no policy separator group
+    policy_offset, directive_offset, value_offset, token_offset = range(step - 4, step)
+
+    policies: List[Policy] = []
+    policy_separators: List[str] = []
+    directives: List[Directive] = []
+    directive_separators: List[str] = []
+    tokens = [cast(str, parts[0])]
+    value_separators: List[str] = []
+
+    for i in range(1, len(parts), step):
+        value_separator = parts[i + value_offset]
+        if value_separator is not None:
+            value_separators.append(value_separator)
+            tokens.append(cast(str, parts[i + token_offset]))
+            continue
+
+        directive_separator = parts[i + directive_offset]
+        if directive_separator is not None:
+            directives.append(
+                _directive_from_tokens(
+                    tokens, value_separators, state, index=len(directives)
+                )
+            )
+            directive_separators.append(intern(directive_separator))
+        else:
+            # Trailing ';' leaves an empty directive, which is not part of the policy
+            if tokens[0] or value_separators:
+                directives.append(
+                    _directive_from_tokens(
+                        tokens, value_separators, state, index=len(directives)
+                    )
+                )
+            policies.append(Policy(*directives, _separators=directive_separators))
+            policy_separators.append(cast(str, parts[i + policy_offset]))
+            directives, directive_separators = [], []
+
+        tokens, value_separators = [cast(str, parts[i + token_offset])], []
+
+    if tokens[0] or value_separators:
+        directives.append(
+            _directive_from_tokens(
+                tokens, value_separators, state, index=len(directives)
+            )
+        )
+    policies.append(Policy(*directives, _separators=directive_separators))
+    return policies, policy_separators
+
+
+def directive_from_string(directive_string: str) -> Directive:
+    return _directive_from_string(directive_string)
+
+
+def _directive_from_string(
+    directive_string: str, state: Optional[_ParseState] = None, index: int = 0
+) -> Directive:
+    tokens = []
+    separators = []
+    position = 0
+    for match in VALUE_ITEM_SEPARATOR.finditer(directive_string):
+        tokens.append(directive_string[position : match.start()])
+        separators.append(match.group())
+        position = match.end()
+    tokens.append(directive_string[position:])
+    return _directive_from_tokens(tokens, separators, state, index)
+
+
+def _state_with(
+    limits: Optional[ParseLimits], state: Optional[_ParseState]
+) -> Optional[_ParseState]:
+    if state is None and limits is not None:
+        return _ParseState(limits=limits)
+    return state
+
+
+def _header_too_long(length: int, state: Optional[_ParseState]) -> bool:
+    return (
+        state is not None
+        and state.limits is not None
+        and _exceeds(length, state.limits.max_header_length)
     )
-    return dir_class(*values, _name=name, _separators=tuple(separators))
 
 
-def policy_from_string(policy_string: str) -> Policy:
-    separators = DIRECTIVE_SEPARATOR.findall(policy_string)
-    directives = DIRECTIVE_SEPARATOR.split(policy_string)
-    if len(separators) != (len(directives) - 1):
-        raise ParsingError(
-            "Mismatch in amount of tokens and separators. "
-            "Perhaps your policy is not trimmed?"
+def _unrecognized_policy(policy_string: str) -> Policy:
+    """
+    Wrap a string that is not tokenized in a policy.
+    """
+    return Policy(UnrecognizedDirective(_name=policy_string))
+
+
+def policy_from_string(
+    policy_string: str, lazy: bool = False, limits: Optional[ParseLimits] = None
+) -> Policy:
+    """
+    Parse a policy.
+    :param policy_string: Serialized policy.
+    :param lazy: Return a LazyPolicy, which parses directives on first access.
+    :param limits: Maximum sizes, see ParseLimits.
+    :return: The parsed policy.
+    """
+    state = _state_with(limits, None)
+    if _header_too_long(len(policy_string), state):
+        return _unrecognized_policy(policy_string)
+    if lazy:
+        return LazyPolicy.from_string(policy_string, state)
+    parts = POLICY_SCANNER.split(policy_string)
+    policies, _ = _policies_from_parts(parts, step=3, state=state)
+    return policies[0]
+
+
+def policy_list_from_string(
+    policy_list_string: str,
+    lazy: bool = False,
+    limits: Optional[ParseLimits] = None,
+    _state: Optional[_ParseState] = None,
+) -> PolicyList:
+    """
+    Parse a policy list, e.g. a Content-Security-Policy header value.
+    :param policy_list_string: Serialized policy list.
+    :param lazy: Parse the policies into LazyPolicy instances, which parse directives
+        on first access.
+    :param limits: Maximum sizes, see ParseLimits. Use them for untrusted input.
+    :return: The parsed policy list.
+    """
+    _state = _state_with(limits, _state)
+    body = policy_list_string.lstrip(WHITESPACE_CHARS)
+    head = policy_list_string[: len(policy_list_string) - len(body)]
+    stripped = body.rstrip(WHITESPACE_CHARS)
+    tail = body[len(stripped) :]
+
+    policies: Sequence[Policy]
+    if _header_too_long(len(policy_list_string), _state):
+        policies, separators = [_unrecognized_policy(stripped)], []
+    elif lazy:
+        parts = SPLIT_POLICIES.split(stripped)
+        policies = [LazyPolicy.from_string(policy, _state) for policy in parts[::2]]
+        separators = parts[1::2]
+    else:
+        policies, separators = _policies_from_parts(
+            POLICY_LIST_SCANNER.split(stripped), step=4, state=_state
         )
+    return PolicyList(
+        *policies,
+        _head=head,
+        _tail=tail,
+        _separators=separators,
+    )
 
-    # Trailing ';' ...
-    if len(directives[-1]) == 0:
-        directives = directives[:-1]
 
-    return Policy(
-        *(directive_from_string(dir) for dir in directives), _separators=separators
+HeaderBytes = Union[bytes, bytearray, memoryview]
+_WHITESPACE_BYTES = frozenset(WHITESPACE_CHARS.encode("ascii"))
+
+
+def _strip_bytes(data: HeaderBytes) -> Tuple[memoryview, str, str]:
+    """
+    Split leading and trailing whitespace off a header value without copying it.
+    :return: View of the stripped value, the leading and the trailing whitespace.
+    """
+    view = memoryview(data).cast("B")
+    start, end = 0, len(view)
+    while start < end and view[start] in _WHITESPACE_BYTES:
+        start += 1
+    while end > start and view[end - 1] in _WHITESPACE_BYTES:
+        end -= 1
+    return (
+        view[start:end],
+        bytes(view[:start]).decode("ascii"),
+        bytes(view[end:]).decode("ascii"),
     )
 
 
-def policy_list_from_string(policy_list_string: str) -> PolicyList:
-    head_match = cast(Match, WHITESPACE_HEAD.match(policy_list_string))
-    head = head_match.group(0)
-    policy_list_string = WHITESPACE_HEAD.sub("", policy_list_string)
+def _decode_parts(parts: List[Optional[bytes]]) -> List[Optional[str]]:
+    # latin-1 maps every byte to one character, so non-ASCII bytes end up in
+    # unrecognized directives / value items and str() encodes back to the same bytes.
+    return [part if part is None else part.decode("latin-1") for part in parts]
 
-    # I have given up on a regex replace for trailing whitespace...
-    policy_list_string = policy_list_string[::-1]
-    tail_match = cast(Match, WHITESPACE_HEAD.match(policy_list_string))
-    tail = tail_match.group(0)[::-1]
-    policy_list_string = WHITESPACE_HEAD.sub("", policy_list_string)
-    policy_list_string = policy_list_string[::-1]
 
-    separators = POLICY_SEPARATOR.findall(policy_list_string)
-    tokens = POLICY_SEPARATOR.split(policy_list_string)
+def policy_from_bytes(
+    policy_bytes: HeaderBytes, lazy: bool = False, limits: Optional[ParseLimits] = None
+) -> Policy:
+    """
+    Parse a policy from a raw header value, see policy_from_string.
+    Tokens are decoded one by one, non-ASCII bytes make a value item (or directive)
+    unrecognized instead of raising, decoded as latin-1.
+    :param policy_bytes: Serialized policy as bytes, bytearray or memoryview.
+    :param lazy: Return a LazyPolicy, which parses directives on first access.
+    :param limits: Maximum sizes, see ParseLimits. max_header_length counts bytes.
+    :return: The parsed policy.
+    """
+    state = _state_with(limits, None)
+    if lazy or _header_too_long(memoryview(policy_bytes).nbytes, state):
+        return policy_from_string(
+            bytes(policy_bytes).decode("latin-1"), lazy=lazy, limits=limits
+        )
+    parts = _decode_parts(POLICY_SCANNER_BYTES.split(policy_bytes))
+    policies, _ = _policies_from_parts(parts, step=3, state=state)
+    return policies[0]
+
+
+def policy_list_from_bytes(
+    policy_list_bytes: HeaderBytes,
+    lazy: bool = False,
+    limits: Optional[ParseLimits] = None,
+    _state: Optional[_ParseState] = None,
+) -> PolicyList:
+    """
+    Parse a policy list from a raw header value, see policy_list_from_string and
+    policy_from_bytes.
+    :param policy_list_bytes: Serialized policy list as bytes, bytearray or memoryview.
+    :param lazy: Parse the policies into LazyPolicy instances, which parse directives
+        on first access.
+    :param limits: Maximum sizes, see ParseLimits. max_header_length counts bytes.
+    :return: The parsed policy list.
+    """
+    _state = _state_with(limits, _state)
+    view, head, tail = _strip_bytes(policy_list_bytes)
+
+    policies: Sequence[Policy]
+    if _header_too_long(len(head) + len(view) + len(tail), _state):
+        policies, separators = [_unrecognized_policy(bytes(view).decode("latin-1"))], []
+    elif lazy:
+        parts = SPLIT_POLICIES_BYTES.split(view)
+        policies = [
+            LazyPolicy.from_string(policy.decode("latin-1"), _state)
+            for policy in parts[::2]
+        ]
+        separators = [separator.decode("ascii") for separator in parts[1::2]]
+    else:
+        policies, separators = _policies_from_parts(
+            _decode_parts(POLICY_LIST_SCANNER_BYTES.split(view)), step=4, state=_state
+        )
     return PolicyList(
-        *(policy_from_string(pol) for pol in tokens),
+        *policies,
         _head=head,
         _tail=tail,
         _separators=separators,
     )
+
+
+class ParseResult(NamedTuple):
+    # Position of the header in the input
+    position: int
+    header: Union[str, HeaderBytes]
+    # Exactly one of policy_list and error is not None
+    policy_list: Optional[PolicyList]
+    error: Optional[Exception]
+
+
+def iter_policy_lists(
+    headers: Iterable[Union[str, HeaderBytes]],
+    lazy: bool = False,
+    limits: Optional[ParseLimits] = None,
+) -> Iterator[ParseResult]:
+    """
+    Parse a stream of policy lists (e.g. Content-Security-Policy header values).
+    Results are generated one by one, so memory use does not grow with the number of
+    headers. Errors are reported in the results instead of being raised, a single bad
+    header does not stop the iteration. Value items and directive names are reused
+    across headers.
+    :param headers: Serialized policy lists, raw header values (bytes, bytearray or
+        memoryview) are parsed with policy_list_from_bytes.
+    :param lazy: Parse into LazyPolicy instances, see policy_list_from_string.
+    :param limits: Maximum sizes, see ParseLimits.
+    :return: Iterator of results, in the same order as headers.
+    """
+    state = _ParseState(limits=limits)
+    for index, header in enumerate(headers):
+        try:
+            if isinstance(header, (bytes, bytearray, memoryview)):
+                policy_list = policy_list_from_bytes(header, lazy=lazy, _state=state)
+            else:
+                policy_list = policy_list_from_string(header, lazy=lazy, _state=state)
+        except Exception as e:
+            yield ParseResult(index, header, None, e)
+        else:
+            yield ParseResult(index, header, policy_list, None)
+
+
+def iter_policy_lists_from_file(
+    file: IO[str], lazy: bool = False, limits: Optional[ParseLimits] = None
+) -> Iterator[ParseResult]:
+    """
+    Parse a file with one policy list per line, see iter_policy_lists.
+    The line break is not part of the parsed header and result indices are line
+    numbers, starting at 0.
+    """
+    return iter_policy_lists(
+        (line.rstrip("\r\n") for line in file),
+        lazy=lazy,
+        limits=limits,
+    )
@@ -17,6 +17,13 @@ __all__ = [
     "DIRECTIVE_SEPARATOR",
     "POLICY_SEPARATOR",
     "WHITESPACE_HEAD",
+    "POLICY_LIST_SCANNER",
+    "POLICY_SCANNER",
+    "SPLIT_POLICIES",
+    "SPLIT_DIRECTIVES",
+    "POLICY_LIST_SCANNER_BYTES",
+    "POLICY_SCANNER_BYTES",
+    "SPLIT_POLICIES_BYTES",
     "TRUSTED_TYPES_POLICY_NAME",
     "WILDCARD",
 ]
@@ -48,7 +55,7 @@ ALPHA = cast(re.Pattern, r"[A-Za-z]")
 DIGIT = cast(re.Pattern, r"[0-9]")
 
 # https://w3c.github.io/webappsec-csp/#grammardef-base64-value
-BASE64_VALUE = cast(re.Pattern, rf"({ALPHA}|{DIGIT}|[+\/\-_]){{2, 0}}={{0, 2}}")
+BASE64_VALUE = cast(re.Pattern, rf"({ALPHA}|{DIGIT}|[+\/\-_])+={{0,2}}")
 NONCE_SOURCE = cast(re.Pattern, f"'nonce-{BASE64_VALUE}'")
 HASH_SOURCE = cast(
     re.Pattern, f"'({'|'.join(alg for alg in HASH_ALGORITHMS)})-{BASE64_VALUE}'"
@@ -71,29 +78,31 @@ SEGMENT = f"{PCHAR}*"
 SEGMENT_NZ = f"{PCHAR}+"  # Non-Zero
 PATH_ABSOLUTE = f"/({SEGMENT_NZ}(/{SEGMENT})*)?"
 SCHEME = cast(re.Pattern, rf"{ALPHA}({ALPHA}|{DIGIT}|[+\-.])*")
-DEC_OCTET = f"({DIGIT})|([1-9]{DIGIT})|(1{DIGIT}{{2}})|(2[0-4]{DIGIT})|(25[0-5])"
-IP_V4_ADDRESS = f"{DEC_OCTET}.{DEC_OCTET}.{DEC_OCTET}.{DEC_OCTET}"
+DEC_OCTET = f"({DIGIT}|[1-9]{DIGIT}|1{DIGIT}{{2}}|2[0-4]{DIGIT}|25[0-5])"
+IP_V4_ADDRESS = rf"{DEC_OCTET}\.{DEC_OCTET}\.{DEC_OCTET}\.{DEC_OCTET}"
 H16 = f"{HEXDIG}{{1,4}}"
-LS_32 = f"({H16}:{H16})|({IP_V4_ADDRESS})"
-IP_V6_ADDRESS = (
-    f"({H16}:){{6}}{LS_32}"
-    f"::({H16}:){{5}}{LS_32}"
-    f"({H16})?::({H16}:){{4}}{LS_32}"
-    f"(({H16}){{0,1}}{H16})?::({H16}:){{3}}{LS_32}"
-    f"(({H16}){{0,2}}{H16})?::({H16}:){{2}}{LS_32}"
-    f"(({H16}){{0,3}}{H16})?::{H16}:{LS_32}"
-    f"(({H16}){{0,4}}{H16})?::{LS_32}"
-    f"(({H16}){{0,5}}{H16})?::{H16}"
-    f"(({H16}){{0,6}}{H16})?::"
+LS_32 = f"({H16}:{H16}|{IP_V4_ADDRESS})"
+IP_V6_ADDRESS = "|".join(
+    (
+        f"({H16}:){{6}}{LS_32}",
+        f"::({H16}:){{5}}{LS_32}",
+        f"({H16})?::({H16}:){{4}}{LS_32}",
+        f"(({H16}:){{0,1}}{H16})?::({H16}:){{3}}{LS_32}",
+        f"(({H16}:){{0,2}}{H16})?::({H16}:){{2}}{LS_32}",
+        f"(({H16}:){{0,3}}{H16})?::{H16}:{LS_32}",
+        f"(({H16}:){{0,4}}{H16})?::{LS_32}",
+        f"(({H16}:){{0,5}}{H16})?::{H16}",
+        f"(({H16}:){{0,6}}{H16})?::",
+    )
 )
 # IP_V_FUTURE = # By the time  this is relevant, I will be dead
 # Fixme when I am dead: f"[({IP_V6_ADDRESS})|({IP_V_FUTURE})]"
-IP_LITERAL = rf"\[{IP_V6_ADDRESS}\]"
+IP_LITERAL = rf"\[({IP_V6_ADDRESS})\]"
 REG_NAME = f"({UNRESERVED}|{PCT_ENCODED}|{SUB_DELIMS})*"
-HOST = f"({IP_LITERAL})|({IP_V4_ADDRESS})|({REG_NAME})"
+HOST = f"({IP_LITERAL}|{IP_V4_ADDRESS}|{REG_NAME})"
 PORT = f"({DIGIT})*"
 USERINFO = f"({UNRESERVED}|{PCT_ENCODED}|{SUB_DELIMS}|:)*"
-AUTHORITY = f"({USERINFO})?({HOST})(:{PORT})?"
+AUTHORITY = f"({USERINFO}@)?{HOST}(:{PORT})?"
 FRAGMENT = f"({PCHAR}|[/?])*"
 QUERY = f"({PCHAR}|[/?])*"
 PATH_AB_EMPTY = f"(/{SEGMENT})*"
@@ -142,6 +151,26 @@ POLICY_SEPARATOR = cast(re.Pattern, f"{ASCII_WHITESPACE}*,{ASCII_WHITESPACE}*")
 NOT_SEPARATOR = cast(re.Pattern, f"[^{WHITESPACE_CHARS};,]*")
 WHITESPACE_HEAD = re.compile(f"^{ASCII_WHITESPACE}*", flags=re.MULTILINE)
 
+# Separators of all levels in one pattern, so a single split tokenizes a whole string.
+# Every alternative is a capturing group, the group that is not None tells the level of
+# the separator. Higher levels come first, they would otherwise be consumed as value
+# item separators. Whitespace between ';' and ',' belongs to the policy separator.
+_LIST_DIRECTIVE_SEPARATOR = (
+    f"{ASCII_WHITESPACE}*;(?:(?!{ASCII_WHITESPACE}*,){ASCII_WHITESPACE}*)?"
+)
+POLICY_LIST_SCANNER = cast(
+    re.Pattern,
+    f"({POLICY_SEPARATOR})|({_LIST_DIRECTIVE_SEPARATOR})|({VALUE_ITEM_SEPARATOR})",
+)
+POLICY_SCANNER = cast(re.Pattern, f"({DIRECTIVE_SEPARATOR})|({VALUE_ITEM_SEPARATOR})")
+# Split only one level, keeping the separators
+SPLIT_POLICIES = cast(re.Pattern, f"({POLICY_SEPARATOR})")
+SPLIT_DIRECTIVES = cast(re.Pattern, f"({DIRECTIVE_SEPARATOR})")
+# The same for raw header values, separators are ASCII in any encoding
+POLICY_LIST_SCANNER_BYTES = re.compile(cast(str, POLICY_LIST_SCANNER).encode("ascii"))
+POLICY_SCANNER_BYTES = re.compile(cast(str, POLICY_SCANNER).encode("ascii"))
+SPLIT_POLICIES_BYTES = re.compile(cast(str, SPLIT_POLICIES).encode("ascii"))
+
 WILDCARD = cast(re.Pattern, r"\*")
 TRUSTED_TYPES_POLICY_NAME = cast(re.Pattern, rf"({ALPHA}|{DIGIT}|-|[\-#=_/@.%])+")
 
@@ -0,0 +1,129 @@
+"""
+Policies with placeholders for the scheme, host and port of a request. A PolicyTemplate
+is serialized once into literal chunks and slots, rendering it is a single join.
+"""
+__all__ = ["HOST", "PORT", "SCHEME", "PolicyTemplate", "origin"]
+
+from typing import *
+
+from content_security_policy.base_classes import Policy, PolicyList
+from content_security_policy.exceptions import BadSourceExpression
+from content_security_policy.validators import _is_digits, _is_host_part, _is_scheme
+
+# Placeholders are delimited by NUL, which can not be part of a header, so they can not
+# clash with other parts of a policy. Use them in host sources, e.g. with origin.
+SCHEME = "\x00scheme\x00"
+HOST = "\x00host\x00"
+# Includes the ":" before the port, it is empty for the default port
+PORT = "\x00port\x00"
+
+_SLOT_DELIMITER = "\x00"
+
+
+def _is_host(value: str) -> bool:
+    # A request's host may have a port, e.g. the Host header. Wildcards would allow
+    # more than the host.
+    host, colon, port = value.partition(":")
+    return (not colon or _is_digits(port)) and "*" not in host and _is_host_part(host)
+
+
+_VALIDATORS: Dict[str, Callable[[str], bool]] = {
+    "scheme": _is_scheme,
+    "host": _is_host,
+    "port": _is_digits,
+}
+
+
+def _port_part(port: Union[int, str, None]) -> str:
+    if port is None or port == "":
+        return ""
+    return f":{_validated('port', str(port))}"
+
+
+def _validated(name: str, value: str) -> str:
+    if not _VALIDATORS[name](value):
+        raise BadSourceExpression(f"'{value}' is not a valid {name}.")
+    return value
+
+
+def _validated_host(host: str, has_port: bool) -> str:
+    # With a port of its own, a host with a port would serialize to host:port:port
+    if has_port and ":" in host:
+        raise BadSourceExpression(f"'{host}' has a port, but a port is given too.")
+    return _validated("host", host)
+
+
+def origin(scheme: str, host: str, port: Union[int, str, None] = None) -> str:
+    """
+    Serialize the origin part of host sources, e.g. https://example.com:8443. Only the
+    syntax of each part is validated, once for all host sources of the origin. Values
+    that are placeholders are kept for a PolicyTemplate.
+    :param scheme: Scheme or SCHEME.
+    :param host: Host, optionally with a port if port is None, or HOST.
+    :param port: Port, PORT or None for no port.
+    :return: Origin without a trailing "/".
+    :raises BadSourceExpression: If a part is not valid.
+    """
+    if scheme != SCHEME:
+        _validated("scheme", scheme)
+    if host != HOST:
+        _validated_host(host, port not in (None, ""))
+    return f"{scheme}://{host}{port if port == PORT else _port_part(port)}"
+
+
+class PolicyTemplate:
+    """
+    Policy or policy list serialized once, with slots for the placeholders SCHEME, HOST
+    and PORT. Rendering validates each value once and joins them with the literal
+    chunks of the policy, without creating any values, directives or policies.
+    """
+
+    __slots__ = ("_chunks", "_names", "names")
+
+    def __init__(self, policy: Union[Policy, PolicyList, str]):
+        """
+        :param policy: Policy, policy list or header value with placeholders.
+        """
+        chunks = str(policy).split(_SLOT_DELIMITER)
+        # Chunks at odd positions are the names of placeholders
+        names = chunks[1::2]
+        if len(chunks) % 2 == 0 or not _VALIDATORS.keys() >= set(names):
+            raise ValueError(
+                f"{policy!r} has NUL characters that are not placeholders."
+            )
+        self._chunks = chunks
+        # Placeholder of each slot, in order
+        self._names = names
+        # Names of the placeholders in the template, e.g. {"scheme", "host"}
+        self.names = frozenset(names)
+
+    def render(
+        self,
+        scheme: Optional[str] = None,
+        host: Optional[str] = None,
+        port: Union[int, str, None] = None,
+    ) -> str:
+        """
+        :param scheme: Value for SCHEME, required if the template has it.
+        :param host: Value for HOST, required if the template has it. May have a port,
+            e.g. from the Host header, unless the template has PORT.
+        :param port: Value for PORT, None for no port.
+        :return: Header value.
+        :raises BadSourceExpression: If a value is not valid.
+        """
+        values: Dict[str, str] = {}
+        for name in self.names:
+            if name == "port":
+                values[name] = _port_part(port)
+                continue
+            value = scheme if name == "scheme" else host
+            if value is None:
+                raise ValueError(f"The template needs a value for {name}.")
+            values[name] = (
+                _validated_host(value, "port" in self.names)
+                if name == "host"
+                else _validated(name, value)
+            )
+        parts = self._chunks.copy()
+        parts[1::2] = map(values.__getitem__, self._names)
+        return "".join(parts)
@@ -0,0 +1,132 @@
+from unittest import TestCase
+
+from content_security_policy import *
+from content_security_policy.builder import DirectiveBuilder, PolicyBuilder
+from content_security_policy.exceptions import BadSourceList
+from content_security_policy.parse import directive_from_string, policy_from_string
+
+POLICY = (
+    "default-src \t 'self'; \n frame-ancestors 'self'; \tobject-src 'none' ;"
+    "\x0c\t style-src http://example.com"
+)
+
+
+class DirectiveBuilding(TestCase):
+    def test_unchanged(self):
+        for directive_string in (
+            "sCript-SrC 'self'\t'nonce-FOOBAR'\nhttp://example.com",
+            "upgrade-insecure-requests",
+            "sandbox",
+        ):
+            with self.subTest(directive_string):
+                directive = directive_from_string(directive_string)
+                frozen = DirectiveBuilder(directive).freeze()
+                self.assertIs(type(frozen), type(directive))
+                self.assertEqual(str(frozen), directive_string)
+
+    def test_add_same_as_operator(self):
+        directive = directive_from_string("Frame-Ancestors\t 'self'")
+        hosts = [HostSrc(f"https://{i}.example.com") for i in range(3)]
+        expected = directive
+        for host in hosts:
+            expected += host
+        frozen = DirectiveBuilder(directive).add(*hosts).freeze()
+        self.assertEqual(str(frozen), str(expected))
+
+    def test_from_class(self):
+        builder = DirectiveBuilder(ScriptSrc)
+        for i in range(3):
+            builder.add(HostSrc(f"{i}.example.com"))
+        self.assertEqual(
+            str(builder.freeze()),
+            "script-src 0.example.com 1.example.com 2.example.com",
+        )
+
+    def test_remove_replace(self):
+        directive = directive_from_string("img-src\t'self'  a.com\tdata:")
+        self_src, a_com, data = directive.values
+        builder = DirectiveBuilder(directive)
+        builder.remove(a_com, HostSrc("not-in.directive"))
+        self.assertEqual(str(builder.freeze()), "img-src\t'self'\tdata:")
+        builder.replace(self_src, KeywordSource.unsafe_inline)
+        self.assertEqual(str(builder.freeze()), "img-src\t'unsafe-inline'\tdata:")
+        builder.remove(KeywordSource.unsafe_inline)
+        self.assertEqual(str(builder.freeze()), "img-src\tdata:")
+        self.assertEqual(str(builder.clear().freeze()), "img-src")
+
+    def test_frozen_independent(self):
+        builder = DirectiveBuilder(ImgSrc).add(SelfSrc)
+        frozen = builder.freeze()
+        builder.add(HostSrc("a.com"))
+        self.assertEqual(str(frozen), "img-src 'self'")
+        self.assertEqual(len(builder), 2)
+        self.assertIn(SelfSrc, builder)
+
+    def test_validated_on_freeze(self):
+        builder = DirectiveBuilder(ImgSrc).add(NoneSrc, SelfSrc)
+        with self.assertRaises(BadSourceList):
+            builder.freeze()
+        self.assertEqual(str(builder.remove(SelfSrc).freeze()), "img-src 'none'")
+
+
+class PolicyBuilding(TestCase):
+    def test_unchanged(self):
+        for policy_string in (POLICY, "img-src a; ", ""):
+            for lazy in (False, True):
+                with self.subTest(policy_string, lazy=lazy):
+                    policy = policy_from_string(policy_string, lazy=lazy)
+                    frozen = PolicyBuilder(policy).freeze()
+                    self.assertIs(type(frozen), Policy)
+                    self.assertEqual(str(frozen), policy_string)
+
+    def test_same_as_operators(self):
+        policy = policy_from_string(POLICY)
+        directive = ScriptSrc(SelfSrc)
+        self.assertEqual(
+            str(PolicyBuilder(policy).remove(FrameAncestors).freeze()),
+            str(policy - FrameAncestors),
+        )
+        self.assertEqual(
+            str(PolicyBuilder(policy).add(directive).freeze()),
+            str(policy + directive),
+        )
+
+    def test_remove(self):
+        policy = policy_from_string(POLICY)
+        builder = PolicyBuilder(policy).remove("default-src", StyleSrc)
+        self.assertEqual(
+            str(builder.freeze()), "frame-ancestors 'self'; \tobject-src 'none'"
+        )
+        self.assertNotIn(DefaultSrc, builder)
+        self.assertIn("frame-ancestors", builder)
+        self.assertNotIn(FrameAncestors(SelfSrc), builder)
+
+    def test_edit_directive(self):
+        builder = PolicyBuilder(policy_from_string(POLICY))
+        builder.directive("default-src").add(HostSrc("a.com"))
+        builder.directive(ScriptSrc).add(*(HostSrc(f"{i}.com") for i in range(3)))
+        self.assertIs(builder.directive("script-src"), builder.directive(ScriptSrc))
+        policy = builder.freeze()
+        self.assertEqual(str(policy.default_src), "default-src \t 'self' a.com")
+        self.assertEqual(str(policy[-1]), "script-src 0.com 1.com 2.com")
+        self.assertEqual(len(policy), 5)
+
+    def test_replace(self):
+        builder = PolicyBuilder(policy_from_string(POLICY))
+        builder.replace(ObjectSrc(SelfSrc)).replace(ImgSrc(SelfSrc))
+        self.assertEqual(
+            str(builder.freeze()),
+            "default-src \t 'self'; \n frame-ancestors 'self'; \tobject-src 'self' ;"
+            "\x0c\t style-src http://example.com; img-src 'self'",
+        )
+
+    def test_frozen_independent(self):
+        builder = PolicyBuilder().add(DefaultSrc(SelfSrc))
+        frozen = builder.freeze()
+        builder.directive(DefaultSrc).add(HostSrc("a.com"))
+        self.assertEqual(str(frozen), "default-src 'self'")
+        self.assertEqual(str(builder.freeze()), "default-src 'self' a.com")
+
+    def test_remove_all(self):
+        builder = PolicyBuilder(policy_from_string("img-src a; "))
+        self.assertEqual(str(builder.remove(ImgSrc).freeze()), "")
@@ -0,0 +1,96 @@
+from unittest import TestCase
+
+from content_security_policy import Policy, PolicyList, UnrecognizedDirective
+from content_security_policy.cache import CacheStats, ParseCache
+from content_security_policy.parse import ParseLimits
+
+
+class ParseCacheTest(TestCase):
+    def test_same_instance(self):
+        cache = ParseCache()
+        header = "default-src 'self'; object-src 'none'"
+        policy = cache.policy_from_string(header)
+        self.assertIsInstance(policy, Policy)
+        self.assertIs(policy, cache.policy_from_string(header))
+        self.assertEqual(str(policy), header)
+        self.assertEqual(cache.stats, CacheStats(1, 1, 0, 1, len(header)))
+
+    def test_functions_cached_separately(self):
+        cache = ParseCache()
+        header = "default-src 'self'"
+        policy = cache.policy_from_string(header)
+        policy_list = cache.policy_list_from_string(header)
+        self.assertIsInstance(policy, Policy)
+        self.assertIsInstance(policy_list, PolicyList)
+        self.assertEqual(cache.stats.misses, 2)
+
+    def test_exact_key(self):
+        cache = ParseCache()
+        cache.policy_list_from_string("default-src 'self'")
+        cache.policy_list_from_string("default-src  'self'")
+        cache.policy_list_from_string("Default-src 'self'")
+        self.assertEqual(cache.stats.misses, 3)
+        self.assertEqual(cache.stats.hits, 0)
+
+    def test_limits(self):
+        cache = ParseCache()
+        header = "default-src 'self'; img-src a.com"
+        unlimited = cache.policy_from_string(header)
+        limits = ParseLimits(max_directives=1)
+        limited = cache.policy_from_string(header, limits=limits)
+        self.assertIsNot(limited, unlimited)
+        self.assertIsInstance(limited[1], UnrecognizedDirective)
+        self.assertIs(limited, cache.policy_from_string(header, limits=limits))
+        self.assertEqual(cache.stats.misses, 2)
+
+    def test_lru_eviction(self):
+        cache = ParseCache(maxsize=2)
+        a = cache.policy_from_string("img-src a.com")
+        cache.policy_from_string("img-src b.com")
+        # Use a, so that b is the least recently used
+        self.assertIs(a, cache.policy_from_string("img-src a.com"))
+        cache.policy_from_string("img-src c.com")
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.stats.evictions, 1)
+        self.assertIs(a, cache.policy_from_string("img-src a.com"))
+        cache.policy_from_string("img-src b.com")
+        self.assertEqual(cache.stats.misses, 4)
+
+    def test_byte_budget(self):
+        cache = ParseCache(maxsize=None, max_bytes=30)
+        for host in ("a.com", "b.com", "c.com"):
+            cache.policy_from_string(f"img-src {host}")
+        self.assertEqual(cache.stats.bytes, 26)
+        self.assertEqual(cache.stats.evictions, 1)
+
+    def test_non_ascii_bytes(self):
+        cache = ParseCache(max_bytes=30)
+        header = "img-src h\xe9st.com \u212a.com"
+        cache.policy_from_string(header)
+        self.assertEqual(cache.stats.bytes, len(header.encode()))
+        self.assertGreater(cache.stats.bytes, len(header))
+        # 27 characters, but 33 bytes
+        cache.clear()
+        cache.policy_from_string("img-src \u212a" * 3)
+        self.assertEqual(len(cache), 0)
+
+    def test_too_large_not_cached(self):
+        cache = ParseCache(max_bytes=10)
+        header = "default-src 'self'"
+        self.assertIsNot(
+            cache.policy_from_string(header), cache.policy_from_string(header)
+        )
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.stats.misses, 2)
+
+    def test_clear(self):
+        cache = ParseCache()
+        cache.policy_from_string("default-src 'self'")
+        cache.clear()
+        self.assertEqual(cache.stats, CacheStats(0, 0, 0, 0, 0))
+
+    def test_negative_limits(self):
+        with self.assertRaises(ValueError):
+            ParseCache(maxsize=-1)
+        with self.assertRaises(ValueError):
+            ParseCache(max_bytes=-1)
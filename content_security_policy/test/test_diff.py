@@ -0,0 +1,60 @@
+from unittest import TestCase
+
+from content_security_policy import *
+from content_security_policy.diff import PolicyDiff, diff
+from content_security_policy.parse import policy_from_string
+
+
+def _strs(items) -> list:
+    return [str(item) for item in items]
+
+
+class DiffTest(TestCase):
+    def test_equal(self):
+        cases = [
+            ("default-src 'self'", "default-src 'self'"),
+            (
+                "img-src a.com b.com; script-src 'SELF'",
+                "Script-Src 'self';img-src b.com a.com",
+            ),
+            ("img-src a.com; img-src b.com", "img-src a.com a.com"),
+        ]
+        for a, b in cases:
+            with self.subTest(a=a, b=b):
+                result = diff(policy_from_string(a), policy_from_string(b))
+                self.assertEqual(result, PolicyDiff((), (), ()))
+                self.assertFalse(result)
+
+    def test_directives(self):
+        a = policy_from_string("default-src 'self'; img-src *; report-uri /csp")
+        b = policy_from_string("default-src 'self'; script-src a.com; IMG-SRC *")
+        result = diff(a, b)
+        self.assertTrue(result)
+        self.assertEqual(_strs(result.added), ["script-src a.com"])
+        self.assertEqual(_strs(result.removed), ["report-uri /csp"])
+        self.assertEqual(result.changed, ())
+
+    def test_sources(self):
+        a = policy_from_string("script-src 'self' a.com b.com 'unsafe-inline'")
+        b = policy_from_string("script-src c.com B.COM 'self' d.com")
+        (change,) = diff(a, b).changed
+        self.assertIs(change.old, a.script_src)
+        self.assertIs(change.new, b.script_src)
+        self.assertEqual(_strs(change.added), ["c.com", "d.com"])
+        self.assertEqual(_strs(change.removed), ["a.com", "'unsafe-inline'"])
+        self.assertEqual(diff(b, a).changed[0][2:], (change.removed, change.added))
+
+    def test_ordered_values(self):
+        # The order of report-uri values matters, but none are added or removed
+        a = Policy(ReportUri(UriReference("/a"), UriReference("/b")))
+        b = Policy(ReportUri(UriReference("/b"), UriReference("/a")))
+        (change,) = diff(a, b).changed
+        self.assertEqual((change.added, change.removed), ((), ()))
+
+    def test_large_source_lists(self):
+        hosts = [HostSrc(f"host{i}.example.com") for i in range(20000)]
+        a = Policy(ScriptSrc(*hosts))
+        b = Policy(ScriptSrc(*hosts[1:], HostSrc("new.example.com")))
+        (change,) = diff(a, b).changed
+        self.assertEqual(_strs(change.added), ["new.example.com"])
+        self.assertEqual(_strs(change.removed), ["host0.example.com"])
@@ -1,6 +1,11 @@
 from unittest import TestCase
 
 from content_security_policy import *
+from content_security_policy.parse import (
+    directive_from_string,
+    policy_from_string,
+    policy_list_from_string,
+)
 
 
 class SingleValueItemTest(TestCase):
@@ -26,3 +31,193 @@ class SingleValueItemTest(TestCase):
                 b = cls(_value=val_b)
                 self.assertEqual(cls, b)
                 self.assertEqual(b, cls)
+
+    def test_hash(self):
+        for cls, vals in self.cases.items():
+            with self.subTest(cls):
+                _, val_b = vals
+                self.assertEqual(len({cls, cls(_value=val_b)}), 1)
+
+
+class ValueItemTest(TestCase):
+    def test_equal(self):
+        cases = [
+            (KeywordSource.self, KeywordSource.from_string("'SeLF'")),
+            (SandboxToken.allow_scripts, SandboxToken.from_string("Allow-Scripts")),
+            (SchemeSrc("https"), SchemeSrc.from_string("HTTPS:")),
+            (HostSrc("https://a.com:443/Path"), HostSrc("HTTPS://A.Com:443/Path")),
+            (HostSrc("*.a.com"), HostSrc("*.A.COM")),
+            (NonceSrc.from_string("'nonce-abc'"), NonceSrc.from_string("'NONCE-abc'")),
+            (HashSrc.from_string("'sha256-abc'"), HashSrc.from_string("'SHA256-abc'")),
+            (UriReference("/csp"), UriReference("/csp")),
+        ]
+        for a, b in cases:
+            with self.subTest(a=str(a), b=str(b)):
+                self.assertEqual(a, b)
+                self.assertEqual(hash(a), hash(b))
+
+    def test_not_equal(self):
+        cases = [
+            (HostSrc("a.com/Path"), HostSrc("a.com/path")),
+            (NonceSrc.from_string("'nonce-abc'"), NonceSrc.from_string("'nonce-ABC'")),
+            (HashSrc.from_string("'sha256-abc'"), HashSrc.from_string("'sha256-ABC'")),
+            (TrustedTypesPolicyName("a"), TrustedTypesPolicyName("A")),
+            (HostSrc("a.com"), UnrecognizedValueItem("a.com")),
+            (KeywordSource.self, SelfSrc),
+            (HostSrc("a.com"), "a.com"),
+        ]
+        for a, b in cases:
+            with self.subTest(a=str(a), b=str(b)):
+                self.assertNotEqual(a, b)
+
+
+class DirectiveTest(TestCase):
+    def test_equal(self):
+        cases = [
+            ("script-src 'self' a.com", "SCRIPT-SRC\t'SELF'   A.com"),
+            ("script-src 'self' a.com", "script-src a.com 'self' 'self'"),
+            ("frame-ancestors 'self' a.com", "frame-ancestors a.com 'self'"),
+            ("sandbox allow-forms allow-scripts", "sandbox allow-scripts allow-forms"),
+            ("x-unknown a", "X-Unknown a"),
+        ]
+        for a, b in cases:
+            with self.subTest(a=a, b=b):
+                self.assertEqual(directive_from_string(a), directive_from_string(b))
+                self.assertEqual(
+                    hash(directive_from_string(a)), hash(directive_from_string(b))
+                )
+
+    def test_not_equal(self):
+        cases = [
+            ("script-src a.com", "script-src-elem a.com"),
+            ("report-uri /a /b", "report-uri /b /a"),
+            ("x-unknown a", "x-unknown A"),
+            ("img-src a.com", "img-src a.com/"),
+        ]
+        for a, b in cases:
+            with self.subTest(a=a, b=b):
+                self.assertNotEqual(directive_from_string(a), directive_from_string(b))
+
+    def test_constructed_and_parsed(self):
+        self.assertEqual(
+            FrameAncestors(NoneSrc), directive_from_string("frame-ancestors 'NONE'")
+        )
+        self.assertEqual(
+            ImgSrc(KeywordSource.self), directive_from_string("img-src 'self'")
+        )
+
+    def test_canonical_cached(self):
+        directive = ScriptSrc(*(HostSrc(f"HOST{i}.example.com") for i in range(5000)))
+        canonical = directive._canonical()
+        self.assertIs(directive._canonical(), canonical)
+        self.assertEqual(hash(directive), hash(canonical))
+        value = HostSrc("HOST.example.com")
+        self.assertIs(value._canonical(), value._canonical())
+        # Canonical items share their string
+        lower = HostSrc("host.example.com")
+        self.assertIs(lower._canonical(), str(lower))
+
+
+class PolicyTest(TestCase):
+    header = "default-src 'self'; img-src a.com b.com; img-src c.com"
+
+    def test_equal(self):
+        cases = [
+            "img-src b.com A.COM;default-src 'SELF'",
+            "default-src 'self'; img-src a.com b.com",
+            "default-src 'self'; img-src a.com b.com;",
+        ]
+        policy = policy_from_string(self.header)
+        for header in cases:
+            for lazy in (False, True):
+                with self.subTest(header, lazy=lazy):
+                    other = policy_from_string(header, lazy=lazy)
+                    self.assertEqual(policy, other)
+                    self.assertEqual(hash(policy), hash(other))
+                    self.assertEqual(policy.fingerprint(), other.fingerprint())
+
+    def test_not_equal(self):
+        policy = policy_from_string(self.header)
+        for header in (
+            "default-src 'self'; img-src c.com",
+            "default-src 'self'",
+            "default-src 'self'; img-src a.com b.com; script-src 'self'",
+        ):
+            with self.subTest(header):
+                other = policy_from_string(header)
+                self.assertNotEqual(policy, other)
+                self.assertNotEqual(policy.fingerprint(), other.fingerprint())
+
+    def test_dedupe(self):
+        policies = {
+            policy_from_string("img-src a.com; object-src 'none'"),
+            policy_from_string("object-src 'none'; img-src a.com"),
+            Policy(ObjectSrc(NoneSrc), ImgSrc(HostSrc("A.com"))),
+        }
+        self.assertEqual(len(policies), 1)
+
+    def test_fingerprint_stable(self):
+        policy = policy_from_string(self.header)
+        self.assertEqual(policy.fingerprint(), 0x2337C61D39E9A4A4)
+        self.assertLess(policy.fingerprint(), 2**64)
+
+
+class PolicyListTest(TestCase):
+    def test_equal(self):
+        a = policy_list_from_string(" img-src a.com, script-src 'self'")
+        b = policy_list_from_string("SCRIPT-SRC 'self',img-src a.com, img-src a.com,")
+        self.assertEqual(a, b)
+        self.assertEqual(hash(a), hash(b))
+        self.assertEqual(a.fingerprint(), b.fingerprint())
+
+    def test_not_equal(self):
+        a = policy_list_from_string("img-src a.com, script-src 'self'")
+        b = policy_list_from_string("img-src a.com; script-src 'self'")
+        self.assertNotEqual(a, b)
+        self.assertNotEqual(a.fingerprint(), b.fingerprint())
+        self.assertNotEqual(a, a[0])
+
+
+class NormalizationTest(TestCase):
+    header = (
+        "  IMG-SRC b.com A.com 'SELF' a.com;script-src\t'NONE'; img-src c.com ,, "
+        "x-Foo B a; report-uri /b /a, img-src 'self' a.com b.com; script-src 'none';"
+    )
+
+    def test_policy(self):
+        policy = policy_list_from_string(self.header)[0]
+        normalized = policy.normalized()
+        self.assertEqual(
+            str(normalized), "img-src 'self' a.com b.com; script-src 'none'"
+        )
+        self.assertIs(policy.normalized(), normalized)
+        self.assertEqual(normalized, policy)
+        self.assertIs(normalized.img_src.values[0], KeywordSource.self)
+        self.assertIs(normalized.script_src.values[0], NoneSrc)
+
+    def test_ordered_values_kept(self):
+        policy = policy_list_from_string(self.header)[2]
+        self.assertEqual(str(policy.normalized()), "report-uri /b /a; x-foo B a")
+
+    def test_policy_list(self):
+        policy_list = policy_list_from_string(self.header)
+        self.assertEqual(
+            str(policy_list.normalized()),
+            "img-src 'self' a.com b.com; script-src 'none', "
+            "report-uri /b /a; x-foo B a",
+        )
+        self.assertIs(policy_list.normalized(), policy_list.normalized())
+        self.assertEqual(str(policy_list_from_string(" , ").normalized()), "")
+
+    def test_same_as_canonical(self):
+        for policy in policy_list_from_string(self.header):
+            for directive in policy:
+                with self.subTest(str(directive)):
+                    normalized = directive.normalized()
+                    self.assertIs(type(normalized), type(directive))
+                    self.assertEqual(str(normalized), directive._canonical())
+                    self.assertEqual(normalized, directive)
+
+    def test_idempotent(self):
+        normalized = policy_list_from_string(self.header).normalized()
+        self.assertEqual(str(normalized.normalized()), str(normalized))
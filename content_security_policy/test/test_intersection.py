@@ -0,0 +1,204 @@
+from unittest import TestCase
+
+from content_security_policy import *
+from content_security_policy.intersection import intersect_sources
+from content_security_policy.parse import directive_from_string, policy_list_from_string
+
+ORIGIN = "https://example.com"
+
+
+def _sources(*directives: str):
+    return [directive_from_string(f"img-src {d}").values for d in directives]
+
+
+class IntersectSourcesTest(TestCase):
+    def assertIntersection(self, directives, expected: str, script=False):
+        sources = intersect_sources(_sources(*directives), script=script)
+        self.assertEqual(" ".join(sorted(map(str, sources))), expected)
+
+    def test_hosts(self):
+        cases = [
+            (("a.com b.com", "b.com c.com"), "b.com"),
+            (("a.com", "b.com"), ""),
+            (("*.a.com", "x.a.com y.b.com"), "x.a.com"),
+            (("*.a.com", "*.x.a.com a.com"), "*.x.a.com"),
+            (("*", "a.com https://b.com ws://c.com"), "a.com https://b.com"),
+            (("https://*", "https://a.com http://b.com"), "https://a.com"),
+            (("https:", "https://a.com a.com"), "https://a.com"),
+            (("http:", "a.com"), "a.com"),
+            (("a.com:443", "https://a.com http://a.com"), "https://a.com"),
+            (("a.com", "https://a.com:443"), "https://a.com:443"),
+            (("http://a.com", "https://a.com"), "https://a.com"),
+            (("a.com:*", "a.com:8443 a.com"), "a.com a.com:8443"),
+            (("a.com:443", "a.com"), ""),
+            (("a.com/js/", "a.com/js/app.js a.com/css/"), "a.com/js/app.js"),
+            (("a.com/j%73/", "a.com/js/app.js"), "a.com/js/app.js"),
+            (("a.com/app.js", "a.com/app.js/"), ""),
+        ]
+        for directives, expected in cases:
+            with self.subTest(directives):
+                self.assertIntersection(directives, expected)
+
+    def test_schemes_and_keywords(self):
+        cases = [
+            (("https: data:", "data: blob:"), "data:"),
+            (("http:", "https:"), "https:"),
+            (("*", "https: data:"), "https:"),
+            (("'self' 'unsafe-eval'", "'self' 'unsafe-inline'"), "'self'"),
+            # 'self' also allows ws: and wss: on the own host, '*' does not
+            (("*", "'self'"), ""),
+            (("* ws:", "'self'"), "'self'"),
+            (("'none'", "a.com"), ""),
+            (("'nonce-a' 'unsafe-inline'", "'nonce-a' 'unsafe-inline'"), "'nonce-a'"),
+        ]
+        for directives, expected in cases:
+            with self.subTest(directives):
+                self.assertIntersection(directives, expected)
+
+    def test_strict_dynamic(self):
+        directives = ("'strict-dynamic' 'nonce-a' https:", "'nonce-a' https:")
+        self.assertIntersection(directives, "'nonce-a'", script=True)
+        self.assertIntersection(directives, "'nonce-a' https:", script=False)
+
+    def test_many_lists(self):
+        self.assertIntersection(
+            (
+                "https://a.com https://b.com c.com",
+                "https://*.com c.com",
+                "https:",
+                "https://b.com c.com",
+            ),
+            "https://b.com",
+        )
+
+
+class EffectiveTest(TestCase):
+    def effective(self, header: str) -> str:
+        return str(policy_list_from_string(header).effective())
+
+    def test_single_policy(self):
+        cases = [
+            "default-src 'self'",
+            "default-src 'self'; script-src a.com",
+            "img-src a.com; object-src 'none'",
+        ]
+        for header in cases:
+            with self.subTest(header):
+                self.assertEqual(
+                    self.effective(header),
+                    str(policy_list_from_string(header)[0].normalized()),
+                )
+
+    def test_fallback(self):
+        cases = {
+            "default-src 'self' https:, script-src https://a.com b.com": (
+                "default-src 'self' https:; script-src https://a.com"
+            ),
+            "script-src a.com b.com, default-src b.com; img-src *": (
+                "default-src b.com; img-src *"
+            ),
+            "img-src a.com, img-src b.com": "img-src 'none'",
+            "child-src a.com, script-src a.com": ("child-src a.com; script-src a.com"),
+        }
+        for header, expected in cases.items():
+            with self.subTest(header):
+                self.assertEqual(self.effective(header), expected)
+
+    def test_other_directives(self):
+        header = (
+            "sandbox allow-scripts allow-forms; frame-ancestors 'self' https://a.com; "
+            "report-uri /csp, sandbox allow-forms; frame-ancestors https:; "
+            "base-uri 'none'"
+        )
+        self.assertEqual(
+            self.effective(header),
+            "base-uri 'none'; frame-ancestors https://a.com; sandbox allow-forms",
+        )
+
+    def test_trusted_types_webrtc_upgrade(self):
+        cases = {
+            "require-trusted-types-for 'script'; trusted-types a; "
+            "upgrade-insecure-requests": (
+                "require-trusted-types-for 'script'; trusted-types a; "
+                "upgrade-insecure-requests"
+            ),
+            "trusted-types a b 'allow-duplicates', trusted-types b c": (
+                "trusted-types b"
+            ),
+            "trusted-types a b 'allow-duplicates', trusted-types * 'allow-duplicates'": (
+                "trusted-types 'allow-duplicates' a b"
+            ),
+            "trusted-types *, trusted-types *": "trusted-types *",
+            "trusted-types a, trusted-types b": "trusted-types 'none'",
+            "trusted-types, img-src a.com": "img-src a.com; trusted-types 'none'",
+            "img-src a.com, require-trusted-types-for 'script'": (
+                "img-src a.com; require-trusted-types-for 'script'"
+            ),
+            "webrtc 'allow', webrtc 'block'": "webrtc 'block'",
+            "webrtc 'allow', img-src a.com": "img-src a.com; webrtc 'allow'",
+            "img-src a.com, Upgrade-Insecure-Requests": (
+                "img-src a.com; upgrade-insecure-requests"
+            ),
+        }
+        for header, expected in cases.items():
+            with self.subTest(header):
+                self.assertEqual(self.effective(header), expected)
+
+    def test_cached(self):
+        policy_list = policy_list_from_string("img-src a.com, img-src a.com b.com")
+        self.assertIs(policy_list.effective(), policy_list.effective())
+
+    def test_and(self):
+        a = Policy(ImgSrc(HostSrc("a.com"), HostSrc("b.com")))
+        b = Policy(DefaultSrc(HostSrc("*.b.com"), HostSrc("b.com")))
+        self.assertEqual(
+            str((a & b).effective()), "default-src *.b.com b.com; img-src b.com"
+        )
+
+    def test_never_more_lenient(self):
+        header = (
+            "default-src 'self' https:; script-src 'self' *.cdn.test:443 "
+            "'unsafe-inline'; img-src * data:, "
+            "default-src 'none'; script-src https://a.cdn.test 'self'; "
+            "img-src https: blob:; connect-src wss://ws.test 'self'"
+        )
+        policy_list = policy_list_from_string(header)
+        effective = policy_list.effective()
+        urls = [
+            "https://example.com/",
+            "http://example.com/",
+            "https://a.cdn.test/x.js",
+            "https://b.cdn.test/x.js",
+            "https://img.test/a.png",
+            "data:image/png;base64,AA",
+            "blob:https://example.com/id",
+            "wss://ws.test/",
+        ]
+        for destination in ("script", "image", "", "style", "font", "worker"):
+            for url in urls:
+                with self.subTest(destination=destination, url=url):
+                    if effective.allows(url, destination, ORIGIN):
+                        self.assertTrue(policy_list.allows(url, destination, ORIGIN))
+        self.assertTrue(effective.allows("https://a.cdn.test/x.js", "script", ORIGIN))
+        self.assertTrue(effective.allows("https://example.com/x", "", ORIGIN))
+
+    def test_never_more_lenient_websockets(self):
+        urls = [
+            "wss://example.com/socket",
+            "ws://example.com/socket",
+            "wss://other.test/socket",
+            "https://example.com/",
+        ]
+        for header in (
+            "connect-src *, connect-src 'self'",
+            "connect-src 'self', default-src *",
+            "connect-src * wss:, connect-src 'self'",
+            "connect-src * ws:, connect-src 'self' https:",
+        ):
+            policy_list = policy_list_from_string(header)
+            effective = policy_list.effective()
+            for origin in (ORIGIN, "http://example.com"):
+                for url in urls:
+                    with self.subTest(header=header, origin=origin, url=url):
+                        if effective.allows(url, "", origin):
+                            self.assertTrue(policy_list.allows(url, "", origin))
@@ -0,0 +1,318 @@
+from unittest import TestCase
+
+from content_security_policy import *
+from content_security_policy.matching import (
+    INVALID_URL,
+    NO_SOURCE,
+    SourceListMatcher,
+    effective_directive,
+    fallback_directives,
+    matcher_for,
+)
+from content_security_policy.parse import (
+    directive_from_string,
+    policy_from_string,
+    policy_list_from_string,
+)
+
+ORIGIN = "https://example.com"
+
+
+def _matcher(sources: str) -> SourceListMatcher:
+    return SourceListMatcher(directive_from_string(f"img-src {sources}".strip()).values)
+
+
+class SourceListMatcherTest(TestCase):
+    def assertMatches(self, sources: str, url: str, origin=ORIGIN):
+        matcher = _matcher(sources)
+        self.assertTrue(matcher.matches(url, origin), f"{sources} must match {url}")
+
+    def assertNotMatches(self, sources: str, url: str, origin=ORIGIN):
+        matcher = _matcher(sources)
+        self.assertFalse(matcher.matches(url, origin), f"{sources} matches {url}")
+
+    def test_host(self):
+        for url in ("https://a.com", "https://A.COM/x", "https://a.com:443/"):
+            with self.subTest(url):
+                self.assertMatches("A.com", url)
+        for url in ("https://b.com", "https://x.a.com", "https://a.com:8443"):
+            with self.subTest(url):
+                self.assertNotMatches("a.com", url)
+
+    def test_wildcard_host(self):
+        for url in ("https://x.a.com", "https://x.y.A.com/"):
+            with self.subTest(url):
+                self.assertMatches("*.a.com", url)
+        for url in ("https://a.com", "https://xa.com", "https://x.a.com.evil"):
+            with self.subTest(url):
+                self.assertNotMatches("*.a.com", url)
+        self.assertMatches("https://*", "https://anything.test")
+        self.assertNotMatches("https://*", "http://anything.test")
+
+    def test_scheme(self):
+        cases = [
+            ("http://a.com", "https://a.com", True),
+            ("https://a.com", "http://a.com", False),
+            ("ws://a.com", "wss://a.com", True),
+            ("ws://a.com", "https://a.com", True),
+            ("wss://a.com", "ws://a.com", False),
+            ("https:", "https://any.test/", True),
+            ("http:", "https://any.test/", True),
+            ("HTTPS:", "http://any.test/", False),
+            ("data:", "data:image/png;base64,AAAA", True),
+            ("blob:", "data:image/png;base64,AAAA", False),
+        ]
+        for sources, url, expected in cases:
+            with self.subTest(sources=sources, url=url):
+                if expected:
+                    self.assertMatches(sources, url)
+                else:
+                    self.assertNotMatches(sources, url)
+
+    def test_scheme_from_origin(self):
+        self.assertMatches("a.com", "https://a.com", origin="http://example.com")
+        self.assertNotMatches("a.com", "http://a.com", origin="https://example.com")
+        self.assertNotMatches("a.com", "https://a.com", origin=None)
+
+    def test_port(self):
+        cases = [
+            ("a.com:443", "https://a.com", True),
+            ("a.com:8443", "https://a.com:8443", True),
+            ("a.com:8443", "https://a.com", False),
+            ("a.com:*", "https://a.com:1234", True),
+            ("a.com", "https://a.com:1234", False),
+            ("http://a.com", "https://a.com", True),
+            ("http://a.com:80", "https://a.com:80", True),
+        ]
+        for sources, url, expected in cases:
+            with self.subTest(sources=sources, url=url):
+                if expected:
+                    self.assertMatches(sources, url)
+                else:
+                    self.assertNotMatches(sources, url)
+
+    def test_path(self):
+        cases = [
+            ("a.com/js/", "https://a.com/js/app.js", True),
+            ("a.com/js/", "https://a.com/js/lib/app.js", True),
+            ("a.com/js/", "https://a.com/js", False),
+            ("a.com/js/app.js", "https://a.com/js/app.js", True),
+            ("a.com/js/app.js", "https://a.com/js/app.js?v=1", True),
+            ("a.com/js/app.js", "https://a.com/js/app.js/x", False),
+            ("a.com/js/app.js", "https://a.com/JS/app.js", False),
+            ("a.com/j%73/", "https://a.com/js/app.js", True),
+            ("a.com/", "https://a.com", True),
+        ]
+        for sources, url, expected in cases:
+            with self.subTest(sources=sources, url=url):
+                if expected:
+                    self.assertMatches(sources, url)
+                else:
+                    self.assertNotMatches(sources, url)
+
+    def test_wildcard(self):
+        for url in ("https://a.com", "http://a.com:8080/x"):
+            with self.subTest(url):
+                self.assertMatches("*", url)
+        for url in ("data:,x", "blob:https://example.com/id", "ws://a.com"):
+            with self.subTest(url):
+                self.assertNotMatches("*", url)
+        self.assertMatches("*", "ws://a.com", origin="ws://example.com")
+
+    def test_self(self):
+        cases = [
+            ("https://example.com/x", "https://example.com", True),
+            ("wss://example.com/x", "https://example.com", True),
+            ("https://example.com/x", "http://example.com", True),
+            ("ws://example.com/x", "http://example.com", True),
+            ("http://example.com/x", "https://example.com", False),
+            ("https://example.com:8443/x", "https://example.com", False),
+            ("https://sub.example.com/x", "https://example.com", False),
+            ("https://example.com/x", None, False),
+        ]
+        for url, origin, expected in cases:
+            with self.subTest(url=url, origin=origin):
+                if expected:
+                    self.assertMatches("'self'", url, origin=origin)
+                else:
+                    self.assertNotMatches("'self'", url, origin=origin)
+
+    def test_no_url_sources(self):
+        for sources in ("'none'", "'unsafe-inline' 'strict-dynamic'", ""):
+            with self.subTest(sources):
+                self.assertNotMatches(sources, "https://example.com")
+
+    def test_invalid_url(self):
+        matcher = SourceListMatcher([HostSrc("a.com")])
+        for url in ("/relative", "https://a.com:port"):
+            with self.subTest(url):
+                with self.assertRaises(ValueError):
+                    matcher.matches(url, ORIGIN)
+
+    def test_many_hosts(self):
+        sources = [HostSrc(f"https://host{i}.test") for i in range(5000)]
+        sources += [HostSrc(f"*.wildcard{i}.test") for i in range(5000)]
+        matcher = SourceListMatcher(sources)
+        self.assertTrue(matcher.matches("https://host4999.test/x"))
+        self.assertTrue(matcher.matches("https://a.wildcard1234.test/x", ORIGIN))
+        self.assertFalse(matcher.matches("https://host5000.test/x"))
+        self.assertFalse(matcher.matches("https://wildcard1234.test/x", ORIGIN))
+
+    def test_match_index(self):
+        matcher = _matcher("'self' a.com *.a.com https: a.com/path")
+        cases = [
+            ("https://example.com/", 0),
+            ("https://a.com/path", 1),
+            ("https://x.a.com/", 2),
+            ("https://other.com/", 3),
+            ("http://other.com/", NO_SOURCE),
+        ]
+        for url, expected in cases:
+            with self.subTest(url):
+                self.assertEqual(matcher.match_index(url, ORIGIN), expected)
+
+    def test_match_indices(self):
+        matcher = _matcher("a.com/js/ *.b.com")
+        urls = [
+            "https://a.com/js/app.js",
+            "https://a.com/css/app.css",
+            "https://x.b.com/1",
+            "https://x.b.com/2",
+            "https://c.com/",
+            "not a url",
+            "https://a.com/js/app.js",
+        ]
+        self.assertEqual(
+            list(matcher.match_indices(urls, ORIGIN)),
+            [0, NO_SOURCE, 1, 1, NO_SOURCE, INVALID_URL, 0],
+        )
+        valid = urls[:5]
+        self.assertEqual(
+            list(matcher.match_indices(valid, ORIGIN)),
+            [matcher.match_index(url, ORIGIN) for url in valid],
+        )
+
+
+class EffectiveDirectiveTest(TestCase):
+    def test_effective_directive(self):
+        cases = {
+            "script": ScriptSrcElem,
+            "style": StyleSrcElem,
+            "image": ImgSrc,
+            "worker": WorkerSrc,
+            "": ConnectSrc,
+            "document": None,
+        }
+        for destination, directive_class in cases.items():
+            with self.subTest(destination):
+                self.assertIs(effective_directive(destination), directive_class)
+        with self.assertRaises(ValueError):
+            effective_directive("no-such-destination")
+
+    def test_fallback_directives(self):
+        self.assertEqual(
+            fallback_directives(ScriptSrcElem), (ScriptSrcElem, ScriptSrc, DefaultSrc)
+        )
+        self.assertEqual(
+            fallback_directives(WorkerSrc), (WorkerSrc, ChildSrc, ScriptSrc, DefaultSrc)
+        )
+        self.assertEqual(fallback_directives(BaseUri), (BaseUri,))
+
+
+class PolicyAllowsTest(TestCase):
+    def test_fallback(self):
+        cases = [
+            ("script-src-elem a.com; script-src b.com", "https://a.com", True),
+            ("script-src-elem a.com; script-src b.com", "https://b.com", False),
+            ("script-src b.com; default-src a.com", "https://b.com", True),
+            ("script-src b.com; default-src a.com", "https://a.com", False),
+            ("default-src a.com", "https://a.com", True),
+            ("img-src a.com", "https://b.com", True),
+            ("", "https://b.com", True),
+        ]
+        for header, url, expected in cases:
+            for lazy in (False, True):
+                with self.subTest(header=header, url=url, lazy=lazy):
+                    policy = policy_from_string(header, lazy=lazy)
+                    self.assertIs(policy.allows(url, "script", ORIGIN), expected)
+
+    def test_first_directive_is_effective(self):
+        policy = policy_from_string("img-src a.com; img-src b.com")
+        self.assertTrue(policy.allows("https://a.com", "image", ORIGIN))
+        self.assertFalse(policy.allows("https://b.com", "image", ORIGIN))
+
+    def test_worker_fallback(self):
+        policy = policy_from_string("child-src a.com; script-src b.com")
+        self.assertTrue(policy.allows("https://a.com", "worker", ORIGIN))
+        self.assertFalse(policy.allows("https://b.com", "worker", ORIGIN))
+
+    def test_strict_dynamic(self):
+        policy = policy_from_string("script-src 'strict-dynamic' a.com; img-src a.com")
+        self.assertFalse(policy.allows("https://a.com", "script", ORIGIN))
+        self.assertTrue(policy.allows("https://a.com", "image", ORIGIN))
+
+    def test_not_governed(self):
+        policy = policy_from_string("default-src 'none'")
+        self.assertTrue(policy.allows("https://a.com", "document", ORIGIN))
+        self.assertFalse(policy.allows("https://a.com", "", ORIGIN))
+
+    def test_compiled_once(self):
+        policy = policy_from_string("default-src 'self'")
+        self.assertIs(matcher_for(policy), matcher_for(policy))
+
+    def test_equal_policies_not_shared(self):
+        # Equal policies may have their sources in other positions
+        a = policy_from_string("script-src a.com b.com")
+        b = policy_from_string("script-src B.com a.com")
+        self.assertEqual(a, b)
+        result = a.check_many(["https://b.com/x"], "script", ORIGIN)
+        self.assertEqual(list(result.sources), [1])
+        result = b.check_many(["https://b.com/x"], "script", ORIGIN)
+        self.assertIs(result.directive, b.script_src)
+        self.assertEqual(list(result.sources), [0])
+        self.assertIsNot(matcher_for(a), matcher_for(b))
+
+    def test_policy_list(self):
+        policy_list = policy_list_from_string(
+            "img-src a.com b.com, img-src b.com c.com"
+        )
+        self.assertTrue(policy_list.allows("https://b.com", "image", ORIGIN))
+        self.assertFalse(policy_list.allows("https://a.com", "image", ORIGIN))
+        self.assertFalse(policy_list.allows("https://c.com", "image", ORIGIN))
+
+
+class CheckManyTest(TestCase):
+    urls = [
+        "https://cdn.example.com/app.js",
+        "https://evil.test/x.js",
+        "data:text/javascript,1",
+        "/relative",
+    ]
+
+    def test_check_many(self):
+        policy = policy_from_string(
+            "default-src 'none'; script-src 'self' cdn.example.com data:"
+        )
+        results = policy.check_many(self.urls * 2, "script", ORIGIN)
+        self.assertIs(results.directive, policy.script_src)
+        self.assertEqual(list(results.allowed), [1, 0, 1, 0] * 2)
+        self.assertEqual(list(results.sources), [1, NO_SOURCE, 2, INVALID_URL] * 2)
+        for url, allowed in zip(self.urls[:3], results.allowed):
+            with self.subTest(url):
+                self.assertEqual(policy.allows(url, "script", ORIGIN), allowed)
+
+    def test_not_governed(self):
+        policy = policy_from_string("img-src 'none'")
+        results = policy.check_many(iter(self.urls), "script", ORIGIN)
+        self.assertIsNone(results.directive)
+        self.assertEqual(list(results.allowed), [1] * len(self.urls))
+        self.assertEqual(list(results.sources), [NO_SOURCE] * len(self.urls))
+
+    def test_strict_dynamic(self):
+        policy = policy_from_string("script-src 'strict-dynamic' https:")
+        results = policy.check_many(self.urls, "script", ORIGIN)
+        self.assertEqual(list(results.allowed), [0] * len(self.urls))
+
+    def test_empty(self):
+        results = policy_from_string("img-src a.com").check_many([], "image")
+        self.assertEqual((len(results.allowed), len(results.sources)), (0, 0))
@@ -0,0 +1,109 @@
+import tracemalloc
+import weakref
+from unittest import TestCase
+
+from content_security_policy import *
+from content_security_policy.parse import LazyPolicy, policy_list_from_string
+
+HEADER = (
+    "default-src 'self' https://cdn.example.com; script-src 'nonce-abc' "
+    "'strict-dynamic' https:; frame-ancestors 'none'; sandbox allow-scripts; "
+    "report-uri /csp; report-to csp; trusted-types * policy 'allow-duplicates'; "
+    "require-trusted-types-for 'script'; webrtc 'allow'; x-unknown value, "
+    "img-src 'self'"
+)
+
+
+class Slots(TestCase):
+    def test_no_instance_dict(self):
+        policy_list = policy_list_from_string(HEADER, lazy=False)
+        objects = [policy_list, *policy_list]
+        for policy in policy_list:
+            for directive in policy:
+                objects.append(directive)
+                objects.extend(directive.values)
+        objects.extend(
+            [KeywordSource.self, SandboxToken.allow_scripts, NoneSrc(), HostSrc("a")]
+        )
+        for obj in objects:
+            with self.subTest(type(obj).__name__):
+                self.assertFalse(hasattr(obj, "__dict__"))
+
+    def test_lazy_policy(self):
+        policy = policy_list_from_string(HEADER, lazy=True)[0]
+        self.assertIsInstance(policy, LazyPolicy)
+        self.assertFalse(hasattr(policy, "__dict__"))
+
+    def test_cached_value(self):
+        directive = policy_list_from_string(HEADER)[0].default_src
+        self.assertIs(directive.value, directive.value)
+        self.assertEqual(directive.value, "'self' https://cdn.example.com")
+
+
+class Footprint(TestCase):
+    def test_bytes_per_policy(self):
+        # Distinct headers with the same shape, values are interned across them.
+        headers = [
+            f"default-src 'self' https://cdn{i}.example.com; script-src 'self' "
+            f"'unsafe-inline' https://js{i}.example.com; img-src * data:; "
+            "object-src 'none'"
+            for i in range(1000)
+        ]
+        tracemalloc.start()
+        try:
+            parsed = [policy_list_from_string(h) for h in headers]
+            size, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(len(parsed), len(headers))
+        # About 1920 bytes per policy with instance dictionaries, 1530 with slots
+        self.assertLess(size / len(headers), 1700)
+
+
+class Leaks(TestCase):
+    @staticmethod
+    def use(policy_list: PolicyList):
+        str(policy_list)
+        for policy in policy_list:
+            str(policy)
+            policy["img-src"]
+            policy[ImgSrc]
+            policy.img_src
+            policy - ScriptSrc
+            for directive in policy:
+                str(directive)
+                directive.value
+
+    def test_freed_after_use(self):
+        policy_list = policy_list_from_string(
+            "img-src 'self' a.com; script-src 'none', img-src b.com"
+        )
+        self.use(policy_list)
+        refs = [weakref.ref(policy_list)]
+        for policy in policy_list:
+            refs.append(weakref.ref(policy))
+            refs.extend(weakref.ref(directive) for directive in policy)
+        del policy, policy_list
+        for ref in refs:
+            self.assertIsNone(ref())
+
+    def test_steady_memory(self):
+        def parse_and_drop(count: int):
+            for i in range(count):
+                self.use(
+                    policy_list_from_string(
+                        f"img-src 'self' a{i}.com; script-src 'none', img-src b{i}.com"
+                    )
+                )
+
+        parse_and_drop(100)
+        tracemalloc.start()
+        try:
+            before, _ = tracemalloc.get_traced_memory()
+            parse_and_drop(2000)
+            after, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        # Caches on the instances are freed with them. Global caches kept several MB
+        # here, the margin is for dicts that happen to resize.
+        self.assertLess(after - before, 1_000_000)
@@ -0,0 +1,168 @@
+from unittest import TestCase
+
+from content_security_policy import *
+from content_security_policy.minimize import minimize_sources
+from content_security_policy.parse import directive_from_string, policy_from_string
+
+ORIGIN = "https://example.com"
+
+
+class MinimizeSourcesTest(TestCase):
+    def test_subsumed(self):
+        cases = [
+            ("*.a.com x.a.com x.y.a.com a.com", "*.a.com a.com"),
+            ("x.a.com *.a.com", "*.a.com"),
+            ("https://a.com https: http://b.com", "https: http://b.com"),
+            ("http: https: data:", "http: data:"),
+            ("https: ws:", "ws:"),
+            ("* https: a.com 'self' data:", "* 'self' data:"),
+            ("* https: 'self' ws: data:", "* ws: data:"),
+            ("a.com/js/app.js a.com/js/ a.com/css/", "a.com/js/ a.com/css/"),
+            ("a.com:* a.com:8443 https://a.com", "a.com:*"),
+            ("https://a.com:443 a.com", "a.com"),
+            ("a.com A.com a.com", "a.com"),
+            (
+                "'self' 'unsafe-inline' 'nonce-a' 'nonce-a'",
+                "'self' 'unsafe-inline' 'nonce-a'",
+            ),
+            ("'none'", "'none'"),
+        ]
+        for sources, expected in cases:
+            with self.subTest(sources):
+                values = directive_from_string(f"img-src {sources}").values
+                self.assertEqual(" ".join(map(str, minimize_sources(values))), expected)
+
+    def test_not_subsumed(self):
+        for sources in (
+            "https: a.com",
+            "a.com:443 a.com",
+            "a.com/js/ a.com/js",
+            "*.a.com *.b.com",
+            "wss: http:",
+        ):
+            with self.subTest(sources):
+                values = directive_from_string(f"img-src {sources}").values
+                self.assertEqual(" ".join(map(str, minimize_sources(values))), sources)
+
+    def test_many_sources(self):
+        sources = [HostSrc(f"https://host{i}.example.com") for i in range(5000)]
+        sources += [HostSrc("*.example.com"), HostSrc("other.test")]
+        self.assertEqual(
+            list(map(str, minimize_sources(sources))), ["*.example.com", "other.test"]
+        )
+
+
+class MinimizedTest(TestCase):
+    def test_minimized(self):
+        cases = {
+            "default-src 'self' https:; img-src 'self'   https:;img-src x.com": (
+                "default-src 'self' https:"
+            ),
+            "default-src a.com; script-src a.com; script-src-elem a.com; "
+            "worker-src b.com": "default-src a.com; worker-src b.com",
+            # Without child-src, worker-src would fall back to script-src
+            "default-src a.com; child-src a.com; script-src b.com": (
+                "default-src a.com; child-src a.com; script-src b.com"
+            ),
+            "script-src x.a.com *.a.com; report-uri /a; REPORT-URI /b": (
+                "script-src *.a.com; report-uri /a"
+            ),
+            "frame-ancestors 'self' https: https://x.com": (
+                "frame-ancestors 'self' https:"
+            ),
+            "img-src a.com": "img-src a.com",
+        }
+        for header, expected in cases.items():
+            with self.subTest(header):
+                result = policy_from_string(header).minimized()
+                self.assertEqual(str(result.policy), expected)
+                self.assertEqual(result.size, len(expected))
+                self.assertTrue(result.within_budget)
+
+    def test_default_src_kept(self):
+        # Directives this library does not know may fall back to default-src
+        header = "default-src a.com; " + "; ".join(
+            f"{name} a.com"
+            for name in (
+                "child-src",
+                "connect-src",
+                "font-src",
+                "frame-src",
+                "img-src",
+                "manifest-src",
+                "media-src",
+                "object-src",
+                "script-src",
+                "script-src-elem",
+                "script-src-attr",
+                "style-src",
+                "style-src-elem",
+                "style-src-attr",
+                "worker-src",
+            )
+        )
+        self.assertEqual(
+            str(policy_from_string(header).minimized().policy), "default-src a.com"
+        )
+
+    def test_budget(self):
+        policy = policy_from_string("script-src a.com b.com")
+        self.assertEqual(policy.minimized(22), (policy.normalized(), 22, True))
+        self.assertFalse(policy.minimized(21).within_budget)
+
+    def test_same_matches(self):
+        header = (
+            "default-src 'self' https:; script-src 'self' *.cdn.test cdn.test "
+            "x.cdn.test https://y.cdn.test:443 https: 'unsafe-inline'; "
+            "img-src * data: https: 'self'; connect-src 'self' https:; "
+            "worker-src 'self' https:; img-src a.com"
+        )
+        policy = policy_from_string(header)
+        minimized = policy.minimized().policy
+        self.assertLess(len(str(minimized)), len(header))
+        urls = [
+            "https://example.com/",
+            "http://example.com/",
+            "https://x.cdn.test/a.js",
+            "http://x.cdn.test/a.js",
+            "http://cdn.test/a.js",
+            "https://other.test/",
+            "data:,a",
+            "ws://example.com/",
+        ]
+        for destination in ("script", "image", "", "worker", "style", "font"):
+            for url in urls:
+                with self.subTest(destination=destination, url=url):
+                    self.assertEqual(
+                        minimized.allows(url, destination, ORIGIN),
+                        policy.allows(url, destination, ORIGIN),
+                    )
+
+    def test_same_matches_websockets(self):
+        # 'self' also allows ws: and wss: on the own host, '*' does not
+        urls = [
+            "wss://example.com/socket",
+            "ws://example.com/socket",
+            "wss://other.test/socket",
+            "https://example.com/",
+            "https://other.test/",
+        ]
+        for header in (
+            "connect-src 'self' *",
+            "connect-src 'self' * wss:",
+            "connect-src 'self' * ws:",
+            "default-src * 'self'; connect-src 'self' *",
+        ):
+            policy = policy_from_string(header)
+            minimized = policy.minimized().policy
+            for origin in (ORIGIN, "http://example.com"):
+                for url in urls:
+                    with self.subTest(header=header, origin=origin, url=url):
+                        self.assertEqual(
+                            minimized.allows(url, "", origin),
+                            policy.allows(url, "", origin),
+                        )
+        self.assertEqual(
+            str(policy_from_string("connect-src 'self' * ws:").minimized().policy),
+            "connect-src * ws:",
+        )
@@ -0,0 +1,85 @@
+import os
+from unittest import TestCase, skipUnless
+
+from content_security_policy import *
+from content_security_policy.nonce import NoncePool, NonceTemplate, new_nonce
+from content_security_policy.parse import policy_from_string, policy_list_from_string
+from content_security_policy.patterns import BASE64_VALUE
+
+
+class NoncePoolTest(TestCase):
+    def test_nonces(self):
+        for size in (16, 18, 32):
+            with self.subTest(size):
+                pool = NoncePool(size, batch=8)
+                nonces = [pool() for _ in range(100)]
+                self.assertEqual(len(set(nonces)), len(nonces))
+                for nonce in nonces:
+                    self.assertTrue(BASE64_VALUE.fullmatch(nonce))
+                    self.assertEqual(len(nonce), (size + 2) // 3 * 4)
+                    # Valid nonce sources without further checks
+                    self.assertEqual(str(NonceSrc(nonce)), f"'nonce-{nonce}'")
+
+    def test_minimum_size(self):
+        with self.assertRaises(ValueError):
+            NoncePool(8)
+        with self.assertRaises(ValueError):
+            NoncePool(batch=0)
+
+    @skipUnless(hasattr(os, "fork"), "Needs os.fork")
+    def test_fork(self):
+        # The child must not use nonces that the parent buffered
+        new_nonce()
+        read, write = os.pipe()
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover
+            os.write(write, new_nonce().encode("ascii"))
+            os._exit(0)
+        os.close(write)
+        child_nonce = os.read(read, 100).decode("ascii")
+        os.close(read)
+        os.waitpid(pid, 0)
+        self.assertNotIn(child_nonce, new_nonce._nonces)
+
+
+class NonceTemplateTest(TestCase):
+    def test_render(self):
+        cases = {
+            "script-src 'self'; img-src *": "script-src 'self' 'nonce-N'; img-src *",
+            # Fallback to default-src
+            "default-src 'self'": "default-src 'self' 'nonce-N'",
+            "default-src 'self'; script-src-elem a.com": (
+                "default-src 'self' 'nonce-N'; script-src-elem a.com 'nonce-N'"
+            ),
+            "script-src 'NONE'": "script-src 'nonce-N'",
+            # Scripts are not restricted, a nonce would restrict them
+            "img-src *": "img-src *",
+            "Script-Src\t'self' ;report-uri /csp": (
+                "Script-Src\t'self' 'nonce-N' ;report-uri /csp"
+            ),
+        }
+        for header, expected in cases.items():
+            with self.subTest(header):
+                template = NonceTemplate(policy_from_string(header))
+                self.assertEqual(template.render("N"), expected)
+
+    def test_policy_list(self):
+        policy_list = policy_list_from_string(" script-src a.com ,img-src *")
+        template = NonceTemplate(policy_list)
+        self.assertEqual(template.render("N"), " script-src a.com 'nonce-N' ,img-src *")
+        self.assertIs(template.policy, policy_list)
+
+    def test_directives(self):
+        policy = policy_from_string("default-src 'self'; style-src 'self'")
+        template = NonceTemplate(policy, directives=(StyleSrc,))
+        self.assertEqual(
+            template.render("N"), "default-src 'self'; style-src 'self' 'nonce-N'"
+        )
+
+    def test_same_as_policy(self):
+        policy = Policy(DefaultSrc(KeywordSource.self), ScriptSrc(HostSrc("a.com")))
+        nonce = new_nonce()
+        self.assertEqual(
+            NonceTemplate(policy).render(nonce),
+            str(Policy(policy.default_src, policy.script_src + NonceSrc(nonce))),
+        )
@@ -0,0 +1,82 @@
+import pickle
+from typing import List, cast
+from unittest import TestCase
+
+from content_security_policy import Policy, PolicyList
+from content_security_policy.parallel import parse_parallel
+from content_security_policy.parse import (
+    ParseResult,
+    iter_policy_lists,
+    policy_list_from_string,
+)
+
+HEADERS = [
+    "default-src 'self'; img-src * data:",
+    "script-src 'nonce-abc' 'strict-dynamic', object-src 'none'",
+    "  upgrade-insecure-requests; frame-ancestors 'self'  ",
+    "",
+    "img-src a.com;;img-src b.com",
+]
+
+
+def _directive_count(result: ParseResult) -> int:
+    if result.policy_list is None:
+        return 0
+    return sum(len(policy) for policy in result.policy_list)
+
+
+class ParallelParsingTest(TestCase):
+    def test_same_as_sequential(self):
+        headers = HEADERS * 7
+        for lazy in (False, True):
+            with self.subTest(lazy=lazy):
+                expected = list(iter_policy_lists(headers, lazy=lazy))
+                actual = list(
+                    parse_parallel(headers, chunk_size=3, max_workers=2, lazy=lazy)
+                )
+                self.assertEqual(
+                    [r.position for r in actual], list(range(len(headers)))
+                )
+                self.assertEqual(
+                    [str(r.policy_list) for r in actual],
+                    [str(r.policy_list) for r in expected],
+                )
+
+    def test_map_result(self):
+        results = list(
+            parse_parallel(HEADERS, chunk_size=2, map_result=_directive_count)
+        )
+        self.assertEqual(results, [2, 2, 2, 0, 3])
+
+    def test_errors_in_band(self):
+        # The int is not a header, parsing it fails in the worker
+        headers = cast(List[str], ["img-src a.com", 1, "img-src b.com"])
+        results = list(parse_parallel(headers))
+        self.assertIsNone(results[0].error)
+        self.assertIsInstance(results[1].error, Exception)
+        self.assertIsNone(results[1].policy_list)
+        self.assertIsNone(results[2].error)
+
+    def test_invalid_chunk_size(self):
+        with self.assertRaises(ValueError):
+            list(parse_parallel(HEADERS, chunk_size=0))
+
+
+class PicklingTest(TestCase):
+    def test_round_trip(self):
+        for header in HEADERS:
+            for lazy in (False, True):
+                with self.subTest(header=header, lazy=lazy):
+                    policy_list = policy_list_from_string(header, lazy=lazy)
+                    restored = pickle.loads(pickle.dumps(policy_list))
+                    self.assertIsInstance(restored, PolicyList)
+                    self.assertEqual(str(restored), header)
+                    self.assertEqual(
+                        [type(p) for p in restored], [type(p) for p in policy_list]
+                    )
+                    for policy, restored_policy in zip(policy_list, restored):
+                        self.assertIsInstance(restored_policy, Policy)
+                        self.assertEqual(
+                            [type(d) for d in restored_policy],
+                            [type(d) for d in policy],
+                        )
@@ -1,10 +1,21 @@
+import pickle
+from io import StringIO
 from unittest import TestCase
 
-from content_security_policy import RequireTrustedTypesFor, TrustedTypesSinkGroup
+from content_security_policy import *
+from content_security_policy.exceptions import BadSourceList
 from content_security_policy.parse import (
+    _PARSING_RULES,
+    LazyPolicy,
+    ParseLimits,
     directive_from_string,
+    iter_policy_lists,
+    iter_policy_lists_from_file,
+    policy_from_bytes,
     policy_from_string,
+    policy_list_from_bytes,
     policy_list_from_string,
+    value_item_from_string,
 )
 
 
@@ -34,6 +45,11 @@ class DirectiveParsing(TestCase):
         parsed = policy_list_from_string(as_string)
         self.assertEqual(as_string, str(parsed))
 
+    def test_parse_serialize_multiline_policy_list(self):
+        as_string = "script-src 'self'\n  https://example.com;\n\tobject-src 'none'\n"
+        parsed = policy_list_from_string(as_string)
+        self.assertEqual(as_string, str(parsed))
+
 
 class Delimiters(TestCase):
     def test_trailing_delimiters(self):
@@ -49,6 +65,15 @@ class Delimiters(TestCase):
                 self.assertEqual(len(policy), 1)
                 self.assertEqual(as_string, str(parsed))
 
+    def test_policy_separator_after_directive_separator(self):
+        as_string = "default-src 'none' \t;\t, script-src 'self'"
+        parsed = policy_list_from_string(as_string)
+        self.assertEqual(len(parsed), 2)
+        self.assertEqual(len(parsed[0]), 1)
+        self.assertEqual(parsed[0]._separators, (" \t;",))
+        self.assertEqual(parsed._separators, ("\t, ",))
+        self.assertEqual(as_string, str(parsed))
+
     def test_empty_directive(self):
         as_string = "require-trusted-types-for"
         parsed = policy_list_from_string(as_string)
@@ -58,7 +83,7 @@ class Delimiters(TestCase):
         self.assertEqual(as_string, str(parsed))
 
 
-class Sandbox(TestCase):
+class SandboxParsing(TestCase):
     def test_parse_sandbox(self):
         as_string = "sandbox allow-popups allow-scripts;"
         parsed = policy_list_from_string(as_string)
@@ -66,7 +91,7 @@ class Sandbox(TestCase):
         self.assertEqual(as_string, str(parsed))
 
 
-class TrustedTypes(TestCase):
+class TrustedTypesParsing(TestCase):
     def test_parse_trusted_types(self):
         as_string = "trusted-types pol1 pol-3 'allow-duplicates';"
         parsed = policy_list_from_string(as_string)
@@ -84,3 +109,357 @@ class TrustedTypes(TestCase):
         self.assertTrue(isinstance(value, TrustedTypesSinkGroup))
         self.assertEqual(str(value), "'script'")
         self.assertEqual(as_string, str(parsed))
+
+
+class ValueDispatch(TestCase):
+    value_strings = (
+        "'none'",
+        "'NoNe'",
+        "'self'",
+        "'SELF'",
+        "'unsafe-inline'",
+        "'strict-dynamic'",
+        "'nonce-EmTYwW9IZXpvlIOURJMuAQ'",
+        "'NONCE-abc'",
+        "'sha256-abc'",
+        "'SHA256-abc'",
+        "'sha1-abc'",
+        "'allow'",
+        "'block'",
+        "'script'",
+        "'allow-duplicates'",
+        "'garbage'",
+        "https:",
+        "HTTPS:",
+        "data:",
+        "1http:",
+        "https://example.com",
+        "*.example.com:*",
+        "example.com/path:",
+        "https://example.com/a:b/",
+        "allow-scripts",
+        "ALLOW-FORMS",
+        "default",
+        "pol-1",
+        "*",
+        "/_/csp-report",
+        "//example.com/report?a=b#c",
+        "endpoint",
+        "",
+        ":",
+        "'",
+    )
+
+    def test_same_as_trying_all_patterns(self):
+        """
+        Dispatching must pick the first type of a parsing rule whose pattern matches.
+        """
+        for d_type, value_types in _PARSING_RULES.items():
+            for value_string in self.value_strings:
+                with self.subTest(directive=d_type, value=value_string):
+                    expected = next(
+                        (
+                            v_type
+                            for v_type in value_types
+                            if v_type.pattern.fullmatch(value_string)
+                        ),
+                        UnrecognizedValueItem,
+                    )
+                    value = value_item_from_string(value_string, d_type)
+                    self.assertIs(type(value), expected)
+
+    def test_directive_names_case_insensitive(self):
+        for name in ("script-src", "SCRIPT-SRC", "Script-Src", "script_src"):
+            with self.subTest(name):
+                self.assertIsInstance(directive_from_string(name), ScriptSrc)
+
+    def test_pascal_case_directive_name_unrecognized(self):
+        self.assertIsInstance(directive_from_string("ScriptSrc"), UnrecognizedDirective)
+
+
+class LazyParsing(TestCase):
+    as_string = (
+        "default-src 'self'; Script-Src 'self' https://cdn.example.com;"
+        "frame-ancestors 'none' ; upgrade-insecure-requests ; "
+    )
+
+    def test_str_does_not_parse(self):
+        policy = policy_from_string(self.as_string, lazy=True)
+        self.assertIsInstance(policy, LazyPolicy)
+        self.assertEqual(self.as_string, str(policy))
+        self.assertEqual(len(policy), 4)
+        self.assertEqual(policy._parsed, [None] * 4)
+
+    def test_getitem_parses_one_directive(self):
+        policy = policy_from_string(self.as_string, lazy=True)
+        self.assertEqual(
+            str(policy["script-src"]), "Script-Src 'self' https://cdn.example.com"
+        )
+        self.assertEqual(str(policy.frame_ancestors), "frame-ancestors 'none'")
+        self.assertIsInstance(policy[-1], UnrecognizedDirective)
+        self.assertEqual(
+            [directive is not None for directive in policy._parsed],
+            [False, True, True, True],
+        )
+
+    def test_missing_directive(self):
+        policy = policy_from_string(self.as_string, lazy=True)
+        with self.assertRaises(IndexError):
+            _ = policy[StyleSrc]
+        with self.assertRaises(AttributeError):
+            _ = policy.style_src
+        self.assertEqual(policy._parsed, [None] * 4)
+
+    def test_same_as_eager(self):
+        eager = policy_from_string(self.as_string)
+        lazy = policy_from_string(self.as_string, lazy=True)
+        self.assertEqual(
+            [str(directive) for directive in eager],
+            [str(directive) for directive in lazy],
+        )
+        self.assertEqual(
+            [type(directive) for directive in eager],
+            [type(directive) for directive in lazy.directives],
+        )
+        self.assertEqual(eager._get_indices(SourceListDirective), (0, 1))
+        self.assertEqual(lazy._get_indices(SourceListDirective), (0, 1))
+
+    def test_manipulation(self):
+        policy = policy_from_string(self.as_string, lazy=True)
+        eager = policy_from_string(self.as_string)
+        self.assertEqual(str(policy - ScriptSrc), str(eager - ScriptSrc))
+        self.assertEqual(str(policy + ImgSrc(SelfSrc)), str(eager + ImgSrc(SelfSrc)))
+
+    def test_policy_list(self):
+        as_string = " \tscript-src 'self' ;, default-src 'none'\n"
+        parsed = policy_list_from_string(as_string, lazy=True)
+        self.assertEqual(as_string, str(parsed))
+        self.assertEqual(len(parsed), 2)
+        self.assertTrue(all(isinstance(policy, LazyPolicy) for policy in parsed))
+        self.assertEqual(str(parsed[1].default_src), "default-src 'none'")
+
+
+class StreamingParsing(TestCase):
+    headers = [
+        "default-src 'self'; script-src 'self' https://cdn.example.com",
+        "script-src 'none' 'self'",
+        " img-src 'self' , frame-ancestors 'none' ",
+        "",
+    ]
+
+    def test_results_in_order(self):
+        results = list(iter_policy_lists(self.headers))
+        self.assertEqual([r.position for r in results], [0, 1, 2, 3])
+        self.assertEqual([r.header for r in results], self.headers)
+        for result in results:
+            if result.error is None:
+                self.assertEqual(result.header, str(result.policy_list))
+
+    def test_errors_in_band(self):
+        results = list(iter_policy_lists(self.headers))
+        self.assertIsNone(results[1].policy_list)
+        self.assertIsInstance(results[1].error, BadSourceList)
+        self.assertIsNone(results[2].error)
+        assert results[2].policy_list is not None
+        self.assertEqual(len(results[2].policy_list), 2)
+
+    def test_generator(self):
+        def headers():
+            yield "default-src 'self'"
+            raise AssertionError("Consumed more than needed.")
+
+        results = iter_policy_lists(headers())
+        self.assertEqual(str(next(results).policy_list), "default-src 'self'")
+
+    def test_values_shared(self):
+        first, second = (
+            result.policy_list
+            for result in iter_policy_lists(
+                ["script-src 'self' a.com", "style-src 'self'; img-src a.com"]
+            )
+        )
+        assert first is not None and second is not None
+        self.assertIs(first[0][0].values[0], second[0][0].values[0])
+        self.assertIs(first[0][0].values[1], second[0][1].values[0])
+
+    def test_lazy(self):
+        results = list(iter_policy_lists(self.headers, lazy=True))
+        assert results[0].policy_list is not None
+        self.assertIsInstance(results[0].policy_list[0], LazyPolicy)
+        self.assertEqual([str(r.policy_list) for r in results], self.headers)
+
+    def test_file(self):
+        file = StringIO("\n".join(self.headers[:3]) + "\r\n")
+        results = list(iter_policy_lists_from_file(file))
+        self.assertEqual(len(results), 3)
+        self.assertEqual([r.header for r in results], self.headers[:3])
+
+
+class Interning(TestCase):
+    def test_values_shared_across_calls(self):
+        first = policy_from_string("script-src 'self' https://a.com 'nonce-abc'")
+        second = policy_list_from_string("img-src https://a.com; script-src 'self'")
+        self.assertIs(first.script_src.values[1], second[0].img_src.values[0])
+        self.assertIs(first.script_src.values[0], KeywordSource.self)
+        self.assertIs(second[0].script_src.values[0], KeywordSource.self)
+
+    def test_types_not_mixed(self):
+        # Same string, different value item types depending on the directive
+        policy = policy_from_string("script-src a; trusted-types a")
+        self.assertIsInstance(policy.script_src.values[0], HostSrc)
+        self.assertIsInstance(policy.trusted_types.values[0], TrustedTypesPolicyName)
+
+    def test_directive_names(self):
+        first = policy_from_string("default-src 'self'")
+        second = policy_from_string("img-src a.com; " + "default" + "-src 'self'")
+        self.assertIs(first[0].name, second[1].name)
+
+
+class BytesParsing(TestCase):
+    headers = [
+        " default-src 'self'; img-src 'self' https://a.com ;, frame-ancestors 'none'\t",
+        "script-src 'nonce-abc' 'strict-dynamic'; report-uri /csp",
+        "",
+        "a;b,c",
+    ]
+
+    @staticmethod
+    def structure(policy_list: PolicyList):
+        return [
+            [(type(d), d.name, [(type(v), str(v)) for v in d.values]) for d in p]
+            for p in policy_list
+        ]
+
+    def test_same_as_string(self):
+        for header in self.headers:
+            data = header.encode("ascii")
+            for buffer in (data, bytearray(data), memoryview(data)):
+                for lazy in (False, True):
+                    with self.subTest(header=header, type=type(buffer), lazy=lazy):
+                        policy_list = policy_list_from_bytes(buffer, lazy=lazy)
+                        self.assertEqual(str(policy_list), header)
+                        self.assertEqual(
+                            self.structure(policy_list),
+                            self.structure(policy_list_from_string(header)),
+                        )
+
+    def test_policy(self):
+        policy = policy_from_bytes(memoryview(b"img-src a.com; object-src 'none';"))
+        self.assertEqual(str(policy), "img-src a.com; object-src 'none';")
+        self.assertIsInstance(policy.img_src.values[0], HostSrc)
+
+    def test_non_ascii(self):
+        data = "img-src h\xe9st.com 'self'; scr\xefpt-src a.com".encode("latin-1")
+        policy = policy_list_from_bytes(data)[0]
+        self.assertEqual(
+            [type(v) for v in policy.img_src.values],
+            [UnrecognizedValueItem, KeywordSource],
+        )
+        self.assertIsInstance(policy[1], UnrecognizedDirective)
+        self.assertEqual(str(policy).encode("latin-1"), data)
+
+    def test_non_ascii_not_case_folded(self):
+        # The Kelvin sign matches [A-Za-z] in case insensitive patterns
+        directive = directive_from_string("trusted-types policy polic\u212ay")
+        self.assertIsInstance(directive.values[0], TrustedTypesPolicyName)
+        self.assertIsInstance(directive.values[1], UnrecognizedValueItem)
+
+    def test_streaming(self):
+        first, second = (
+            result.policy_list
+            for result in iter_policy_lists([b"img-src a.com", "img-src a.com"])
+        )
+        assert first is not None and second is not None
+        self.assertEqual(str(first), "img-src a.com")
+        self.assertIs(first[0][0].values[0], second[0][0].values[0])
+
+
+class Limits(TestCase):
+    header = "img-src a.com b.com c.com; script-src 'self'; object-src 'none'"
+
+    def test_no_limits(self):
+        self.assertEqual(
+            str(policy_list_from_string(self.header, limits=ParseLimits())),
+            self.header,
+        )
+
+    def test_max_values(self):
+        limits = ParseLimits(max_values=2)
+        for lazy in (False, True):
+            with self.subTest(lazy=lazy):
+                policy = policy_from_string(self.header, lazy=lazy, limits=limits)
+                self.assertEqual(
+                    [type(v) for v in policy.img_src.values],
+                    [HostSrc, HostSrc, UnrecognizedValueItem],
+                )
+                self.assertEqual(str(policy), self.header)
+
+    def test_max_directives(self):
+        policy = policy_list_from_string(
+            self.header, limits=ParseLimits(max_directives=2)
+        )[0]
+        self.assertEqual(
+            [type(d) for d in policy],
+            [ImgSrc, ScriptSrc, UnrecognizedDirective],
+        )
+        self.assertEqual(policy[2].name, "object-src")
+
+    def test_max_token_length(self):
+        policy = policy_from_string(
+            "img-src a.com " + "b" * 20 + ".com; " + "x" * 20,
+            limits=ParseLimits(max_token_length=10),
+        )
+        self.assertEqual(
+            [type(v) for v in policy.img_src.values], [HostSrc, UnrecognizedValueItem]
+        )
+        self.assertIsInstance(policy[1], UnrecognizedDirective)
+        policy = policy_from_string(
+            "frame-ancestors 'self'", limits=ParseLimits(max_token_length=10)
+        )
+        self.assertIsInstance(policy[0], UnrecognizedDirective)
+
+    def test_excess_does_not_raise(self):
+        # 'none' with other sources raises, unless it is beyond the limit
+        header = "img-src 'self' 'none'"
+        with self.assertRaises(BadSourceList):
+            policy_from_string(header)
+        policy = policy_from_string(header, limits=ParseLimits(max_values=1))
+        self.assertEqual(str(policy), header)
+
+    def test_max_header_length(self):
+        limits = ParseLimits(max_header_length=len(self.header) - 1)
+        header = " " + self.header
+        data = header.encode()
+        for lazy in (False, True):
+            for policy_list in (
+                policy_list_from_string(header, lazy=lazy, limits=limits),
+                policy_list_from_bytes(data, lazy=lazy, limits=limits),
+            ):
+                with self.subTest(lazy=lazy):
+                    self.assertEqual(len(policy_list), 1)
+                    self.assertEqual(len(policy_list[0]), 1)
+                    self.assertIsInstance(policy_list[0][0], UnrecognizedDirective)
+                    self.assertEqual(str(policy_list), header)
+        policy = policy_from_bytes(self.header.encode(), limits=limits)
+        self.assertIsInstance(policy[0], UnrecognizedDirective)
+        self.assertEqual(str(policy), self.header)
+
+    def test_streaming(self):
+        results = list(
+            iter_policy_lists(
+                [self.header, self.header.encode()], limits=ParseLimits(max_values=1)
+            )
+        )
+        for result in results:
+            self.assertIsNone(result.error)
+            assert result.policy_list is not None
+            self.assertIsInstance(
+                result.policy_list[0].img_src.values[1], UnrecognizedValueItem
+            )
+
+    def test_lazy_pickle_keeps_limits(self):
+        policy = policy_from_string(
+            self.header, lazy=True, limits=ParseLimits(max_directives=1)
+        )
+        restored = pickle.loads(pickle.dumps(policy))
+        self.assertIsInstance(restored[1], UnrecognizedDirective)
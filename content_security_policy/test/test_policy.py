@@ -3,7 +3,7 @@ from unittest import TestCase
 
 from content_security_policy import *
 from content_security_policy.exceptions import NoSuchDirective
-from content_security_policy.parse import policy_from_string
+from content_security_policy.parse import policy_from_string, policy_list_from_string
 
 
 class SimpleExample(TestCase):
@@ -140,3 +140,73 @@ class SimpleExample(TestCase):
         )
         with self.assertRaises(AttributeError):
             _ = policy.nonexisting_directive
+
+
+class HeaderBytes(TestCase):
+    def test_policy(self):
+        policy = Policy(DefaultSrc(KeywordSource.self), ObjectSrc(NoneSrc))
+        self.assertEqual(
+            policy.to_header_bytes(), b"default-src 'self'; object-src 'none'"
+        )
+        self.assertIs(policy.to_header_bytes(), policy.header_value)
+
+    def test_policy_list(self):
+        header = " img-src a.com,script-src 'self'\t"
+        for lazy in (False, True):
+            with self.subTest(lazy=lazy):
+                policy_list = policy_list_from_string(header, lazy=lazy)
+                self.assertEqual(policy_list.to_header_bytes(), header.encode())
+                self.assertIs(policy_list.to_header_bytes(), policy_list.header_value)
+                self.assertEqual(policy_list[0].to_header_bytes(), b"img-src a.com")
+
+    def test_latin_1(self):
+        header = "img-src h\xe9st.com"
+        policy = policy_from_string(header)
+        self.assertEqual(policy.to_header_bytes(), header.encode("latin-1"))
+        with self.assertRaises(UnicodeEncodeError):
+            policy_from_string("img-src \u212a.com").to_header_bytes()
+
+
+class DirectiveIndex(TestCase):
+    header = (
+        "default-src 'self'; frame-ancestors 'self'; script-src a.com; "
+        "style-src b.com; script-src c.com; sandbox"
+    )
+
+    def test_getitem_base_class(self):
+        for lazy in (False, True):
+            with self.subTest(lazy=lazy):
+                policy = policy_from_string(self.header, lazy=lazy)
+                self.assertIs(policy[SourceListDirective], policy[0])
+                self.assertIs(policy[ScriptSrc], policy[2])
+                self.assertIs(policy["script-src"], policy[2])
+                self.assertIs(policy.sandbox, policy[-1])
+                self.assertEqual(policy._get_indices(SourceListDirective), (0, 2, 3, 4))
+
+    def test_without(self):
+        for lazy in (False, True):
+            with self.subTest(lazy=lazy):
+                policy = policy_from_string(self.header, lazy=lazy)
+                self.assertEqual(
+                    str(policy.without(ScriptSrc, "style-src", Sandbox)),
+                    "default-src 'self'; frame-ancestors 'self'",
+                )
+                self.assertEqual(
+                    str(policy.without(ScriptSrc)), str(policy - ScriptSrc)
+                )
+                self.assertEqual(
+                    str(policy.without(SourceListDirective)),
+                    "frame-ancestors 'self'; sandbox",
+                )
+                self.assertEqual(str(policy.without()), self.header)
+
+    def test_without_keeps_separators(self):
+        policy = policy_from_string("img-src a;\tscript-src b ;  style-src c; ")
+        for keys, expected in (
+            ((ImgSrc,), "script-src b ;  style-src c; "),
+            ((ScriptSrc,), "img-src a ;  style-src c; "),
+            ((StyleSrc,), "img-src a;\tscript-src b; "),
+            ((ImgSrc, ScriptSrc, StyleSrc), ""),
+        ):
+            with self.subTest(keys=keys):
+                self.assertEqual(str(policy.without(*keys)), expected)
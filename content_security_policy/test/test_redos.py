@@ -0,0 +1,99 @@
+"""
+Worst-case timing harness: feeds adversarial strings built from the alphabet of every
+pattern in content_security_policy.patterns through the parser, and fails if parse
+time grows superlinearly with the input length.
+"""
+import random
+import re
+from time import perf_counter
+from typing import List, Union
+from unittest import TestCase
+
+from content_security_policy import patterns
+from content_security_policy.constants import DIRECTIVE_NAMES
+from content_security_policy.parse import (
+    _LOWER_CASE_DIRECTIVE_REGISTER,
+    _dispatch_for,
+    iter_policy_lists,
+)
+
+# Characters that are regex syntax rather than literals in a pattern's source
+_SYNTAX = frozenset("\\()[]{}|^$?*+")
+_MOTIFS_PER_PATTERN = 6
+_SHORT = 64
+_GROWTH = 8
+_REPEATS = 3
+# Linear growth gives a ratio of about _GROWTH, quadratic about _GROWTH ** 2. The
+# bound is generous and the measurement is retried, so that load on the machine does
+# not fail the test.
+_MAX_RATIO = 4 * _GROWTH
+_ATTEMPTS = 3
+
+
+# One directive per way of classifying value items, and an unrecognized one
+_DIRECTIVE_NAMES = list(
+    {
+        _dispatch_for(_LOWER_CASE_DIRECTIVE_REGISTER[name]): name
+        for name in DIRECTIVE_NAMES
+    }.values()
+) + ["x-unknown"]
+
+
+def _alphabet(pattern: Union[re.Pattern, str]) -> List[str]:
+    source = pattern.pattern if isinstance(pattern, re.Pattern) else pattern
+    if isinstance(source, bytes):
+        source = source.decode("latin-1")
+    chars = {c for c in source if c.isascii() and c.isprintable()} - _SYNTAX
+    # Representatives of character classes like [a-z0-9] and \s
+    chars.update("a0 ")
+    return sorted(chars)
+
+
+def _motifs(name: str) -> List[str]:
+    alphabet = _alphabet(getattr(patterns, name))
+    rng = random.Random(name)
+    return [
+        "".join(rng.choices(alphabet, k=rng.randint(1, 3)))
+        for _ in range(_MOTIFS_PER_PATTERN)
+    ]
+
+
+def _headers(motifs: List[str], repetitions: int) -> List[Union[str, bytes]]:
+    strings: List[str] = []
+    for motif in motifs:
+        # A character that no pattern accepts at the end, to force a failed match
+        adversarial = motif * repetitions + "\x00"
+        policy = "; ".join(f"{name} {adversarial}" for name in _DIRECTIVE_NAMES)
+        strings += [policy, adversarial]
+    return [*strings, *(string.encode("latin-1") for string in strings)]
+
+
+def _parse_time(headers: List[Union[str, bytes]]) -> float:
+    times = []
+    for _ in range(_REPEATS):
+        start = perf_counter()
+        for _ in iter_policy_lists(headers):
+            pass
+        times.append(perf_counter() - start)
+    return min(times)
+
+
+class WorstCaseTiming(TestCase):
+    def test_linear_in_input_length(self):
+        for name in patterns.__all__:
+            with self.subTest(name):
+                motifs = _motifs(name)
+                for _ in range(_ATTEMPTS):
+                    short = _parse_time(_headers(motifs, _SHORT))
+                    long = _parse_time(_headers(motifs, _SHORT * _GROWTH))
+                    if long / short < _MAX_RATIO:
+                        break
+                self.assertLess(long / short, _MAX_RATIO)
+
+    def test_headers_parse(self):
+        # Adversarial input may be invalid, but must not crash the parser
+        for name in patterns.__all__:
+            with self.subTest(name):
+                for result in iter_policy_lists(_headers(_motifs(name), 4)):
+                    if result.error is not None:
+                        self.assertIsInstance(result.error, ValueError)
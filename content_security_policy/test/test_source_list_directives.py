@@ -3,12 +3,17 @@ from unittest import TestCase
 from content_security_policy import (
     Directive,
     FrameAncestors,
+    HostSrc,
+    ImgSrc,
     KeywordSource,
     NoneSrc,
+    SandboxToken,
+    ScriptSrc,
     SelfSrc,
 )
 from content_security_policy.constants import SOURCE_LIST_DIRECTIVES
 from content_security_policy.exceptions import BadDirectiveValue, BadSourceList
+from content_security_policy.parse import directive_from_string
 
 
 class DoNotCombineNoneSource(TestCase):
@@ -30,3 +35,144 @@ class DoNotCombineNoneSource(TestCase):
     def test_frame_ancestors_constructor(self):
         with self.assertRaises(BadDirectiveValue):
             FrameAncestors(NoneSrc, SelfSrc)
+
+
+class SetOperations(TestCase):
+    def setUp(self):
+        self.script_src = ScriptSrc(SelfSrc, HostSrc("a.com"), HostSrc("https://B.com"))
+
+    def test_contains(self):
+        cases = [
+            (HostSrc("a.com"), True),
+            (HostSrc("A.COM"), True),
+            (HostSrc("https://b.com"), True),
+            (KeywordSource.self, True),
+            (HostSrc("c.com"), False),
+            (HostSrc("https://a.com"), False),
+            (NoneSrc, False),
+        ]
+        for value, expected in cases:
+            with self.subTest(str(value)):
+                self.assertEqual(value in self.script_src, expected)
+        self.assertIn(NoneSrc, FrameAncestors(NoneSrc))
+        self.assertIn(SelfSrc, directive_from_string("frame-ancestors 'SELF'"))
+
+    def test_many_sources(self):
+        hosts = [HostSrc(f"host{i}.example.com") for i in range(10000)]
+        script_src = ScriptSrc(*hosts)
+        self.assertIn(HostSrc("host9999.example.com"), script_src)
+        self.assertIs(script_src._index, script_src._index)
+
+    def test_add_dedupes(self):
+        self.assertIs(self.script_src + HostSrc("A.com"), self.script_src)
+        self.assertEqual(
+            str(self.script_src + HostSrc("c.com")),
+            "script-src 'self' a.com https://B.com c.com",
+        )
+
+    def test_sub(self):
+        cases = [
+            (HostSrc("A.com"), "script-src 'self' https://B.com"),
+            (KeywordSource.self, "script-src a.com https://B.com"),
+        ]
+        for value, expected in cases:
+            with self.subTest(str(value)):
+                self.assertEqual(str(self.script_src - value), expected)
+        self.assertIs(self.script_src - HostSrc("c.com"), self.script_src)
+        empty = (
+            self.script_src
+            - KeywordSource.self
+            - HostSrc("a.com")
+            - HostSrc("https://b.com")
+        )
+        self.assertEqual(str(empty), "script-src 'none'")
+        self.assertEqual(
+            str(FrameAncestors(NoneSrc) - NoneSrc), "frame-ancestors 'none'"
+        )
+
+    def test_sub_other_directives(self):
+        sandbox = directive_from_string("Sandbox  allow-scripts   allow-forms")
+        self.assertEqual(
+            str(sandbox - SandboxToken.allow_scripts), "Sandbox  allow-forms"
+        )
+        self.assertEqual(
+            str(sandbox - SandboxToken.allow_forms), "Sandbox  allow-scripts"
+        )
+        self.assertIs(sandbox - SandboxToken.allow_popups, sandbox)
+
+    def test_union(self):
+        other = directive_from_string("script-src a.com c.com")
+        self.assertEqual(
+            str(self.script_src.union(other, [HostSrc("d.com")])),
+            "script-src 'self' a.com https://B.com c.com d.com",
+        )
+        self.assertIs(self.script_src.union(other - HostSrc("c.com")), self.script_src)
+        self.assertEqual(str(ScriptSrc(NoneSrc).union(other)), "script-src a.com c.com")
+
+    def test_intersection(self):
+        cases = [
+            (("script-src a.com 'SELF' c.com",), "script-src 'self' a.com"),
+            (("script-src a.com 'self'", "script-src 'self'"), "script-src 'self'"),
+            # Only equal values, see intersect_sources for what sources allow
+            (("script-src https: *.b.com",), "script-src 'none'"),
+        ]
+        for others, expected in cases:
+            with self.subTest(others):
+                directives = map(directive_from_string, others)
+                self.assertEqual(
+                    str(self.script_src.intersection(*directives)), expected
+                )
+
+    def test_difference(self):
+        other = directive_from_string("script-src a.com 'self'")
+        self.assertEqual(
+            str(self.script_src.difference(other)), "script-src https://B.com"
+        )
+        self.assertEqual(
+            str(self.script_src.difference(other, [HostSrc("https://b.com")])),
+            "script-src 'none'",
+        )
+        self.assertIs(self.script_src.difference([HostSrc("c.com")]), self.script_src)
+        ancestors = FrameAncestors(SelfSrc, HostSrc("a.com"))
+        self.assertEqual(str(ancestors.difference([SelfSrc])), "frame-ancestors a.com")
+
+    def test_separators_kept(self):
+        directive = directive_from_string("Script-Src\t'self'  a.com\nb.com")
+        assert isinstance(directive, ScriptSrc)
+        cases = [
+            (directive - KeywordSource.self, "Script-Src\ta.com\nb.com"),
+            (directive - HostSrc("a.com"), "Script-Src\t'self'\nb.com"),
+            (directive.difference([HostSrc("b.com")]), "Script-Src\t'self'  a.com"),
+            (
+                directive.intersection([HostSrc("b.com"), KeywordSource.self]),
+                "Script-Src\t'self'\nb.com",
+            ),
+            (
+                directive.union([HostSrc("c.com")]),
+                "Script-Src\t'self'  a.com\nb.com c.com",
+            ),
+            # Like Directive.__sub__ on other directives
+            (
+                directive_from_string("sandbox\tallow-forms  allow-popups")
+                - SandboxToken.allow_forms,
+                "sandbox\tallow-popups",
+            ),
+        ]
+        for result, expected in cases:
+            with self.subTest(expected):
+                self.assertEqual(str(result), expected)
+
+    def test_none_substituted(self):
+        directive = directive_from_string("img-src\t'self'   a.com")
+        none = directive_from_string("img-src  'none'")
+        assert isinstance(directive, ImgSrc) and isinstance(none, ImgSrc)
+        cases = [
+            (directive - KeywordSource.self - HostSrc("a.com"), "img-src\t'none'"),
+            (directive.difference(directive), "img-src\t'none'"),
+            (directive.intersection([HostSrc("b.com")]), "img-src\t'none'"),
+            # 'none' is dropped when there are other sources
+            (none.union([HostSrc("a.com")]), "img-src  a.com"),
+        ]
+        for result, expected in cases:
+            with self.subTest(expected):
+                self.assertEqual(str(result), expected)
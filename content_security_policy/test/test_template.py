@@ -0,0 +1,101 @@
+from unittest import TestCase
+
+from content_security_policy import *
+from content_security_policy.exceptions import BadSourceExpression
+from content_security_policy.template import HOST, PORT, SCHEME, PolicyTemplate, origin
+
+
+def _policy(url_origin: str) -> PolicyList:
+    return PolicyList(
+        Policy(
+            DefaultSrc(KeywordSource.self),
+            ScriptSrc(
+                HostSrc.from_string(f"{url_origin}/static/app.js"),
+                HostSrc.from_string(f"{url_origin}/static/lib.js"),
+                HostSrc("https://cdn.example.com"),
+            ),
+        ),
+        Policy(ImgSrc(HostSrc.from_string(url_origin))),
+    )
+
+
+class OriginTest(TestCase):
+    def test_origin(self):
+        cases = [
+            (("https", "example.com"), "https://example.com"),
+            (("http", "localhost:8000"), "http://localhost:8000"),
+            (("https", "example.com", "8443"), "https://example.com:8443"),
+            ((SCHEME, HOST), f"{SCHEME}://{HOST}"),
+            ((SCHEME, "example.com", PORT), f"{SCHEME}://example.com{PORT}"),
+        ]
+        for args, expected in cases:
+            with self.subTest(args):
+                self.assertEqual(origin(*args), expected)
+        self.assertEqual(origin("https", "a.test", 8443), "https://a.test:8443")
+
+    def test_invalid(self):
+        for args in (
+            ("ht tp", "example.com"),
+            ("https", "example.com/path"),
+            ("https", "*"),
+            ("https", "*.example.com"),
+            ("https", "example.com; script-src *"),
+            ("https", "example.com:port"),
+            ("https", "example.com", "-1"),
+            ("https", "example.com:80", 8080),
+            ("https", "example.com:80", PORT),
+        ):
+            with self.subTest(args):
+                with self.assertRaises(BadSourceExpression):
+                    origin(*args)
+
+
+class PolicyTemplateTest(TestCase):
+    def test_render(self):
+        template = PolicyTemplate(_policy(origin(SCHEME, HOST)))
+        self.assertEqual(template.names, {"scheme", "host"})
+        for scheme, host in (("https", "example.com"), ("http", "localhost:8000")):
+            with self.subTest(host):
+                self.assertEqual(
+                    template.render(scheme, host),
+                    str(_policy(origin(scheme, host))),
+                )
+
+    def test_port(self):
+        template = PolicyTemplate(_policy(origin(SCHEME, HOST, PORT)))
+        self.assertEqual(template.names, {"scheme", "host", "port"})
+        self.assertEqual(
+            template.render("https", "a.test", 8443),
+            str(_policy("https://a.test:8443")),
+        )
+        self.assertEqual(
+            template.render("https", "a.test"), str(_policy("https://a.test"))
+        )
+
+    def test_without_placeholders(self):
+        header = "default-src 'self'"
+        template = PolicyTemplate(header)
+        self.assertEqual(template.names, frozenset())
+        self.assertEqual(template.render(), header)
+
+    def test_invalid_values(self):
+        template = PolicyTemplate(_policy(origin(SCHEME, HOST, PORT)))
+        for kwargs in (
+            dict(scheme="https", host="a.test;"),
+            dict(scheme="https:", host="a.test"),
+            dict(scheme="https", host="a.test", port="80;"),
+            # The template has a slot for the port already
+            dict(scheme="https", host="a.test:80", port=8080),
+            dict(scheme="https", host="a.test:80"),
+        ):
+            with self.subTest(kwargs):
+                with self.assertRaises(BadSourceExpression):
+                    template.render(**kwargs)
+        with self.assertRaises(ValueError):
+            template.render(host="a.test")
+
+    def test_invalid_template(self):
+        for header in ("img-src \x00", "img-src \x00other\x00"):
+            with self.subTest(header):
+                with self.assertRaises(ValueError):
+                    PolicyTemplate(header)
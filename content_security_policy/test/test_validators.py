@@ -0,0 +1,86 @@
+import random
+from unittest import TestCase
+
+from content_security_policy.patterns import HOST_SOURCE, URI_REFERENCE
+from content_security_policy.validators import is_host_source, is_uri_reference
+
+# Fragments that are significant somewhere in the grammars
+FRAGMENTS = [
+    "http", "https", "a", "B9", "x-y", "+", "://", ":", "::", "/", "//", "[", "]",
+    "@", "?", "#", "%", "%2f", "%G1", "%a", ".", "*", "*.", "1", "01", "255", "256",
+    "1.2.3.4", "ffff", "12345", "-", "_", "~", "!", "$", "'()", ";", ",", " ", "\xe9",
+    "\xb2", "0", "::1", "fe80",
+]  # fmt: skip
+IP_V6_FRAGMENTS = ["1", "ffff", "12345", "g", ":", "::", "1.2.3.4", "256.1.1.1", "0"]
+
+
+class Differential(TestCase):
+    """
+    The validators must accept exactly what the patterns fully match.
+    """
+
+    def assert_same(self, strings):
+        for string in strings:
+            for pattern, validator in (
+                (HOST_SOURCE, is_host_source),
+                (URI_REFERENCE, is_uri_reference),
+            ):
+                expected = pattern.fullmatch(string) is not None
+                if validator(string) != expected:
+                    self.fail(f"{validator.__name__}({string!r}) is not {expected}")
+
+    def test_random_fragments(self):
+        rng = random.Random(0)
+        self.assert_same(
+            "".join(rng.choices(FRAGMENTS, k=rng.randint(0, 10))) for _ in range(5000)
+        )
+
+    def test_random_ip_literals(self):
+        rng = random.Random(0)
+        self.assert_same(
+            "//["
+            + "".join(rng.choices(IP_V6_FRAGMENTS, k=rng.randint(0, 16)))
+            + rng.choice(["]", "]:80", "]:", "]/x", "]x", ""])
+            for _ in range(5000)
+        )
+
+    def test_examples(self):
+        self.assert_same(
+            [
+                "",
+                "*",
+                "*.example.com",
+                "https://*.example.com:*/path/file.js",
+                "example.com:443",
+                "a.com/x://y",
+                "http:",
+                "https://example.com/csp?report=1#top",
+                "/csp-report",
+                "csp:report",
+                "./csp:report",
+                "//user:pw@[2001:db8::1]:8080/x",
+                "//[::ffff:192.0.2.1]",
+                "//[1:2:3:4:5:6:7:8]",
+                "//[1:2:3:4:5:6:7::]",
+                "//[1:2:3:4:5:6:7:8::]",
+                "//192.168.0.256",
+            ]
+        )
+
+
+class Validators(TestCase):
+    def test_host_source(self):
+        for valid in ["a.com", "*", "*.a.com:*", "https://a.com:8080/p/", "a/b:c@d"]:
+            with self.subTest(valid):
+                self.assertTrue(is_host_source(valid))
+        for invalid in ["", "a..com", "*.", "a.com:", "a.com//x", "a.com/%zz", "é.com"]:
+            with self.subTest(invalid):
+                self.assertFalse(is_host_source(invalid))
+
+    def test_uri_reference(self):
+        for valid in ["", "/csp", "https://a.com/csp", "//[::1]", "a/b", "?q#f"]:
+            with self.subTest(valid):
+                self.assertTrue(is_uri_reference(valid))
+        for invalid in ["/%2", "//[::1", "//a@b@c", "/a b", "//[1::2::3]", "1a:b"]:
+            with self.subTest(invalid):
+                self.assertFalse(is_uri_reference(invalid))
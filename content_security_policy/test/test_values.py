@@ -2,9 +2,17 @@ from itertools import chain
 from unittest import TestCase
 
 from content_security_policy.constants import KEYWORD_SOURCES, NONE
-from content_security_policy.parse import _PARSING_RULES
+from content_security_policy.exceptions import BadSourceExpression
+from content_security_policy.parse import _PARSING_RULES, directive_from_string
 from content_security_policy.utils import kebab_to_snake
-from content_security_policy.values import KeywordSource, NoneSrc
+from content_security_policy.values import (
+    HashSrc,
+    KeywordSource,
+    NonceSrc,
+    NoneSrc,
+    SandboxToken,
+    WebrtcValue,
+)
 
 
 class ValueCompleteness(TestCase):
@@ -27,6 +35,14 @@ class KeywordSourceAttributes(TestCase):
                 else:
                     self.assertEqual(kw_src, str(getattr(KeywordSource, attr_name)))
 
+    def test_keyword_singletons(self):
+        self.assertIs(KeywordSource.self, KeywordSource.self)
+        self.assertIs(SandboxToken.allow_scripts, SandboxToken.allow_scripts)
+        self.assertIs(WebrtcValue.allow, WebrtcValue.allow)
+        self.assertIs(KeywordSource.from_string("'self'"), KeywordSource.self)
+        # Other spellings keep their serialization
+        self.assertEqual(str(KeywordSource.from_string("'SELF'")), "'SELF'")
+
 
 class NoneSourceStr(TestCase):
     def test_instance_str(self):
@@ -39,3 +55,34 @@ class NoneSourceStr(TestCase):
         as_str = "'NOnE'"
         instance = NoneSrc(_value=as_str)
         self.assertEqual(as_str, str(instance))
+
+
+class NonceAndHashSources(TestCase):
+    def test_nonce_constructor(self):
+        cases = {
+            "abc": "'nonce-abc'",
+            "'nonce-abc+/-_=='": "'nonce-abc+/-_=='",
+            # Only the prefix is removed, not every leading n, o, c, e or -
+            "nonce-ennui": "'nonce-ennui'",
+        }
+        for nonce, expected in cases.items():
+            with self.subTest(nonce):
+                self.assertEqual(str(NonceSrc(nonce)), expected)
+
+    def test_bad_values(self):
+        for make in (
+            lambda: NonceSrc("a!b"),
+            lambda: NonceSrc("abc==="),
+            lambda: NonceSrc(""),
+            lambda: HashSrc("sha256-a b"),
+        ):
+            with self.assertRaises(BadSourceExpression):
+                make()
+
+    def test_parsed(self):
+        directive = directive_from_string(
+            "script-src 'nonce-abc' 'NONCE-d=' 'sha256-AB+/='"
+        )
+        self.assertEqual(
+            [type(value) for value in directive.values], [NonceSrc, NonceSrc, HashSrc]
+        )
@@ -1,7 +1,7 @@
 import re
 import string
 from abc import ABCMeta
-from typing import Iterable
+from typing import Any, Dict, FrozenSet, Iterable
 
 
 def kebab_to_pascal(text: str) -> str:
@@ -12,18 +12,33 @@ def kebab_to_snake(text: str) -> str:
     return "_".join(text.split("-"))
 
 
-class StrOnClassMeta(ABCMeta):
-    _value: str
+class SlotsMeta(ABCMeta):
+    """
+    Adds an empty __slots__ to every class that does not define its own, so that
+    subclasses do not silently bring back an instance __dict__.
+    """
+
+    def __new__(mcs, name, bases, namespace, **kwargs):
+        namespace.setdefault("__slots__", ())
+        return super().__new__(mcs, name, bases, namespace, **kwargs)
+
+
+class StrOnClassMeta(SlotsMeta):
+    _class_value: str
 
     def __str__(cls):
         """
-        Calling str() on the CLASS will return  _value.
+        Calling str() on the CLASS will return  _class_value.
         """
-        return cls._value
+        return cls._class_value
 
 
 class KeywordMixin:
+    __slots__ = ()
     _keywords: Iterable[str] = tuple()
+    _literals: FrozenSet[str]
+    # Canonical instance per keyword, values are immutable so they can be shared
+    _instances: Dict[str, Any]
 
     def __init_subclass__(cls, **kwargs):
         for name in cls._keywords:
@@ -32,12 +47,37 @@ class KeywordMixin:
             @classmethod  # type: ignore
             @property  # type: ignore
             def factory(cls, sneak_me=name):
-                return cls(sneak_me)
+                return cls._keyword_instance(sneak_me)
 
             setattr(cls, prop_name, factory)
 
         pattern = re.compile("|".join(cls._keywords), flags=re.IGNORECASE)
         setattr(cls, "pattern", pattern)
+        setattr(cls, "_literals", frozenset(kw.lower() for kw in cls._keywords))
+        setattr(cls, "_instances", {})
 
         delattr(cls, "_keywords")
         super().__init_subclass__(**kwargs)
+
+    @classmethod
+    def _keyword_instance(cls, keyword: str):
+        """
+        Get the canonical instance for a keyword, it is created on first use.
+        """
+        try:
+            return cls._instances[keyword]
+        except KeyError:
+            return cls._instances.setdefault(keyword, cls(keyword))  # type: ignore
+
+    def _canonicalize(self) -> str:
+        # Keywords are case-insensitive
+        return self._value.lower()  # type: ignore
+
+    @classmethod
+    def from_string(cls, str_value: str):
+        """
+        Keywords spelled like the canonical (lower case) keyword share one instance.
+        """
+        if str_value in cls._literals:
+            return cls._keyword_instance(str_value)
+        return super().from_string(str_value)  # type: ignore
@@ -0,0 +1,202 @@
+"""
+Hand-written validators for the grammars of host-source and URI-reference, which are
+the most expensive patterns in content_security_policy.patterns.
+They accept exactly what HOST_SOURCE and URI_REFERENCE fully match, but only use str
+methods and set lookups, which run in linear time and never backtrack.
+"""
+__all__ = ["is_host_source", "is_uri_reference"]
+
+from string import ascii_letters, digits, hexdigits
+from typing import FrozenSet, List
+
+# https://tools.ietf.org/html/rfc5234#appendix-B.1
+_ALPHA = frozenset(ascii_letters)
+_DIGIT = frozenset(digits)
+_HEXDIG = frozenset(hexdigits)
+
+# https://datatracker.ietf.org/doc/html/rfc3986#appendix-A, without ";" and "," in
+# sub-delims (see patterns.SUB_DELIMS). "%" is allowed as the start of pct-encoded,
+# see _is_pct_encoded.
+_UNRESERVED = _ALPHA | _DIGIT | frozenset("-._~")
+_SUB_DELIMS = frozenset("!$&'()*+=")
+_REG_NAME = _UNRESERVED | _SUB_DELIMS | {"%"}
+_USERINFO = _REG_NAME | {":"}
+_PCHAR = _USERINFO | {"@"}
+_PATH = _PCHAR | {"/"}
+_QUERY = _PATH | {"?"}
+_SCHEME = _ALPHA | _DIGIT | frozenset("+-.")
+
+# https://w3c.github.io/webappsec-csp/#grammardef-host-source
+_HOST_PART = _ALPHA | _DIGIT | frozenset("-.")
+
+
+def _is_pct_encoded(value: str) -> bool:
+    """
+    Check that every "%" in value starts a pct-encoded triplet.
+    """
+    index = value.find("%")
+    while index != -1:
+        triplet_end = index + 3
+        if len(value) < triplet_end or not _HEXDIG.issuperset(
+            value[index + 1 : triplet_end]
+        ):
+            return False
+        index = value.find("%", triplet_end)
+    return True
+
+
+def _consists_of(value: str, chars: FrozenSet[str]) -> bool:
+    return chars.issuperset(value) and ("%" not in value or _is_pct_encoded(value))
+
+
+def _is_scheme(value: str) -> bool:
+    return value[:1] in _ALPHA and _SCHEME.issuperset(value)
+
+
+def _is_digits(value: str) -> bool:
+    # isdigit alone would accept non-ASCII digits
+    return value.isascii() and value.isdigit()
+
+
+def _is_dec_octet(value: str) -> bool:
+    return (
+        0 < len(value) < 4
+        and _is_digits(value)
+        and (value[0] != "0" or len(value) == 1)
+        and int(value) < 256
+    )
+
+
+def _is_ip_v4_address(value: str) -> bool:
+    octets = value.split(".")
+    return len(octets) == 4 and all(map(_is_dec_octet, octets))
+
+
+def _is_h16(value: str) -> bool:
+    return 0 < len(value) < 5 and _HEXDIG.issuperset(value)
+
+
+def _count_pieces(pieces: List[str], ls32_allowed: bool) -> int:
+    """
+    Count the 16 bit pieces in a ":" separated part of an IPv6 address, -1 if it is
+    not valid. An IPv4 address in last place counts as two pieces.
+    """
+    count = len(pieces)
+    if ls32_allowed and _is_ip_v4_address(pieces[-1]):
+        pieces = pieces[:-1]
+        count += 1
+    return count if all(map(_is_h16, pieces)) else -1
+
+
+def _is_ip_v6_address(value: str) -> bool:
+    head, elision, tail = value.partition("::")
+    if not elision:
+        return _count_pieces(value.split(":"), ls32_allowed=True) == 8
+    if "::" in tail:
+        return False
+
+    head_count = _count_pieces(head.split(":"), ls32_allowed=False) if head else 0
+    tail_count = _count_pieces(tail.split(":"), ls32_allowed=True) if tail else 0
+    # The elision stands for at least one piece
+    return head_count != -1 and tail_count != -1 and head_count + tail_count < 8
+
+
+def _is_authority(value: str) -> bool:
+    userinfo, at, host_port = value.rpartition("@")
+    if at and not _consists_of(userinfo, _USERINFO):
+        return False
+
+    if host_port.startswith("["):
+        literal_end = host_port.find("]")
+        if literal_end == -1 or not _is_ip_v6_address(host_port[1:literal_end]):
+            return False
+        port_part = host_port[literal_end + 1 :]
+        return not port_part or (port_part[0] == ":" and _is_port(port_part[1:]))
+
+    # IPv4 addresses are also valid reg-names
+    host, _, port = host_port.partition(":")
+    return _consists_of(host, _REG_NAME) and _is_port(port)
+
+
+def _is_port(value: str) -> bool:
+    return not value or _is_digits(value)
+
+
+def _is_hier_part(value: str, is_relative: bool) -> bool:
+    """
+    Validate hier-part or, if is_relative, relative-part.
+    """
+    if value.startswith("//"):
+        path_start = value.find("/", 2)
+        if path_start == -1:
+            return _is_authority(value[2:])
+        return _is_authority(value[2:path_start]) and _consists_of(
+            value[path_start:], _PATH
+        )
+
+    # path-absolute (may not start with "//"), path-rootless or path-noscheme, which
+    # may not have ":" in its first segment. Or path-empty.
+    if is_relative and not value.startswith("/"):
+        first_segment, _, _ = value.partition("/")
+        if ":" in first_segment:
+            return False
+    return _consists_of(value, _PATH)
+
+
+def is_uri_reference(value: str) -> bool:
+    """
+    Check if a string is a URI-reference as defined by RFC 3986 (without IPvFuture
+    and with CSP's restrictions on sub-delims).
+    :param value: String to check.
+    :return: Whether patterns.URI_REFERENCE fully matches value.
+    """
+    value, number_sign, fragment = value.partition("#")
+    if number_sign and not _consists_of(fragment, _QUERY):
+        return False
+    value, question_mark, query = value.partition("?")
+    if question_mark and not _consists_of(query, _QUERY):
+        return False
+
+    scheme_end = value.find(":")
+    if scheme_end != -1 and _is_scheme(value[:scheme_end]):
+        return _is_hier_part(value[scheme_end + 1 :], is_relative=False)
+    return _is_hier_part(value, is_relative=True)
+
+
+def _is_host_part(value: str) -> bool:
+    if value == "*":
+        return True
+    if value.startswith("*."):
+        value = value[2:]
+    return (
+        _HOST_PART.issuperset(value)
+        and value[:1] not in ("", ".")
+        and not value.endswith(".")
+        and ".." not in value
+    )
+
+
+def is_host_source(value: str) -> bool:
+    """
+    Check if a string is a host-source as defined by CSP.
+    :param value: String to check.
+    :return: Whether patterns.HOST_SOURCE fully matches value.
+    """
+    scheme_end = value.find("://")
+    # Without a scheme, "://" can only be part of the path
+    if scheme_end != -1 and _is_scheme(value[:scheme_end]):
+        value = value[scheme_end + 3 :]
+
+    path_start = value.find("/")
+    if path_start != -1:
+        # path-absolute may not start with "//"
+        if value.startswith("/", path_start + 1) or not _consists_of(
+            value[path_start:], _PATH
+        ):
+            return False
+        value = value[:path_start]
+
+    host, colon, port = value.partition(":")
+    if colon and port != "*" and not _is_digits(port):
+        return False
+    return _is_host_part(host)
@@ -15,6 +15,7 @@ __all__ = [
     "SelfSrc",
     "SelfSrcType",
     "AncestorSource",
+    "SourceListValue",
     "SandboxToken",
     "SandboxValue",
     "ReportToValue",
@@ -29,6 +30,7 @@ __all__ = [
 ]
 
 from abc import ABC
+from os.path import commonprefix
 from typing import Literal, Optional, Type, cast
 
 from content_security_policy.base_classes import ClassAsValue, ValueItem, ValueItemType
@@ -61,6 +63,15 @@ from content_security_policy.patterns import (
 )
 from content_security_policy.patterns import WILDCARD as WILDCARD_RE
 from content_security_policy.utils import KeywordMixin
+from content_security_policy.validators import is_host_source, is_uri_reference
+
+
+def _lower_prefix(value: str) -> str:
+    """
+    Lower case the case-insensitive prefix of a nonce or hash source, e.g. 'nonce-.
+    """
+    prefix_end = value.find("-") + 1
+    return value[:prefix_end].lower() + value[prefix_end:]
 
 
 class SourceExpression(ValueItem, ABC):
@@ -72,25 +83,29 @@ class SourceExpression(ValueItem, ABC):
 # https://w3c.github.io/webappsec-csp/#grammardef-nonce-source
 class NonceSrc(SourceExpression):
     pattern = NONCE_SOURCE
+    _prefix = f"'{NONCE_PREFIX}"
 
     def __init__(self, nonce: str, _value: Optional[str] = None):
         if _value is not None:
             value = _value
         else:
-            nonce = nonce.strip("'").lstrip(NONCE_PREFIX)
+            nonce = nonce.strip("'").removeprefix(NONCE_PREFIX)
             if not BASE64_VALUE.fullmatch(nonce):
                 raise BadSourceExpression(
-                    f"Nonce value '{nonce}' does not match "
-                    f"{BASE64_VALUE.pattern.pattern}"
+                    f"Nonce value '{nonce}' does not match {BASE64_VALUE.pattern}"
                 )
             value = f"'{NONCE_PREFIX}{nonce}'"
 
         super().__init__(value)
 
+    def _canonicalize(self) -> str:
+        return _lower_prefix(str(self))
+
 
 # https://w3c.github.io/webappsec-csp/#grammardef-nonce-source
 class HashSrc(SourceExpression):
     pattern = HASH_SOURCE
+    _prefix = "'" + commonprefix(HASH_ALGORITHMS)
 
     def __init__(
         self, hash_value: str, algo: Optional[str] = None, _value: Optional[str] = None
@@ -110,7 +125,7 @@ class HashSrc(SourceExpression):
             if not BASE64_VALUE.fullmatch(hash_value):
                 raise BadSourceExpression(
                     f"Hash value '{hash_value}' does not match "
-                    f"{BASE64_VALUE.pattern.pattern}"
+                    f"{BASE64_VALUE.pattern}"
                 )
             value = f"'{algo}-{hash_value}'"
 
@@ -120,10 +135,14 @@ class HashSrc(SourceExpression):
     def from_string(cls, str_value: str) -> HashSrc:
         return cls("", "", _value=str_value)
 
+    def _canonicalize(self) -> str:
+        return _lower_prefix(str(self))
+
 
 # https://w3c.github.io/webappsec-csp/#grammardef-scheme-source
 class SchemeSrc(SourceExpression):
     pattern = SCHEME_SOURCE
+    _suffix = ":"
 
     def __init__(self, scheme: str, _value: Optional[str] = None):
         if _value is not None:
@@ -132,11 +151,14 @@ class SchemeSrc(SourceExpression):
             scheme = scheme.rstrip(":")
             if not SCHEME.fullmatch(scheme):
                 raise BadSourceExpression(
-                    f"Scheme '{scheme}' does not match {SCHEME.pattern.pattern}"
+                    f"Scheme '{scheme}' does not match {SCHEME.pattern}"
                 )
             value = f"{scheme}:"
         super().__init__(value)
 
+    def _canonicalize(self) -> str:
+        return str(self).lower()
+
 
 # https://w3c.github.io/webappsec-csp/#grammardef-host-source
 class HostSrc(SourceExpression):
@@ -145,12 +167,26 @@ class HostSrc(SourceExpression):
     def __init__(self, host: str, _value: Optional[str] = None):
         if _value is not None:
             value = _value
-        elif not self.pattern.fullmatch(host):
+        elif not is_host_source(host):
             raise BadSourceExpression(f"{host} does not match {self.pattern.pattern}")
         else:
             value = host
         super().__init__(value)
 
+    @classmethod
+    def matches(cls, str_value: str) -> bool:
+        return is_host_source(str_value)
+
+    def _canonicalize(self) -> str:
+        # Scheme and host are case-insensitive, the path is not
+        value = str(self)
+        path_start = value.find("/")
+        if value.startswith("://", path_start - 1) and path_start > 0:
+            path_start = value.find("/", path_start + 2)
+        if path_start == -1:
+            return value.lower()
+        return value[:path_start].lower() + value[path_start:]
+
 
 # https://w3c.github.io/webappsec-csp/#grammardef-keyword-source
 class KeywordSource(KeywordMixin, SourceExpression):
@@ -187,16 +223,29 @@ class SingleValueItem(ClassAsValue, ValueItem, ABC):
     Because they are case-insensitive, there still is a constructor for lenient parsing.
     """
 
-    _value: str
+    # The value of the class, instances keep their own spelling in _value
+    _class_value: str
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # All single value items are matched case-insensitively
+        cls._literals = frozenset((cls._class_value.lower(),))
 
     def __init__(self, *, _value: Optional[str] = None):
-        value = _value or self._value
+        value = _value or self._class_value
         super().__init__(value)
 
     @classmethod
     def __eq__(cls, other):
         return other is cls or isinstance(other, cls)
 
+    def __hash__(self):
+        # Equal to the class, see __eq__
+        return hash(type(self))
+
+    def _canonicalize(self) -> str:
+        return self._class_value
+
     @classmethod
     def from_string(cls, value: str):
         return cls(_value=value)
@@ -206,7 +255,7 @@ class SingleValueItem(ClassAsValue, ValueItem, ABC):
 # https://w3c.github.io/webappsec-csp/#grammardef-serialized-source-list
 class NoneSrc(SingleValueItem):
     pattern = NONE_SOURCE
-    _value = NONE
+    _class_value = NONE
 
 
 # Can be passed as class or an instance
@@ -274,7 +323,7 @@ SandboxValue = SandboxToken | Literal[""]
 # frame-ancestors.
 class SelfSrc(SingleValueItem):
     pattern = SELF_SOURCE
-    _value = SELF
+    _class_value = SELF
 
 
 # Can be passed as class or an instance
@@ -283,6 +332,9 @@ SelfSrcType = SelfSrc | Type[SelfSrc]
 # https://w3c.github.io/webappsec-csp/#grammardef-ancestor-source-list
 AncestorSource = SchemeSrc | HostSrc | SelfSrcType | NoneSrcType
 
+# https://w3c.github.io/webappsec-csp/#grammardef-serialized-source-list
+SourceListValue = SourceExpression | SelfSrcType | NoneSrcType
+
 
 # https://w3c.github.io/webappsec-csp/#directive-report-to
 class ReportToValue(ValueItem):
@@ -304,11 +356,15 @@ class UriReference(ValueItem):
     def __init__(self, value: str, _value: Optional[str] = None):
         if _value is not None:
             value = _value
-        elif not self.pattern.fullmatch(value):
+        elif not is_uri_reference(value):
             raise BadDirectiveValue(f"{value} does not match {self.pattern.pattern}")
 
         super().__init__(value)
 
+    @classmethod
+    def matches(cls, str_value: str) -> bool:
+        return is_uri_reference(str_value)
+
 
 ReportUriValue = UriReference
 
@@ -335,14 +391,14 @@ class TrustedTypesPolicyName(ValueItem):
             if not TRUSTED_TYPES_POLICY_NAME.fullmatch(value):
                 raise BadSourceExpression(
                     f"TT policy name '{value}' does not match"
-                    f" {TRUSTED_TYPES_POLICY_NAME.pattern.pattern}"
+                    f" {TRUSTED_TYPES_POLICY_NAME.pattern}"
                 )
         super().__init__(value)
 
 
 class TrustedTypesWildcard(SingleValueItem):
     pattern = WILDCARD_RE
-    _value = WILDCARD
+    _class_value = WILDCARD
 
 
 # Can be passed as class or an instance